@@ -6,6 +6,7 @@ from .models import (
     OWASPVulnerability,
     VulnerabilityVariant,
     VulnerabilityDefinition,
+    ReportRenderJob,
 )
 
 admin.site.register(OWASPCategory)
@@ -24,4 +25,10 @@ class FindingEvidenceInline(admin.TabularInline):
 @admin.register(ReportFinding)
 class ReportFindingAdmin(admin.ModelAdmin):
     list_display = ("title", "severity", "report")
-    inlines = [FindingEvidenceInline]
\ No newline at end of file
+    inlines = [FindingEvidenceInline]
+
+
+@admin.register(ReportRenderJob)
+class ReportRenderJobAdmin(admin.ModelAdmin):
+    list_display = ("id", "report", "status", "attempts", "worker", "created_at", "finished_at")
+    list_filter = ("status",)
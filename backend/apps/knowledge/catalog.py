@@ -0,0 +1,118 @@
+"""
+The whole vulnerability catalog as one pre-built payload.
+
+The tree is category -> vulnerability -> variant, with each definition
+placed under the most specific level it links to (its variant, else its
+OWASP vulnerability, else its category); definitions linked to none of
+them are listed at the top level.  It is built from four queries, one
+per table, whatever the size of the catalog, then encoded to JSON and
+gzipped once.
+
+The result is kept per process for the current CatalogVersion and
+rebuilt when a catalog model changes (see CatalogModel in models.py);
+reading the version is the only query of a request served from it.
+"""
+
+import gzip
+import hashlib
+import threading
+from collections import defaultdict, namedtuple
+
+from rest_framework.renderers import JSONRenderer
+
+from .models import (
+    CatalogVersion,
+    OWASPCategory,
+    OWASPVulnerability,
+    VulnerabilityVariant,
+    VulnerabilityDefinition,
+)
+from .serializers import VulnerabilityDefinitionSerializer
+
+
+CatalogBlob = namedtuple("CatalogBlob", "version etag body gzipped")
+
+_lock = threading.Lock()
+_latest = None
+
+
+def build_tree():
+    definitions = VulnerabilityDefinitionSerializer(
+        VulnerabilityDefinition.objects.order_by("id"), many=True
+    ).data
+
+    by_variant = defaultdict(list)
+    by_vulnerability = defaultdict(list)
+    by_category = defaultdict(list)
+    unlinked = []
+    for definition in definitions:
+        if definition["variant"] is not None:
+            by_variant[definition["variant"]].append(definition)
+        elif definition["owasp_vulnerability"] is not None:
+            by_vulnerability[definition["owasp_vulnerability"]].append(definition)
+        elif definition["owasp_category"] is not None:
+            by_category[definition["owasp_category"]].append(definition)
+        else:
+            unlinked.append(definition)
+
+    variants = defaultdict(list)
+    for variant in (
+        VulnerabilityVariant.objects
+        .order_by("id")
+        .values("id", "owasp_vulnerability_id", "name", "description")
+    ):
+        variant["definitions"] = by_variant[variant["id"]]
+        variants[variant.pop("owasp_vulnerability_id")].append(variant)
+
+    vulnerabilities = defaultdict(list)
+    for vulnerability in (
+        OWASPVulnerability.objects
+        .order_by("id")
+        .values(
+            "id", "category_id", "name", "description",
+            "default_severity", "default_impact", "default_remediation",
+        )
+    ):
+        vulnerability["variants"] = variants[vulnerability["id"]]
+        vulnerability["definitions"] = by_vulnerability[vulnerability["id"]]
+        vulnerabilities[vulnerability.pop("category_id")].append(vulnerability)
+
+    categories = []
+    for category in OWASPCategory.objects.order_by("id").values("id", "name", "description"):
+        category["vulnerabilities"] = vulnerabilities[category["id"]]
+        category["definitions"] = by_category[category["id"]]
+        categories.append(category)
+
+    return {"categories": categories, "definitions": unlinked}
+
+
+def build_blob(version):
+    tree = build_tree()
+    body = JSONRenderer().render({"version": version, **tree})
+    digest = hashlib.sha256(body).hexdigest()[:32]
+    return CatalogBlob(
+        version=version,
+        etag=f"{version}-{digest}",
+        body=body,
+        # mtime=0 keeps the bytes identical across rebuilds
+        gzipped=gzip.compress(body, compresslevel=9, mtime=0),
+    )
+
+
+def get_catalog():
+    global _latest
+
+    version = CatalogVersion.current()
+    blob = _latest
+    if blob is not None and blob.version == version:
+        return blob
+
+    with _lock:
+        if _latest is None or _latest.version != version:
+            _latest = build_blob(version)
+        return _latest
+
+
+def clear():
+    global _latest
+    _latest = None
@@ -0,0 +1,113 @@
+# uv run python manage.py benchmark_pdf --output benchmarks/pdf.json
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.knowledge.reports.artifacts import DEFAULT_ENGINE, ENGINES
+from apps.knowledge.reports.benchmark import (
+    DEFAULT_IMAGES,
+    DEFAULT_SIZES,
+    compare,
+    run_benchmark,
+    scratch_database,
+)
+
+
+def _int_list(value):
+    return [int(v) for v in value.split(",") if v.strip()]
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark PDF rendering on synthetic reports, in a throwaway test "
+        "database (the configured database is never written to)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sizes",
+            type=_int_list,
+            default=list(DEFAULT_SIZES),
+            help="Comma separated finding counts (default 10,100,1000)",
+        )
+        parser.add_argument(
+            "--images",
+            type=_int_list,
+            default=list(DEFAULT_IMAGES),
+            help="Comma separated maximum evidence images per finding (default 0,20)",
+        )
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=1,
+            help="Runs per case; the fastest is reported",
+        )
+        parser.add_argument(
+            "--engine",
+            choices=ENGINES,
+            default=DEFAULT_ENGINE,
+            help="Renderer to benchmark (default reportlab)",
+        )
+        parser.add_argument(
+            "--keepdb",
+            action="store_true",
+            help="Keep the test database between runs instead of recreating it",
+        )
+        parser.add_argument(
+            "--output",
+            default=None,
+            help="Write the results to this JSON file",
+        )
+        parser.add_argument(
+            "--baseline",
+            default=None,
+            help="Compare against a JSON file written by a previous run",
+        )
+        parser.add_argument(
+            "--tolerance",
+            type=float,
+            default=0.2,
+            help="Allowed growth over the baseline before failing (default 0.2 = 20%%)",
+        )
+
+    def handle(self, *args, **options):
+        def progress(key, case):
+            self.stdout.write(
+                f"{key:>10}: {case['wall_time']:.2f}s, "
+                f"{case['peak_rss_kb'] // 1024} MiB RSS, "
+                f"{case['queries']} queries, "
+                f"{case['size_bytes'] // 1024} KiB"
+            )
+            slowest = sorted(case["sections"].items(), key=lambda kv: -kv[1])[:3]
+            self.stdout.write(
+                "            " + ", ".join(f"{k} {v:.2f}s" for k, v in slowest)
+            )
+
+        with scratch_database(keepdb=options["keepdb"]):
+            results = run_benchmark(
+                sizes=options["sizes"],
+                images=options["images"],
+                repeat=options["repeat"],
+                progress=progress,
+                engine=options["engine"],
+            )
+
+        if options["output"]:
+            with open(options["output"], "w") as f:
+                json.dump(results, f, indent=2, sort_keys=True)
+            self.stdout.write(self.style.SUCCESS(f"✅ Results written to {options['output']}"))
+
+        if options["baseline"]:
+            try:
+                with open(options["baseline"]) as f:
+                    baseline = json.load(f)
+            except (OSError, ValueError) as e:
+                raise CommandError(f"Could not read baseline: {e}")
+
+            regressions = compare(baseline, results, options["tolerance"])
+            if regressions:
+                for line in regressions:
+                    self.stdout.write(self.style.ERROR(line))
+                raise CommandError(f"{len(regressions)} regression(s) against baseline")
+
+            self.stdout.write(self.style.SUCCESS("✅ No regressions against baseline"))
@@ -0,0 +1,35 @@
+# uv run python manage.py generate_evidence_renditions
+from django.core.management.base import BaseCommand
+
+from apps.knowledge.models import FindingEvidence
+from apps.knowledge.reports.renditions import generate_rendition
+
+
+class Command(BaseCommand):
+    help = "Create PDF print renditions for evidence uploaded before they existed"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="Regenerate renditions that already exist",
+        )
+
+    def handle(self, *args, **options):
+        evidences = FindingEvidence.objects.exclude(file="")
+        if not options["all"]:
+            evidences = evidences.filter(print_file="")
+
+        created = 0
+        failed = 0
+
+        for evidence_id in evidences.values_list("id", flat=True).iterator():
+            if generate_rendition(evidence_id):
+                created += 1
+            else:
+                failed += 1
+                self.stdout.write(self.style.WARNING(f"Skipped evidence {evidence_id}"))
+
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Created {created} renditions ({failed} skipped)"
+        ))
@@ -0,0 +1,39 @@
+# uv run python manage.py reconcile_report_counters
+from django.core.management.base import BaseCommand
+
+from apps.knowledge.models import Report
+
+
+class Command(BaseCommand):
+    help = "Recompute the finding counters on Report and repair any that drifted"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "report_ids",
+            nargs="*",
+            type=int,
+            help="Only these reports (default: all)",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Reports recomputed (and locked) per transaction",
+        )
+
+    def handle(self, *args, **options):
+        reports = Report.objects.order_by("pk")
+        if options["report_ids"]:
+            reports = reports.filter(pk__in=options["report_ids"])
+
+        ids = list(reports.values_list("pk", flat=True))
+        batch_size = options["batch_size"]
+        repaired = 0
+
+        for start in range(0, len(ids), batch_size):
+            batch = ids[start:start + batch_size]
+            repaired += Report.objects.filter(pk__in=batch).refresh_finding_counts()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Checked {len(ids)} reports, repaired {repaired}"
+        ))
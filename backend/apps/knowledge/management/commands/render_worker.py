@@ -0,0 +1,72 @@
+# uv run python manage.py render_worker
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from apps.knowledge.reports.jobs import (
+    DEFAULT_LEASE,
+    claim_next_job,
+    default_worker_name,
+    run_job,
+)
+
+
+class Command(BaseCommand):
+    help = "Process queued report PDF render jobs (safe to run on several nodes)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Drain the queue and exit instead of polling forever",
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=2.0,
+            help="Seconds to sleep when the queue is empty",
+        )
+        parser.add_argument(
+            "--lease",
+            type=int,
+            default=int(DEFAULT_LEASE.total_seconds()),
+            help="Seconds without a heartbeat before a Running job is retried",
+        )
+        parser.add_argument(
+            "--name",
+            default=None,
+            help="Worker name recorded on claimed jobs (default host:pid)",
+        )
+
+    def handle(self, *args, **options):
+        worker_name = options["name"] or default_worker_name()
+        lease = timedelta(seconds=options["lease"])
+
+        self.stdout.write(f"Render worker {worker_name} started")
+
+        while True:
+            close_old_connections()
+            job = claim_next_job(worker_name, lease=lease)
+
+            if job is None:
+                if options["once"]:
+                    break
+                time.sleep(options["poll_interval"])
+                continue
+
+            started = time.monotonic()
+            job = run_job(job, lease=lease)
+            elapsed = time.monotonic() - started
+
+            if job.status == "Done":
+                self.stdout.write(self.style.SUCCESS(
+                    f"Job {job.id}: report {job.report_id} rendered in {elapsed:.1f}s"
+                ))
+            else:
+                self.stdout.write(self.style.WARNING(
+                    f"Job {job.id}: report {job.report_id} {job.status} ({job.error})"
+                ))
+
+        self.stdout.write(self.style.SUCCESS("✅ Render queue drained"))
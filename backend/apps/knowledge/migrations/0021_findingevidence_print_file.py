@@ -0,0 +1,18 @@
+# Generated by Django 6.1.2 on 2026-10-18 18:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('knowledge', '0020_reportrenderjob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='findingevidence',
+            name='print_file',
+            field=models.FileField(blank=True, upload_to='evidence/print/'),
+        ),
+    ]
@@ -0,0 +1,82 @@
+# Generated by Django 6.1.2 on 2026-10-18 18:36
+
+from django.db import migrations, models
+from django.db.models import Count, Max, Q, Value
+from django.db.models.functions import Coalesce, NullIf, Upper
+from django.db.models.lookups import Exact
+
+
+def fill_counters(apps, schema_editor):
+    Report = apps.get_model("knowledge", "Report")
+    ReportFinding = apps.get_model("knowledge", "ReportFinding")
+
+    severity = Upper(Coalesce(NullIf("tester_severity", Value("")), "vulnerability__severity"))
+    rows = (
+        ReportFinding.objects
+        .exclude(report=None)
+        .order_by()
+        .values("report_id")
+        .annotate(
+            findings_count=Count("id"),
+            critical_count=Count("id", filter=Exact(severity, "CRITICAL")),
+            high_count=Count("id", filter=Exact(severity, "HIGH")),
+            medium_count=Count("id", filter=Exact(severity, "MEDIUM")),
+            low_count=Count("id", filter=Exact(severity, "LOW")),
+            pending_count=Count("id", filter=Q(status="Pending")),
+            patched_count=Count("id", filter=Q(status="Patched")),
+            findings_changed_at=Max("created_at"),
+        )
+    )
+    for row in rows.iterator():
+        Report.objects.filter(pk=row.pop("report_id")).update(**row)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('knowledge', '0021_findingevidence_print_file'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='report',
+            name='critical_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='report',
+            name='findings_changed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='report',
+            name='findings_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='report',
+            name='high_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='report',
+            name='low_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='report',
+            name='medium_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='report',
+            name='patched_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='report',
+            name='pending_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 6.1.2 on 2026-10-18 18:41
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('knowledge', '0022_report_finding_counters'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='report',
+            index=models.Index(fields=['created_at', 'id'], name='knowledge_r_created_d3fbb7_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='reportfinding',
+            index=models.Index(fields=['report', 'created_at', 'id'], name='knowledge_r_report__4771c8_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='vulnerabilitydefinition',
+            index=models.Index(fields=['created_at', 'id'], name='knowledge_v_created_fd2e01_idx'),
+        ),
+    ]
@@ -0,0 +1,141 @@
+import logging
+
+from django.db import DatabaseError, migrations, transaction
+
+logger = logging.getLogger(__name__)
+
+
+TABLE = "knowledge_vulnerabilitydefinition"
+FTS_TABLE = f"{TABLE}_fts"
+COLUMNS = ("title", "description", "impact", "remediation")
+
+
+# PostgreSQL: a generated tsvector column (rank is read, not recomputed)
+# and a trigram index on title for the typo fallback.  Like every column
+# read by a generated column, ``title`` etc. cannot change type without
+# dropping search_vector first.
+POSTGRES_FORWARDS = [
+    f"""
+    ALTER TABLE {TABLE} ADD COLUMN search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(description, '')), 'B') ||
+        setweight(to_tsvector('english', coalesce(impact, '')), 'C') ||
+        setweight(to_tsvector('english', coalesce(remediation, '')), 'C')
+    ) STORED
+    """,
+    f"CREATE INDEX {TABLE}_search_gin ON {TABLE} USING gin (search_vector)",
+]
+
+POSTGRES_TRIGRAM_INDEX = (
+    f"CREATE INDEX {TABLE}_title_trgm ON {TABLE} USING gin (title gin_trgm_ops)"
+)
+
+POSTGRES_BACKWARDS = [
+    f"DROP INDEX IF EXISTS {TABLE}_title_trgm",
+    f"ALTER TABLE {TABLE} DROP COLUMN IF EXISTS search_vector",
+]
+
+
+def _create_pg_trgm(schema_editor):
+    """
+    CREATE EXTENSION needs a superuser (or, for trusted extensions like
+    pg_trgm on PostgreSQL 13+, the CREATE privilege on the database).
+    Without it, search works without the typo fallback; a superuser can
+    run ``CREATE EXTENSION pg_trgm`` and the index below later.
+    """
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+        if cursor.fetchone():
+            return True
+    try:
+        with transaction.atomic(using=schema_editor.connection.alias):
+            schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    except DatabaseError:
+        logger.warning(
+            "Could not create the pg_trgm extension; vulnerability search "
+            "will run without the typo fallback"
+        )
+        return False
+    return True
+
+
+def _values(prefix):
+    return ", ".join(f"{prefix}.{c}" for c in COLUMNS)
+
+
+# SQLite: an external-content FTS5 table kept in sync by triggers.  A
+# later migration that makes SQLite rebuild the definitions table drops
+# these triggers and has to create them again.
+SQLITE_FORWARDS = [
+    f"""
+    CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5(
+        {", ".join(COLUMNS)},
+        content='{TABLE}', content_rowid='id', tokenize='porter unicode61'
+    )
+    """,
+    f"""
+    CREATE TRIGGER {FTS_TABLE}_ai AFTER INSERT ON {TABLE} BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, {", ".join(COLUMNS)})
+        VALUES (new.id, {_values("new")});
+    END
+    """,
+    f"""
+    CREATE TRIGGER {FTS_TABLE}_ad AFTER DELETE ON {TABLE} BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {", ".join(COLUMNS)})
+        VALUES ('delete', old.id, {_values("old")});
+    END
+    """,
+    f"""
+    CREATE TRIGGER {FTS_TABLE}_au AFTER UPDATE ON {TABLE} BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {", ".join(COLUMNS)})
+        VALUES ('delete', old.id, {_values("old")});
+        INSERT INTO {FTS_TABLE}(rowid, {", ".join(COLUMNS)})
+        VALUES (new.id, {_values("new")});
+    END
+    """,
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')",
+]
+
+SQLITE_BACKWARDS = [
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_ai",
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_ad",
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_au",
+    f"DROP TABLE IF EXISTS {FTS_TABLE}",
+]
+
+
+STATEMENTS = {
+    "postgresql": (POSTGRES_FORWARDS, POSTGRES_BACKWARDS),
+    "sqlite": (SQLITE_FORWARDS, SQLITE_BACKWARDS),
+}
+
+
+def _run(schema_editor, direction):
+    vendor = schema_editor.connection.vendor
+    statements = STATEMENTS.get(vendor)
+    if statements is None:
+        # Other databases search without an index (see search.py)
+        return
+    for sql in statements[direction]:
+        schema_editor.execute(sql)
+    if vendor == "postgresql" and direction == 0 and _create_pg_trgm(schema_editor):
+        schema_editor.execute(POSTGRES_TRIGRAM_INDEX)
+
+
+def create_search_index(apps, schema_editor):
+    _run(schema_editor, 0)
+
+
+def drop_search_index(apps, schema_editor):
+    _run(schema_editor, 1)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('knowledge', '0023_keyset_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 6.1.2 on 2026-10-18 18:46
+
+from django.db import migrations, models
+
+
+def create_version(apps, schema_editor):
+    CatalogVersion = apps.get_model("knowledge", "CatalogVersion")
+    CatalogVersion.objects.get_or_create(pk=1, defaults={"version": 1})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('knowledge', '0024_vulnerability_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CatalogVersion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('version', models.PositiveBigIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(create_version, migrations.RunPython.noop),
+    ]
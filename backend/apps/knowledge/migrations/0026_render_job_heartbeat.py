@@ -0,0 +1,18 @@
+# Generated by Django 6.1.2 on 2026-10-18 19:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('knowledge', '0025_catalog_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reportrenderjob',
+            name='heartbeat_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
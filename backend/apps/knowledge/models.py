@@ -1,9 +1,66 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Case, Count, F, Q, Value, When
+from django.db.models.functions import Coalesce, Concat, NullIf, Upper
+from django.db.models.lookups import Exact
 from django.contrib.auth.models import User
+from django.utils import timezone
+
+
+# Catalog revision: bumped after every save/delete of a catalog model, so
+# /api/catalog/ only rebuilds after a change (see catalog.py).  Inside a
+# transaction the bump waits for the commit and happens once, however
+# many rows were written, so bulk imports don't queue on the version
+# row.  Queryset update()/delete() and bulk_create() skip it; call
+# CatalogVersion.bump() after those.
+class CatalogVersion(models.Model):
+    version = models.PositiveBigIntegerField(default=0)
+
+    @classmethod
+    def current(cls):
+        return cls.objects.filter(pk=1).values_list("version", flat=True).first() or 0
+
+    @classmethod
+    def bump(cls, using=None):
+        connection = transaction.get_connection(using)
+        if not connection.in_atomic_block:
+            cls._increment()
+            return
+
+        # One bump per transaction; a rolled back one drops it again
+        pending = any(
+            getattr(func, "catalog_bump", False)
+            for _, func, _ in connection.run_on_commit
+        )
+        if not pending:
+            def run():
+                run.catalog_bump = False
+                cls._increment()
+            run.catalog_bump = True
+            transaction.on_commit(run, using=using)
+
+    @classmethod
+    def _increment(cls):
+        if not cls.objects.filter(pk=1).update(version=F("version") + 1):
+            cls.objects.get_or_create(pk=1)
+            cls.objects.filter(pk=1).update(version=F("version") + 1)
+
+
+class CatalogModel(models.Model):
+    class Meta:
+        abstract = True
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        CatalogVersion.bump()
+
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        CatalogVersion.bump()
+        return result
 
 
 # 1️⃣ OWASP Category
-class OWASPCategory(models.Model):
+class OWASPCategory(CatalogModel):
     name = models.CharField(max_length=100, unique=True)
     description = models.TextField(blank=True)
 
@@ -15,7 +72,7 @@ class OWASPCategory(models.Model):
 
 
 # 2️⃣ OWASP Vulnerability
-class OWASPVulnerability(models.Model):
+class OWASPVulnerability(CatalogModel):
     category = models.ForeignKey(
         OWASPCategory,
         on_delete=models.CASCADE,
@@ -37,7 +94,7 @@ class OWASPVulnerability(models.Model):
 
 
 # 3️⃣ Vulnerability Variant (optional)
-class VulnerabilityVariant(models.Model):
+class VulnerabilityVariant(CatalogModel):
     owasp_vulnerability = models.ForeignKey(
         OWASPVulnerability,
         on_delete=models.CASCADE,
@@ -52,7 +109,7 @@ class VulnerabilityVariant(models.Model):
 
 
 # 4️⃣ Vulnerability Definition (CORE TABLE)
-class VulnerabilityDefinition(models.Model):
+class VulnerabilityDefinition(CatalogModel):
 
     SOURCE_CHOICES = [
         ("OWASP", "OWASP"),
@@ -116,9 +173,45 @@ class VulnerabilityDefinition(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            # Keyset pagination of the catalog
+            models.Index(fields=["created_at", "id"]),
+        ]
+
     def __str__(self):
         return self.title
 
+    # Findings without a tester severity inherit this one, so a change
+    # moves them between the severity counters of their reports.
+    def save(self, *args, **kwargs):
+        with transaction.atomic():
+            previous = None
+            if not self._state.adding:
+                previous = (
+                    VulnerabilityDefinition.objects
+                    .filter(pk=self.pk)
+                    .values_list("severity", flat=True)
+                    .first()
+                )
+
+            super().save(*args, **kwargs)
+
+            if previous is not None and previous != self.severity:
+                self._linked_reports().refresh_finding_counts()
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            reports = list(self._linked_reports().values_list("pk", flat=True))
+            result = super().delete(*args, **kwargs)
+            Report.objects.filter(pk__in=reports).refresh_finding_counts()
+        return result
+
+    def _linked_reports(self):
+        return Report.objects.filter(
+            pk__in=ReportFinding.objects.filter(vulnerability=self).values("report_id")
+        )
+
 # =========================
 # REPORT & FINDINGS MODELS
 # =========================
@@ -128,6 +221,149 @@ from django.db import models
 from django.contrib.auth.models import User
 
 
+# Keys of ReportSerializer.severity_counts / status_counts
+SEVERITY_LEVELS = ["Critical", "High", "Medium", "Low"]
+FINDING_STATUSES = ["Pending", "Patched"]
+
+# ReportFinding severity_rank; anything else ranks last
+SEVERITY_RANK = {
+    "CRITICAL": 0,
+    "HIGH": 1,
+    "MEDIUM": 2,
+    "LOW": 3,
+    "INFO": 4,
+}
+
+
+def final_value_expressions(prefix=""):
+    """
+    SQL versions of the ReportFinding.final_* properties, plus
+    ``severity_rank`` (see SEVERITY_RANK) of the final severity.
+    ``prefix`` is the path to the finding, e.g. ``"findings__"`` from
+    Report.
+    """
+    def tester_or_definition(field):
+        # The tester's value unless blank, else the definition's
+        return Coalesce(
+            NullIf(f"{prefix}tester_{field}", Value("")),
+            f"{prefix}vulnerability__{field}",
+            Value(""),
+        )
+
+    def definition_then_tester(field):
+        # The definition's text, then the tester's after a blank line
+        default = Coalesce(f"{prefix}vulnerability__{field}", Value(""))
+        tester = f"{prefix}tester_{field}"
+        return Case(
+            When(**{tester: ""}, then=default),
+            When(
+                Q(**{f"{prefix}vulnerability__{field}__isnull": True})
+                | Q(**{f"{prefix}vulnerability__{field}": ""}),
+                then=F(tester),
+            ),
+            default=Concat(default, Value("\n\n"), tester),
+            output_field=models.TextField(),
+        )
+
+    severity = tester_or_definition("severity")
+
+    return {
+        "final_title": tester_or_definition("title"),
+        "final_severity": severity,
+        "final_description": definition_then_tester("description"),
+        "final_impact": definition_then_tester("impact"),
+        "final_remediation": definition_then_tester("remediation"),
+        "severity_rank": Case(
+            *[
+                When(Exact(Upper(severity), level), then=Value(rank))
+                for level, rank in SEVERITY_RANK.items()
+            ],
+            default=Value(len(SEVERITY_RANK)),
+            output_field=models.IntegerField(),
+        ),
+    }
+
+
+def finding_count_aggregates(prefix=""):
+    """
+    Aggregates counting findings, findings per final severity and per
+    status, keyed by the Report counter column they fill.  For
+    ``aggregate()`` / ``values().annotate()`` on ReportFinding, or with
+    ``prefix="findings__"`` for ``annotate()`` on Report.
+
+    Severities are compared case-insensitively.
+    """
+    severity = Upper(final_value_expressions(prefix)["final_severity"])
+
+    aggregates = {"findings_count": Count(f"{prefix}id")}
+    for level in SEVERITY_LEVELS:
+        aggregates[f"{level.lower()}_count"] = Count(
+            f"{prefix}id", filter=Exact(severity, level.upper())
+        )
+    for status in FINDING_STATUSES:
+        aggregates[f"{status.lower()}_count"] = Count(
+            f"{prefix}id", filter=Q(**{f"{prefix}status": status})
+        )
+    return aggregates
+
+
+FINDING_COUNTERS = list(finding_count_aggregates())
+FINAL_FIELDS = [name for name in final_value_expressions() if name.startswith("final_")]
+
+
+class ReportQuerySet(models.QuerySet):
+
+    def refresh_finding_counts(self, touch=False):
+        """
+        Recompute the finding counters of these reports from their
+        findings and save the ones that changed; returns how many did.
+        With ``touch`` also set ``findings_changed_at`` to now.
+
+        The report rows stay locked until the surrounding transaction
+        ends, so concurrent writes to the findings of one report update
+        its counters one after the other.
+        """
+        with transaction.atomic(using=self.db):
+            reports = list(
+                self.select_for_update()
+                .order_by("pk")
+                .only("pk", "findings_changed_at", *FINDING_COUNTERS)
+            )
+            if not reports:
+                return 0
+
+            rows = (
+                ReportFinding.objects
+                .using(self.db)
+                .filter(report_id__in=[r.pk for r in reports])
+                .order_by()
+                .values("report_id")
+                .annotate(**finding_count_aggregates())
+            )
+            counts = {row.pop("report_id"): row for row in rows}
+
+            now = timezone.now()
+            changed = []
+            for report in reports:
+                values = counts.get(report.pk, {})
+                dirty = touch
+                for name in FINDING_COUNTERS:
+                    value = values.get(name, 0)
+                    if getattr(report, name) != value:
+                        setattr(report, name, value)
+                        dirty = True
+                if touch:
+                    report.findings_changed_at = now
+                if dirty:
+                    changed.append(report)
+
+            if changed:
+                fields = FINDING_COUNTERS + (["findings_changed_at"] if touch else [])
+                Report.objects.using(self.db).bulk_update(changed, fields)
+
+        return len(changed)
+
+
 class Report(models.Model):
     STATUS_CHOICES = [
         ("Draft", "Draft"),
@@ -165,6 +401,29 @@ class Report(models.Model):
 
     created_at = models.DateTimeField(auto_now_add=True)
 
+    # -----------------------
+    # FINDING COUNTERS
+    # Kept up to date by ReportFinding.save()/delete() and by
+    # VulnerabilityDefinition severity changes; repaired by
+    # `manage.py reconcile_report_counters`.
+    # -----------------------
+    findings_count = models.PositiveIntegerField(default=0)
+    critical_count = models.PositiveIntegerField(default=0)
+    high_count = models.PositiveIntegerField(default=0)
+    medium_count = models.PositiveIntegerField(default=0)
+    low_count = models.PositiveIntegerField(default=0)
+    pending_count = models.PositiveIntegerField(default=0)
+    patched_count = models.PositiveIntegerField(default=0)
+    findings_changed_at = models.DateTimeField(null=True, blank=True)
+
+    objects = ReportQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # Keyset pagination of the report list
+            models.Index(fields=["created_at", "id"]),
+        ]
+
     def __str__(self):
         return f"{self.client_name} - {self.application_name}"
 
@@ -172,6 +431,43 @@ class Report(models.Model):
 
 from apps.knowledge.models import VulnerabilityDefinition  
 
+
+class final_value:
+    """
+    Like ``property``, but returns the value annotated under the same
+    name by ``with_final_values()`` when the row was loaded with it.
+    """
+
+    def __init__(self, compute):
+        self.compute = compute
+        self.__doc__ = compute.__doc__
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, obj, owner=None):
+        if obj is None:
+            return self
+        try:
+            return obj.__dict__[self.name]
+        except KeyError:
+            return self.compute(obj)
+
+    def __set__(self, obj, value):
+        # Called by the ORM for annotated rows
+        obj.__dict__[self.name] = value
+
+
+class ReportFindingQuerySet(models.QuerySet):
+
+    def with_final_values(self):
+        """
+        Annotate the final_* values and ``severity_rank``, so they can
+        be filtered and ordered on and are not recomputed per row.
+        """
+        return self.annotate(**final_value_expressions())
+
+
 class ReportFinding(models.Model):
     report = models.ForeignKey(
         Report,
@@ -222,10 +518,49 @@ class ReportFinding(models.Model):
 
     created_at = models.DateTimeField(auto_now_add=True)
 
+    objects = ReportFindingQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # Keyset pagination of a report's findings
+            models.Index(fields=["report", "created_at", "id"]),
+        ]
+
+    # Every write refreshes the counters of the report(s) involved in
+    # the same transaction.
+    def save(self, *args, **kwargs):
+        # Annotated final_* values may be stale after an edit
+        for name in FINAL_FIELDS:
+            self.__dict__.pop(name, None)
+
+        with transaction.atomic():
+            previous = None
+            if not self._state.adding:
+                previous = (
+                    ReportFinding.objects
+                    .filter(pk=self.pk)
+                    .values_list("report_id", flat=True)
+                    .first()
+                )
+
+            super().save(*args, **kwargs)
+
+            reports = {self.report_id, previous} - {None}
+            Report.objects.filter(pk__in=reports).refresh_finding_counts(touch=True)
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            report_id = self.report_id
+            result = super().delete(*args, **kwargs)
+            Report.objects.filter(pk=report_id).refresh_finding_counts(touch=True)
+        return result
+
 # -----------------------
 # FINAL (COMPUTED) VALUES
+# Annotated in SQL by ReportFinding.objects.with_final_values(),
+# computed from the fields below otherwise.
 # -----------------------
-    @property
+    @final_value
     def final_title(self):
         default = ""
         if self.vulnerability:
@@ -236,7 +571,7 @@ class ReportFinding(models.Model):
 
         return default
     
-    @property
+    @final_value
     def final_severity(self):
         default = ""
         if self.vulnerability:
@@ -248,7 +583,7 @@ class ReportFinding(models.Model):
         return default
     
     
-    @property
+    @final_value
     def final_description(self):
         default = ""
         if self.vulnerability:
@@ -261,7 +596,7 @@ class ReportFinding(models.Model):
 
         return default
 
-    @property
+    @final_value
     def final_impact(self):
         default = ""
         if self.vulnerability:
@@ -274,7 +609,7 @@ class ReportFinding(models.Model):
 
         return default
 
-    @property
+    @final_value
     def final_remediation(self):
         default = ""
         if self.vulnerability:
@@ -295,9 +630,66 @@ class FindingEvidence(models.Model):
     )
     title = models.CharField(max_length=200, blank=True)
     file = models.FileField(upload_to="evidence/")
+    # Downscaled copy sized for the PDF evidence box, generated after
+    # upload (see reports/renditions.py).  Empty until it is ready.
+    print_file = models.FileField(upload_to="evidence/print/", blank=True)
     description = models.TextField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
 
     def __str__(self):
-        return self.title or f"Evidence for {self.finding.title}" 
\ No newline at end of file
+        return self.title or f"Evidence for {self.finding.title}" 
+
+# =========================
+# BACKGROUND PDF RENDERING
+# =========================
+
+class ReportRenderJob(models.Model):
+    STATUS_CHOICES = [
+        ("Queued", "Queued"),
+        ("Running", "Running"),
+        ("Done", "Done"),
+        ("Failed", "Failed"),
+    ]
+
+    report = models.ForeignKey(
+        Report,
+        on_delete=models.CASCADE,
+        related_name="render_jobs"
+    )
+
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default="Queued",
+    )
+
+    # Fingerprint of the report revision that was rendered (see
+    # reports/artifacts.py); empty until the job finishes.
+    fingerprint = models.CharField(max_length=64, blank=True, default="")
+
+    attempts = models.PositiveIntegerField(default=0)
+    worker = models.CharField(max_length=150, blank=True, default="")
+    error = models.TextField(blank=True, default="")
+
+    requested_by = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="render_jobs"
+    )
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    # Refreshed by the worker while it renders; the lease runs from here
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "created_at"]),
+        ]
+
+    def __str__(self):
+        return f"Render job {self.id} ({self.status}) for report {self.report_id}"
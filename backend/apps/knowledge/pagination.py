@@ -0,0 +1,198 @@
+"""
+Keyset ("cursor") pagination for the list endpoints.
+
+Pages are selected with a WHERE on the ordering key of the last row
+returned, e.g. ``(created_at, id) < (last_created_at, last_id)``, never
+with OFFSET, so fetching page 500 costs the same as fetching page 1 and
+rows inserted meanwhile do not shift pages.  The ordering must end in a
+unique field; ``id`` is appended when it does not.
+
+Pagination is opt-in per request, so existing clients that expect a
+plain list keep working: a list is paginated when the request carries
+``page_size`` or ``cursor``.  Paginated responses look like
+
+    {"next": "<url with the next cursor>" | null, "results": [...]}
+
+plus ``"count"`` (the total number of rows) only with ``?count=true``,
+since counting a large table is the one part that does not stay cheap.
+"""
+
+import base64
+import json
+from collections import OrderedDict
+
+from django.conf import settings
+from django.db.models import Q
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+DEFAULT_ORDERING = ("-created_at", "-id")
+
+
+class KeysetPagination(BasePagination):
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+    count_query_param = "count"
+
+    def __init__(self, ordering=None):
+        # Else the view's ``pagination_ordering``, else DEFAULT_ORDERING
+        self.ordering = ordering
+
+    def get_ordering(self, view):
+        ordering = tuple(
+            self.ordering
+            or getattr(view, "pagination_ordering", None)
+            or DEFAULT_ORDERING
+        )
+        last = ordering[-1]
+        if last.lstrip("-") not in ("id", "pk"):
+            ordering += ("-id" if last.startswith("-") else "id",)
+        return ordering
+
+    # -------------------------
+    # Request parameters
+    # -------------------------
+
+    def is_requested(self, request):
+        params = request.query_params
+        return self.cursor_query_param in params or self.page_size_query_param in params
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return settings.API_PAGE_SIZE
+        return max(1, min(size, settings.API_MAX_PAGE_SIZE))
+
+    def wants_count(self, request):
+        value = request.query_params.get(self.count_query_param, "")
+        return value.lower() in ("1", "true", "yes")
+
+    # -------------------------
+    # Cursor encoding
+    # -------------------------
+
+    def encode_cursor(self, row):
+        values = []
+        for field in self.ordering:
+            value = getattr(row, field.lstrip("-"))
+            # isoformat keeps microseconds, which the key comparison needs
+            values.append(value.isoformat() if hasattr(value, "isoformat") else value)
+        raw = json.dumps(values, separators=(",", ":")).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+    def decode_cursor(self, queryset, cursor):
+        try:
+            raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+            values = json.loads(raw)
+            if not isinstance(values, list) or len(values) != len(self.ordering):
+                raise ValueError
+            return [
+                self._output_field(queryset, field.lstrip("-")).to_python(value)
+                for field, value in zip(self.ordering, values)
+            ]
+        except (ValueError, TypeError, ValidationError):
+            raise NotFound("Invalid cursor")
+
+    def _output_field(self, queryset, name):
+        annotation = queryset.query.annotations.get(name)
+        if annotation is not None:
+            return annotation.output_field
+        try:
+            return queryset.model._meta.get_field(name)
+        except FieldDoesNotExist:
+            return queryset.model._meta.pk
+
+    def after(self, values):
+        """
+        Q for rows that come after ``values`` in ``self.ordering``:
+        (a > x) OR (a = x AND b > y) OR ..., with < for descending keys.
+        """
+        condition = Q()
+        equal = {}
+        for field, value in zip(self.ordering, values):
+            name = field.lstrip("-")
+            lookup = "lt" if field.startswith("-") else "gt"
+            condition |= Q(**equal, **{f"{name}__{lookup}": value})
+            equal[name] = value
+        return condition
+
+    # -------------------------
+    # BasePagination
+    # -------------------------
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if not self.is_requested(request):
+            return None
+
+        self.request = request
+        self.ordering = self.get_ordering(view)
+        self.count = queryset.count() if self.wants_count(request) else None
+
+        queryset = queryset.order_by(*self.ordering)
+        cursor = request.query_params.get(self.cursor_query_param)
+        if cursor:
+            queryset = queryset.filter(self.after(self.decode_cursor(queryset, cursor)))
+
+        page_size = self.get_page_size(request)
+        rows = list(queryset[:page_size + 1])
+
+        self.next_cursor = None
+        if len(rows) > page_size:
+            rows = rows[:page_size]
+            self.next_cursor = self.encode_cursor(rows[-1])
+        return rows
+
+    def get_next_link(self):
+        if self.next_cursor is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.next_cursor)
+
+    def get_paginated_response(self, data):
+        body = OrderedDict()
+        if self.count is not None:
+            body["count"] = self.count
+        body["next"] = self.get_next_link()
+        body["results"] = data
+        return Response(body)
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["next", "results"],
+            "properties": {
+                "count": {"type": "integer", "description": "Only with ?count=true"},
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                "name": self.cursor_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Cursor from the `next` link of the previous page",
+                "schema": {"type": "string"},
+            },
+            {
+                "name": self.page_size_query_param,
+                "required": False,
+                "in": "query",
+                "description": f"Rows per page (max {settings.API_MAX_PAGE_SIZE}); paginates the list",
+                "schema": {"type": "integer"},
+            },
+            {
+                "name": self.count_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Include the total row count",
+                "schema": {"type": "boolean"},
+            },
+        ]
@@ -1,19 +1,67 @@
-from collections import defaultdict
-from django.http import HttpResponse, Http404
-from django.template.loader import render_to_string
-from django.conf import settings
+import hashlib
+
+from django.core.cache import cache
+from django.http import Http404, StreamingHttpResponse
+from django.template.loader import get_template, render_to_string
+from django.utils.safestring import mark_safe
 
 from rest_framework.views import APIView
 from rest_framework.permissions import AllowAny
 # from rest_framework.permissions import IsAuthenticated
 from rest_framework_simplejwt.authentication import JWTAuthentication
-from rest_framework.response import Response
 from drf_spectacular.utils import extend_schema
 from drf_spectacular.types import OpenApiTypes
-from django.urls import reverse
 
 from apps.knowledge.models import Report, ReportFinding
 
+# Bump whenever reports/_preview_finding.html changes.
+PREVIEW_FRAGMENT_VERSION = "1"
+PREVIEW_FRAGMENT_TIMEOUT = 60 * 60
+
+# Where the finding rows go in the rendered page
+ROWS_MARKER = mark_safe("<!--finding-rows-->")
+
+
+def finding_fragment_key(finding, index):
+    """
+    Cache key of a finding's preview row: a hash of everything drawn in
+    it, so an edited finding simply misses.
+    """
+    h = hashlib.sha256(repr((
+        PREVIEW_FRAGMENT_VERSION,
+        index,
+        finding.final_title,
+        finding.final_severity,
+        finding.status,
+    )).encode())
+    return f"report_preview:finding:{h.hexdigest()}"
+
+
+def stream_preview(page, findings):
+    """
+    Yield the page in pieces: everything before the findings table
+    rows, one row per finding (from the fragment cache where possible),
+    then the rest.
+    """
+    head, tail = page.split(ROWS_MARKER, 1)
+    yield head
+
+    keys = [finding_fragment_key(f, idx) for idx, f in enumerate(findings, start=1)]
+    cached = cache.get_many(keys)
+    rendered = {}
+
+    fragment = get_template("reports/_preview_finding.html")
+    for idx, (f, key) in enumerate(zip(findings, keys), start=1):
+        row = cached.get(key)
+        if row is None:
+            row = rendered[key] = fragment.render({"f": f, "index": idx})
+        yield row
+
+    if rendered:
+        cache.set_many(rendered, PREVIEW_FRAGMENT_TIMEOUT)
+
+    yield tail
+
 
 class ReportPreviewView(APIView):
     # authentication_classes = [JWTAuthentication]
@@ -25,7 +73,7 @@ class ReportPreviewView(APIView):
     @extend_schema(
         operation_id="preview_report",
         summary="Generate HTML Preview of Report",
-        description="Generates an HTML preview of a specific report with all findings, evidences, and severity aggregation.",
+        description="Renders an HTML preview of a specific report with its findings and severity aggregation. No PDF is built; use `/api/reports/<id>/pdf/` for that.",
         tags=["Reports"],
         responses={
             200: OpenApiTypes.STR,
@@ -39,88 +87,31 @@ class ReportPreviewView(APIView):
         except Report.DoesNotExist:
             raise Http404("Report not found")
 
-        # Load findings with all needed relations
-        findings_qs = (
+        # One query, final_* computed by the database
+        findings = list(
             ReportFinding.objects
             .filter(report=report)
-            .select_related("vulnerability")
-            .prefetch_related("evidences")
+            .with_final_values()
+            .order_by("id")
         )
 
-        # ----------------------------
-        # Severity aggregation (FINAL)
-        # ----------------------------
-        severity_counts = {
-            "CRITICAL": 0,
-            "HIGH": 0,
-            "MEDIUM": 0,
-            "LOW": 0,
-        }
-
-        for f in findings_qs:
-            if f.final_severity in severity_counts:
-                severity_counts[f.final_severity] += 1
-
-        # ----------------------------
-        # Action Plan (FINAL)
-        # ----------------------------
-        severity_counter = defaultdict(int)
-        remediation_set = set()
-
-        for f in findings_qs:
-            if f.final_severity:
-                severity_counter[f.final_severity] += 1
-            if f.final_remediation:
-                remediation_set.add(f.final_remediation.strip())
-
-        action_plan = {
-            "severity_count": dict(severity_counter),
-            "actions": sorted(remediation_set),
-        }
-
-        # ----------------------------
-        # Context
-        # We pass MODEL OBJECTS so:
-        #   f.final_title
-        #   f.final_severity
-        #   f.evidences.all
-        # all work in the template
-        # ----------------------------
         context = {
             "report": report,
             "summary": {
+                # Kept current on the report row (see Report counters),
+                # counted case-insensitively like the PDF
                 "severity": {
-                    "critical": severity_counts["CRITICAL"],
-                    "high": severity_counts["HIGH"],
-                    "medium": severity_counts["MEDIUM"],
-                    "low": severity_counts["LOW"],
+                    "critical": report.critical_count,
+                    "high": report.high_count,
+                    "medium": report.medium_count,
+                    "low": report.low_count,
                 }
             },
-            "findings": findings_qs,
-            "action_plan": action_plan,
-            "MEDIA_URL": request.build_absolute_uri(settings.MEDIA_URL),
-            "is_pdf": False,
+            "finding_rows": ROWS_MARKER,
         }
-        pdf_url = f"/api/reports/{report.id}/pdf/" 
-        
-        html = f"""
-<html>
-<head>
-    <title>Report Preview</title>
-    <style>
-        body {{
-            margin: 0;
-        }}
-        iframe {{
-            width: 100%;
-            height: 100vh;
-            border: none;
-        }}
-    </style>
-</head>
-<body>
-    <iframe src="{pdf_url}"></iframe>
-</body>
-</html>
-"""
-        return HttpResponse(html)
+        page = render_to_string("reports/report_preview_v2.html", context, request=request)
+
+        return StreamingHttpResponse(
+            stream_preview(page, findings),
+            content_type="text/html; charset=utf-8",
+        )
@@ -1,26 +1,31 @@
 from django.http import HttpResponse
 from django.template.loader import render_to_string
 from django.shortcuts import get_object_or_404
+from django.db import IntegrityError, transaction
 
 from rest_framework.viewsets import ModelViewSet
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
-from drf_spectacular.utils import extend_schema
+from drf_spectacular.utils import extend_schema, OpenApiParameter
 from drf_spectacular.types import OpenApiTypes
 
 from apps.knowledge.models import (
     Report,
     ReportFinding,
     FindingEvidence,
+    VulnerabilityDefinition,
 )
 
 from apps.knowledge.serializers import (
     ReportSerializer,
     ReportFindingSerializer,
+    BulkReportFindingSerializer,
     FindingEvidenceSerializer,
 )
+from apps.knowledge.reports.renditions import schedule_rendition
+from apps.knowledge.pagination import KeysetPagination
 
 # -------------------------
 # TEST PDF VIEW (unchanged)
@@ -50,9 +55,11 @@ def test_pdf(request):
 # REPORT CRUD
 # -------------------------
 class ReportViewSet(ModelViewSet):
-    queryset = Report.objects.all().order_by("-created_at").prefetch_related("findings__vulnerability")
+    # Finding counts are columns on Report, so findings are never loaded
+    queryset = Report.objects.all().order_by("-created_at")
     serializer_class = ReportSerializer
     permission_classes = [IsAuthenticated]
+    pagination_ordering = ("-created_at", "-id")
 
     def perform_create(self, serializer):
         serializer.save(created_by=self.request.user)
@@ -63,8 +70,29 @@ class ReportViewSet(ModelViewSet):
 # -------------------------
 class ReportFindingListCreateView(APIView):
     permission_classes = [IsAuthenticated]
+
+    # ?ordering= values; prefix with "-" for descending
+    ORDERING_FIELDS = [
+        "id",
+        "created_at",
+        "status",
+        "severity_rank",
+        "final_title",
+        "final_severity",
+    ]
+
     @extend_schema(
-        responses=ReportFindingSerializer(many=True),
+        parameters=[
+            OpenApiParameter("severity", str, description="Final severity, case-insensitive (e.g. HIGH)"),
+            OpenApiParameter("status", str, enum=["Pending", "Patched"]),
+            OpenApiParameter(
+                "ordering",
+                str,
+                description="Comma separated fields, `-` for descending: " + ", ".join(ORDERING_FIELDS),
+            ),
+            *KeysetPagination().get_schema_operation_parameters(None),
+        ],
+        responses={200: ReportFindingSerializer(many=True), 400: OpenApiTypes.OBJECT},
         description="List findings for a report",
     )
     def get(self, request, report_id):
@@ -73,10 +101,38 @@ class ReportFindingListCreateView(APIView):
         findings = (
             ReportFinding.objects
             .filter(report=report)
-            .select_related("vulnerability")  # ✅ important for final_* logic
+            .with_final_values()  # final_* computed in SQL
+            .select_related("vulnerability")  # vulnerability_name / source_type
             .prefetch_related("evidences")
         )
 
+        severity = request.query_params.get("severity")
+        if severity:
+            findings = findings.filter(final_severity__iexact=severity)
+
+        finding_status = request.query_params.get("status")
+        if finding_status:
+            findings = findings.filter(status=finding_status)
+
+        ordering = ["created_at", "id"]
+        param = request.query_params.get("ordering")
+        if param:
+            fields = [f.strip() for f in param.split(",") if f.strip()]
+            invalid = [f for f in fields if f.lstrip("-") not in self.ORDERING_FIELDS]
+            if invalid:
+                return Response(
+                    {"error": f"Cannot order by: {', '.join(invalid)}"},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            ordering = fields + ["id"]
+            findings = findings.order_by(*ordering)
+
+        paginator = KeysetPagination(ordering)
+        page = paginator.paginate_queryset(findings, request, view=self)
+        if page is not None:
+            serializer = ReportFindingSerializer(page, many=True)
+            return paginator.get_paginated_response(serializer.data)
+
         serializer = ReportFindingSerializer(findings, many=True)
         return Response(serializer.data)
 
@@ -122,6 +178,10 @@ class BulkReportFindingsView(APIView):
             {"vulnerability": 2, "tester_description": "...", ...},
             ...
         ]
+
+        Valid items are inserted together with bulk_create() in one
+        transaction; invalid ones are returned by index in ``errors``
+        (207 when some findings were created).
         """
         report = get_object_or_404(Report, id=report_id)
 
@@ -138,24 +198,26 @@ class BulkReportFindingsView(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        created_findings = []
+        # One query for every definition referenced by the payload
+        ids = set()
+        for finding_data in request.data:
+            if isinstance(finding_data, dict):
+                try:
+                    ids.add(int(finding_data.get("vulnerability")))
+                except (TypeError, ValueError):
+                    pass
+        definitions = VulnerabilityDefinition.objects.in_bulk(ids)
+
+        pending = []
         errors = []
 
         for idx, finding_data in enumerate(request.data):
-            serializer = ReportFindingSerializer(data=finding_data)
-            
+            serializer = BulkReportFindingSerializer(
+                data=finding_data, context={"definitions": definitions}
+            )
+
             if serializer.is_valid():
-                finding = serializer.save(report=report)
-                # Refresh with proper relationships
-                finding = (
-                    ReportFinding.objects
-                    .filter(id=finding.id)
-                    .select_related("vulnerability")
-                    .prefetch_related("evidences")
-                    .first()
-                )
-                response_serializer = ReportFindingSerializer(finding)
-                created_findings.append(response_serializer.data)
+                pending.append(ReportFinding(report=report, **serializer.validated_data))
             else:
                 errors.append({
                     "index": idx,
@@ -163,6 +225,33 @@ class BulkReportFindingsView(APIView):
                     "errors": serializer.errors
                 })
 
+        created_findings = []
+        if pending:
+            try:
+                with transaction.atomic():
+                    created = ReportFinding.objects.bulk_create(pending, batch_size=500)
+                    # bulk_create() skips ReportFinding.save(), which keeps these current
+                    Report.objects.filter(pk=report.pk).refresh_finding_counts(touch=True)
+            except IntegrityError:
+                # A definition was deleted after the lookup above; nothing
+                # was inserted
+                return Response(
+                    {"error": "A referenced vulnerability no longer exists; retry the import"},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+            findings = list(
+                ReportFinding.objects
+                .filter(pk__in=[f.pk for f in created])
+                .with_final_values()
+                .select_related("vulnerability__owasp_category")
+                .order_by("id")
+            )
+            for finding in findings:
+                # Just created, so no evidence yet: spare the prefetch query
+                finding._prefetched_objects_cache = {"evidences": finding.evidences.none()}
+            created_findings = ReportFindingSerializer(findings, many=True).data
+
         # If all failed, return error
         if not created_findings:
             return Response(
@@ -280,7 +369,9 @@ class EvidenceListCreateView(APIView):
         serializer = FindingEvidenceSerializer(data=request.data)
 
         if serializer.is_valid():
-            serializer.save(finding_id=finding_id)
+            evidence = serializer.save(finding_id=finding_id)
+            # Downscaled copy for the PDF, built off the request thread
+            schedule_rendition(evidence)
             return Response(serializer.data, status=status.HTTP_201_CREATED)
 
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
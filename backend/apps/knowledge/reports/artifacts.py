@@ -0,0 +1,292 @@
+"""
+Content-addressed cache of rendered report PDFs.
+
+A report's fingerprint hashes everything that ends up in the PDF: the
+report row, its findings, the linked VulnerabilityDefinition rows and
+the evidence files on disk.  Rendered PDFs are stored under that
+fingerprint, so an unchanged report is only ever rendered once and the
+fingerprint doubles as a strong ETag.
+
+Each rendering engine has its own artifacts: the ReportLab builder
+(the default) and the WeasyPrint templates (``engine=html``).
+"""
+
+import hashlib
+import os
+import threading
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows; builds are then only shared within a process
+    fcntl = None
+
+from django.conf import settings
+
+from apps.knowledge.models import ReportFinding, FindingEvidence
+from .pdf_reportlab.build import build_report
+from .pdf_reportlab import build_parallel, fonts
+from .pdf_reportlab.build_parallel import build_report_parallel
+from .pdf_reportlab.build_incremental import build_report_incremental
+from .pdf_reportlab.build_streaming import build_report_streaming
+from .pdf_reportlab.timing import RenderTimings
+from .pdf_html.build import build_report_html
+from .spool import touch
+
+# Bump whenever the PDF layout changes so old artifacts are not served.
+RENDERER_VERSION = "5"
+HTML_RENDERER_VERSION = "1"
+
+ENGINES = ("reportlab", "html")
+DEFAULT_ENGINE = "reportlab"
+
+REPORT_FIELDS = [
+    "id",
+    "client_name",
+    "application_name",
+    "report_type",
+    "target",
+    "tools_used",
+    "test_location",
+    "start_date",
+    "end_date",
+    "prepared_by",
+    "reviewed_by",
+    "approved_by",
+    "status",
+    "created_at",
+]
+
+FINDING_FIELDS = [
+    "id",
+    "title",
+    "severity",
+    "description",
+    "impact",
+    "remediation",
+    "tester_title",
+    "tester_severity",
+    "tester_description",
+    "tester_impact",
+    "tester_remediation",
+    "status",
+    "created_at",
+    "vulnerability_id",
+    "vulnerability__updated_at",
+]
+
+EVIDENCE_FIELDS = [
+    "id",
+    "finding_id",
+    "title",
+    "file",
+    "print_file",
+    "description",
+]
+
+
+def report_fingerprint(report, engine=DEFAULT_ENGINE):
+    """
+    Hash the revision of everything a report PDF is rendered from.
+    Runs two queries on top of the already loaded ``report``.
+    """
+    h = hashlib.sha256()
+    h.update(RENDERER_VERSION.encode())
+    if engine == "html":
+        h.update(f"html:{HTML_RENDERER_VERSION}".encode())
+    h.update(repr(fonts.SIGNATURE).encode())
+
+    created_by = report.created_by.username if report.created_by_id else ""
+    h.update(repr([getattr(report, f) for f in REPORT_FIELDS]).encode())
+    h.update(created_by.encode())
+
+    findings = (
+        ReportFinding.objects
+        .filter(report_id=report.id)
+        .order_by("id")
+        .values_list(*FINDING_FIELDS)
+    )
+    for row in findings:
+        h.update(repr(row).encode())
+
+    evidences = (
+        FindingEvidence.objects
+        .filter(finding__report_id=report.id)
+        .order_by("id")
+        .values_list(*EVIDENCE_FIELDS)
+    )
+    for row in evidences:
+        h.update(repr(row).encode())
+        h.update(repr(_file_stamp(row[4] or row[3])).encode())
+
+    return h.hexdigest()
+
+
+def _file_stamp(name):
+    # Size + mtime catches evidence files replaced in place.
+    try:
+        st = os.stat(os.path.join(settings.MEDIA_ROOT, name))
+    except OSError:
+        return None
+    return (st.st_size, st.st_mtime_ns)
+
+
+# =========================
+# Artifact storage
+# =========================
+
+_build_locks = {}
+_build_locks_guard = threading.Lock()
+
+
+def artifact_path(fingerprint):
+    return os.path.join(settings.REPORT_PDF_CACHE_DIR, f"{fingerprint}.pdf")
+
+
+@contextmanager
+def _file_lock(path):
+    """
+    Hold an exclusive lock on ``path`` (created if missing) against
+    other processes on this host, or on any host for a shared directory
+    that supports flock.  Closing the file releases it, also when the
+    process dies.
+    """
+    if fcntl is None:
+        yield
+        return
+
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        yield
+    finally:
+        os.close(fd)
+
+
+def get_or_build_artifact(fingerprint, build):
+    """
+    Return the path of the cached PDF for ``fingerprint``, calling
+    ``build(path)`` to render it on a miss.  Concurrent requests for the
+    same fingerprint wait on a single in-flight build: threads on a
+    per-process lock, other processes (server workers, render workers)
+    on a ``<fingerprint>.pdf.lock`` file next to the artifact.  Without
+    fcntl (Windows) only the per-process lock applies.
+    """
+    path = artifact_path(fingerprint)
+    if os.path.exists(path):
+        touch(path)
+        return path
+
+    with _build_locks_guard:
+        lock = _build_locks.setdefault(fingerprint, threading.Lock())
+
+    try:
+        with lock:
+            if os.path.exists(path):
+                return path
+
+            os.makedirs(settings.REPORT_PDF_CACHE_DIR, exist_ok=True)
+
+            with _file_lock(f"{path}.lock"):
+                # Another process may have built it while we waited
+                if os.path.exists(path):
+                    return path
+
+                # Render next to the final location and rename, so readers
+                # never see a half-written PDF.
+                tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+                try:
+                    build(tmp_path)
+                    os.replace(tmp_path, path)
+                finally:
+                    if os.path.exists(tmp_path):
+                        os.remove(tmp_path)
+    finally:
+        with _build_locks_guard:
+            if _build_locks.get(fingerprint) is lock:
+                del _build_locks[fingerprint]
+
+    return path
+
+
+# =========================
+# Rendering
+# =========================
+
+def report_pdf_data(report):
+    """
+    Header / cover values passed to every section renderer.
+    """
+    return {
+        "enterprise": report.application_name,
+        "pt_date": report.created_at.strftime("%b %Y") if report.created_at else "N/A",
+        "conducted_by": report.created_by if hasattr(report, "created_by") else "Cyber Team",
+        "version": report.version if hasattr(report, "version") else "1.0",
+        "assessee": report.client_name,
+        "assessor": report.created_by if hasattr(report, "created_by") else "John",
+        "reviewer": "Jane",
+        "approved": "CTO",
+        "total_pages": 8,
+        "start_date": report.start_date.strftime("%d-%b-%Y") if report.start_date else "",
+        "end_date": report.end_date.strftime("%d-%b-%Y") if report.end_date else "",
+        "application_name": report.application_name,
+        "created_by": report.created_by,
+    }
+
+
+def needs_low_memory(report):
+    threshold = settings.REPORT_PDF_LOW_MEMORY_EVIDENCE
+    if not threshold:
+        return False
+    if build_parallel.PdfWriter is None:
+        # The chunked build cannot run; say so instead of quietly
+        # rendering everything in memory under its name.
+        build_parallel.warn_missing_pypdf("REPORT_PDF_LOW_MEMORY_EVIDENCE")
+        return False
+    count = FindingEvidence.objects.filter(finding__report_id=report.id).count()
+    return count >= threshold
+
+
+def render_report_artifact(report, fingerprint=None, snapshot=None, timings=None,
+                           engine=DEFAULT_ENGINE, low_memory=None):
+    """
+    Return the path of the rendered PDF for the current revision of
+    ``report``, rendering it if it is not cached yet.  Pass a preloaded
+    ``snapshot`` to render without touching the database, and a
+    RenderTimings to collect per-section timings of the render.
+    ``engine`` is one of ENGINES; ``fingerprint`` must be for the same
+    engine.  ``low_memory`` says whether to use the chunked build when
+    no snapshot is given; by default needs_low_memory() decides.
+    """
+    if fingerprint is None:
+        fingerprint = report_fingerprint(report, engine)
+    if timings is None:
+        timings = RenderTimings()
+
+    data = report_pdf_data(report)
+    workers = settings.REPORT_PDF_PARALLEL_WORKERS
+
+    def build(out_path):
+        timings.note("cache", "miss")
+
+        if engine == "html":
+            build_report_html(out_path, report, snapshot, timings=timings)
+        elif snapshot is None and (
+            needs_low_memory(report) if low_memory is None else low_memory
+        ):
+            build_report_streaming(out_path, data, report.id, timings=timings)
+        elif settings.REPORT_PDF_INCREMENTAL:
+            build_report_incremental(
+                out_path, data, report.id, snapshot, workers=workers, timings=timings
+            )
+        elif workers > 1:
+            build_report_parallel(
+                out_path, data, report.id, snapshot, workers=workers, timings=timings
+            )
+        else:
+            build_report(out_path, data, report.id, snapshot, timings=timings)
+
+        timings.record(report.id)
+
+    timings.note("cache", "hit")
+    return get_or_build_artifact(fingerprint, build)
@@ -0,0 +1,286 @@
+"""
+Benchmark of the PDF builders on synthetic reports.
+
+Each case creates a report with N findings and up to M generated
+evidence images per finding inside a transaction that is rolled back
+afterwards, renders it with ``build_report`` (or, with
+``engine="html"``, the WeasyPrint templates) and records:
+
+* wall time of the whole build and of every section (plus the time
+  spent loading the snapshot, decoding images and wrapping paragraphs),
+* peak RSS of the process during the build,
+* number of database queries,
+* size of the resulting PDF.
+
+Results are written as JSON so a later run can be compared against a
+saved baseline (see ``manage.py benchmark_pdf``).  The command runs
+inside ``scratch_database``, a throwaway test database like the one
+``manage.py test`` creates, so the synthetic rows and the locks taken
+while rendering never touch the real database.
+"""
+
+import os
+import platform
+import resource
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from io import BytesIO
+
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext, override_settings
+from PIL import Image, ImageDraw
+
+from apps.knowledge.models import Report, ReportFinding, FindingEvidence
+from .artifacts import DEFAULT_ENGINE, report_pdf_data
+from .pdf_html.build import build_report_html
+from .pdf_html.fetcher import media_cache
+from .pdf_reportlab.build import build_report
+from .pdf_reportlab import layout
+from .pdf_reportlab.images import image_cache
+
+DEFAULT_SIZES = (10, 100, 1000)
+DEFAULT_IMAGES = (0, 20)
+
+# Timed by build_report, see pdf_reportlab/timing.py
+SECTIONS = [
+    "cover",
+    "legal",
+    "toc",
+    "scope",
+    "executive_summary",
+    "methodology",
+    "results",
+    "detailed_findings",
+    "conclusion",
+    "save",
+]
+
+# Timed by build_report_html
+HTML_SECTIONS = ["template", "render", "save"]
+
+# Typical screenshot size
+IMAGE_SIZE = (1366, 768)
+
+SEVERITIES = ["CRITICAL", "HIGH", "MEDIUM", "LOW"]
+
+LOREM = (
+    "The application does not validate user supplied input before using it "
+    "in a server side operation, which lets an attacker alter its behaviour. "
+)
+
+
+# =========================
+# Measurements
+# =========================
+
+def _reset_peak_rss():
+    # Linux only: reset VmHWM so each case reports its own peak
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+    except OSError:
+        pass
+
+
+def _peak_rss_kb():
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS, KiB elsewhere
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+# =========================
+# Synthetic data
+# =========================
+
+def _make_image(seed):
+    img = Image.new("RGB", IMAGE_SIZE, (seed * 37 % 256, seed * 91 % 256, 200))
+    draw = ImageDraw.Draw(img)
+    for y in range(0, IMAGE_SIZE[1], 24):
+        draw.text((20, y), f"evidence {seed} line {y // 24} " * 8, fill="black")
+
+    out = BytesIO()
+    img.save(out, "PNG")
+    return out.getvalue()
+
+
+def _create_report(findings, max_images, media_root):
+    report = Report.objects.create(
+        client_name="Benchmark Corp",
+        application_name="Benchmark Portal",
+        report_type="Web Application Security Testing",
+        target="https://benchmark.example",
+        prepared_by="benchmark",
+    )
+
+    rows = ReportFinding.objects.bulk_create([
+        ReportFinding(
+            report=report,
+            tester_title=f"Synthetic finding {i}",
+            tester_severity=SEVERITIES[i % len(SEVERITIES)],
+            tester_description=LOREM * (1 + i % 6),
+            tester_impact=LOREM * (1 + i % 3),
+            tester_remediation=LOREM * 2,
+        )
+        for i in range(findings)
+    ])
+
+    evidence_dir = os.path.join(media_root, "evidence")
+    os.makedirs(evidence_dir, exist_ok=True)
+
+    evidences = []
+    seed = 0
+    for i, finding in enumerate(rows):
+        # Spread 0..max_images images over the findings
+        for _ in range(i % (max_images + 1)):
+            seed += 1
+            name = f"evidence/bench-{seed}.png"
+            with open(os.path.join(media_root, name), "wb") as f:
+                f.write(_make_image(seed))
+            evidences.append(FindingEvidence(
+                finding=finding,
+                title=f"Screenshot {seed}",
+                file=name,
+                description="Request and response showing the issue",
+            ))
+
+    FindingEvidence.objects.bulk_create(evidences)
+    return report, len(evidences)
+
+
+# =========================
+# Runner
+# =========================
+
+def run_case(findings, max_images, repeat=1, engine=DEFAULT_ENGINE):
+    """
+    Benchmark one report size.  With ``repeat`` > 1 the fastest run is
+    reported.  Caches are cleared before every run; the HTML engine's
+    stylesheet and font configuration are kept, like in a worker.
+    """
+    best = None
+
+    with tempfile.TemporaryDirectory(prefix="evidex-bench-") as tmpdir, \
+            override_settings(MEDIA_ROOT=tmpdir):
+
+        with transaction.atomic():
+            report, image_count = _create_report(findings, max_images, tmpdir)
+            report = Report.objects.select_related("created_by").get(id=report.id)
+            data = report_pdf_data(report)
+
+            for run in range(repeat):
+                image_cache.clear()
+                media_cache.clear()
+                layout.clear()
+
+                path = os.path.join(tmpdir, f"report-{run}.pdf")
+
+                _reset_peak_rss()
+                with CaptureQueriesContext(connection) as queries:
+                    started = time.perf_counter()
+                    if engine == "html":
+                        timings = build_report_html(path, report)
+                    else:
+                        timings = build_report(path, data, report.id)
+                    wall = time.perf_counter() - started
+
+                sections = dict(timings.durations)
+                sections.pop("total", None)
+
+                result = {
+                    "engine": engine,
+                    "findings": findings,
+                    "max_images": max_images,
+                    "images": image_count,
+                    "wall_time": round(wall, 4),
+                    "sections": {k: round(v, 4) for k, v in sections.items()},
+                    "peak_rss_kb": _peak_rss_kb(),
+                    "queries": len(queries),
+                    "size_bytes": os.path.getsize(path),
+                }
+
+                if best is None or result["wall_time"] < best["wall_time"]:
+                    best = result
+
+            transaction.set_rollback(True)
+
+    return best
+
+
+@contextmanager
+def scratch_database(keepdb=False):
+    """
+    Point the default connection at a freshly migrated test database
+    for the duration of the block, then drop it (unless ``keepdb``).
+    On PostgreSQL the database user needs the CREATEDB privilege, as
+    for ``manage.py test``.
+    """
+    old_name = connection.settings_dict["NAME"]
+    connection.creation.create_test_db(
+        verbosity=0, autoclobber=True, serialize=False, keepdb=keepdb
+    )
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=keepdb)
+
+
+def case_key(findings, max_images):
+    return f"{findings}x{max_images}"
+
+
+def run_benchmark(sizes=DEFAULT_SIZES, images=DEFAULT_IMAGES, repeat=1, progress=None,
+                  engine=DEFAULT_ENGINE):
+    cases = {}
+
+    for findings in sizes:
+        for max_images in images:
+            key = case_key(findings, max_images)
+            cases[key] = run_case(findings, max_images, repeat=repeat, engine=engine)
+            if progress:
+                progress(key, cases[key])
+
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "repeat": repeat,
+        "engine": engine,
+        "cases": cases,
+    }
+
+
+# Metrics compared against a baseline
+METRICS = ["wall_time", "peak_rss_kb", "queries", "size_bytes"]
+
+
+def compare(baseline, current, tolerance=0.2):
+    """
+    Return a list of regressions: metrics of ``current`` that grew by
+    more than ``tolerance`` (a fraction) over ``baseline``.
+    """
+    regressions = []
+
+    for key, case in current["cases"].items():
+        base = baseline.get("cases", {}).get(key)
+        if base is None:
+            continue
+
+        for metric in METRICS:
+            old, new = base.get(metric), case.get(metric)
+            if not old or new is None:
+                continue
+            if new > old * (1 + tolerance):
+                regressions.append(
+                    f"{key} {metric}: {old} -> {new} (+{(new - old) / old:.0%})"
+                )
+
+    return regressions
@@ -0,0 +1,136 @@
+"""
+Batch export of several reports as one ZIP.
+
+Reports are rendered on a bounded thread pool through the artifact
+cache, so reports that were already exported are not rendered again.
+The ZIP is produced as a stream: each PDF is copied into the archive in
+chunks as soon as its render finishes, in completion order, and nothing
+but the chunk in flight is held in memory.
+
+The fingerprint and snapshot of each report are loaded by the
+streaming thread right before the render is submitted, so worker
+threads render without touching the database.  The exception is a
+report over REPORT_PDF_LOW_MEMORY_EVIDENCE: it gets no snapshot and is
+built in chunks that its worker loads one at a time.
+"""
+
+import io
+import logging
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from django.db import connection
+from django.utils.text import get_valid_filename
+
+from .artifacts import needs_low_memory, render_report_artifact, report_fingerprint
+from .pdf_reportlab.snapshot import ReportSnapshot
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 64 * 1024
+
+
+class _ZipStream(io.RawIOBase):
+    """
+    Write-only sink for ZipFile.  Not seekable, so ZipFile writes data
+    descriptors instead of seeking back to patch local headers.
+    """
+
+    def __init__(self):
+        self._chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, b):
+        self._chunks.append(bytes(b))
+        return len(b)
+
+    def drain(self):
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def export_filename(report):
+    return get_valid_filename(f"VAPT_{report.client_name}_{report.id}.pdf")
+
+
+def _render(report, fingerprint, snapshot):
+    try:
+        return render_report_artifact(
+            report, fingerprint, snapshot, low_memory=snapshot is None
+        )
+    finally:
+        if snapshot is None:
+            # The chunked build queried from this worker thread
+            connection.close()
+
+
+def stream_reports_zip(reports, workers):
+    """
+    Yield the bytes of a ZIP containing one PDF per report.  Reports
+    that fail to render are listed in ``ERRORS.txt`` at the end of the
+    archive instead of aborting the download.
+    """
+    stream = _ZipStream()
+    reports = iter(reports)
+    failed = []
+
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="report-export")
+    pending = {}
+
+    def submit_next():
+        report = next(reports, None)
+        if report is None:
+            return False
+        try:
+            fingerprint = report_fingerprint(report)
+            snapshot = None if needs_low_memory(report) else ReportSnapshot.load(report.id)
+        except Exception:
+            logger.exception("Could not load report %s for export", report.id)
+            failed.append(report)
+            return True
+        future = executor.submit(_render, report, fingerprint, snapshot)
+        pending[future] = report
+        return True
+
+    try:
+        with zipfile.ZipFile(stream, "w", compression=zipfile.ZIP_STORED) as zf:
+
+            # Keep the pool busy without loading every snapshot up front
+            while len(pending) < workers and submit_next():
+                pass
+
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+
+                for future in done:
+                    report = pending.pop(future)
+
+                    try:
+                        path = future.result()
+                    except Exception:
+                        logger.exception("Could not render report %s for export", report.id)
+                        failed.append(report)
+                    else:
+                        # PDFs are already compressed; store them as-is
+                        with zf.open(export_filename(report), "w", force_zip64=True) as dest, \
+                                open(path, "rb") as src:
+                            while chunk := src.read(CHUNK_SIZE):
+                                dest.write(chunk)
+                                yield stream.drain()
+
+                    while len(pending) < workers and submit_next():
+                        pass
+
+            if failed:
+                zf.writestr("ERRORS.txt", "".join(
+                    f"Report {r.id} ({r.client_name}) could not be rendered\n"
+                    for r in failed
+                ))
+
+        yield stream.drain()
+
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,181 @@
+"""
+Database-backed queue for background PDF rendering.
+
+The web tier only inserts ReportRenderJob rows; ``manage.py
+render_worker`` processes claim them with SELECT ... FOR UPDATE SKIP
+LOCKED, so any number of workers on any number of nodes can share the
+queue without handing the same job out twice.
+
+A claimed job is leased to its worker, which refreshes
+``heartbeat_at`` every third of the lease while it renders (see
+Heartbeat); a Running job whose heartbeat is older than the lease
+belongs to a dead worker and is handed out again.  A long render keeps
+its job as long as its worker is alive.
+"""
+
+import os
+import socket
+import threading
+from datetime import timedelta
+
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from apps.knowledge.models import Report, ReportRenderJob
+from .artifacts import artifact_path, report_fingerprint, render_report_artifact
+
+# A Running job whose worker has been silent this long is handed out again.
+DEFAULT_LEASE = timedelta(minutes=15)
+MAX_ATTEMPTS = 3
+
+
+def default_worker_name():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def enqueue_render(report, user=None):
+    """
+    Queue a render for ``report``.  Reuses a job that is still pending
+    and completes immediately when the current revision is already
+    rendered.
+    """
+    pending = (
+        ReportRenderJob.objects
+        .filter(report=report, status__in=["Queued", "Running"])
+        .order_by("created_at")
+        .first()
+    )
+    if pending:
+        return pending
+
+    fingerprint = report_fingerprint(report)
+    if os.path.exists(artifact_path(fingerprint)):
+        now = timezone.now()
+        return ReportRenderJob.objects.create(
+            report=report,
+            requested_by=user,
+            status="Done",
+            fingerprint=fingerprint,
+            started_at=now,
+            finished_at=now,
+        )
+
+    return ReportRenderJob.objects.create(report=report, requested_by=user)
+
+
+def _lease_expired(stale_before):
+    # Jobs claimed before heartbeats existed only have started_at
+    return Q(heartbeat_at__lt=stale_before) | Q(
+        heartbeat_at__isnull=True, started_at__lt=stale_before
+    )
+
+
+class Heartbeat:
+    """
+    Keep a claimed job's lease while it runs: a background thread
+    refreshes ``heartbeat_at`` every ``interval`` seconds until the
+    block exits.
+    """
+
+    def __init__(self, job, interval):
+        self.job_id = job.id
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name=f"render-job-{job.id}-heartbeat", daemon=True
+        )
+
+    def _run(self):
+        try:
+            while not self._stop.wait(self.interval):
+                ReportRenderJob.objects.filter(
+                    pk=self.job_id, status="Running"
+                ).update(heartbeat_at=timezone.now())
+        finally:
+            connection.close()
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+
+
+def claim_next_job(worker_name, lease=DEFAULT_LEASE):
+    """
+    Atomically take the oldest runnable job, or return None.
+    """
+    now = timezone.now()
+    stale_before = now - lease
+
+    with transaction.atomic():
+        # A job whose worker died mid-render (OOM, segfault) never gets
+        # to record a failure; give up on it once it used every attempt.
+        ReportRenderJob.objects.filter(
+            _lease_expired(stale_before),
+            status="Running",
+            attempts__gte=MAX_ATTEMPTS,
+        ).update(status="Failed", error="Worker lost", finished_at=now)
+
+        job = (
+            ReportRenderJob.objects
+            .select_for_update(skip_locked=True)
+            .filter(
+                Q(status="Queued")
+                | (
+                    Q(status="Running", attempts__lt=MAX_ATTEMPTS)
+                    & _lease_expired(stale_before)
+                )
+            )
+            .order_by("created_at")
+            .first()
+        )
+        if job is None:
+            return None
+
+        job.status = "Running"
+        job.attempts += 1
+        job.worker = worker_name
+        job.started_at = job.heartbeat_at = timezone.now()
+        job.save(update_fields=["status", "attempts", "worker", "started_at", "heartbeat_at"])
+
+    return job
+
+
+def run_job(job, lease=DEFAULT_LEASE):
+    """
+    Render the report for a claimed job and record the outcome.  The
+    job's heartbeat is kept up for ``lease`` while it renders.
+    """
+    try:
+        report = Report.objects.select_related("created_by").get(id=job.report_id)
+        fingerprint = report_fingerprint(report)
+        with Heartbeat(job, lease.total_seconds() / 3):
+            render_report_artifact(report, fingerprint)
+    except Report.DoesNotExist:
+        # The report was deleted meanwhile, usually taking this job row
+        # with it; update() leaves nothing behind if so.
+        job.status = "Failed"
+        job.error = "Report deleted"
+        job.finished_at = timezone.now()
+        ReportRenderJob.objects.filter(pk=job.pk).update(
+            status=job.status, error=job.error, finished_at=job.finished_at
+        )
+        return job
+    except Exception as exc:
+        job.error = f"{type(exc).__name__}: {exc}"
+        # Leave it queued for another attempt unless it keeps failing.
+        job.status = "Failed" if job.attempts >= MAX_ATTEMPTS else "Queued"
+        job.finished_at = timezone.now()
+        job.save(update_fields=["status", "error", "finished_at"])
+        return job
+
+    job.status = "Done"
+    job.fingerprint = fingerprint
+    job.error = ""
+    job.finished_at = timezone.now()
+    job.save(update_fields=["status", "fingerprint", "error", "finished_at"])
+    return job
@@ -0,0 +1,106 @@
+"""
+HTML rendering engine: the report templates through WeasyPrint.
+
+An alternative to the ReportLab builder, selected with ``engine=html``
+on the PDF export.  It renders from the same ReportSnapshot, so both
+engines can be compared on the same data (see benchmark.py).
+
+What does not change between renders is built once per worker thread:
+the font configuration and the stylesheet, parsed from
+``reports/report.css`` into a ``CSS`` object instead of from a
+``<style>`` block on every render.  Evidence images are served from
+local disk by ``media_url_fetcher``.
+
+WeasyPrint is imported on first use, so the rest of the app works on
+machines without its native libraries.
+"""
+
+import threading
+from collections import Counter
+
+from django.template.loader import render_to_string
+
+from ..pdf_reportlab.detailed_findings import select_findings
+from ..pdf_reportlab.snapshot import ReportSnapshot
+from ..pdf_reportlab.timing import RenderTimings, activate
+from .fetcher import BASE_URL, media_url_fetcher
+
+_local = threading.local()
+
+
+def _resources():
+    """
+    Return the (font_config, stylesheets) of this thread.
+    """
+    resources = getattr(_local, "resources", None)
+    if resources is None:
+        from weasyprint import CSS
+        from weasyprint.text.fonts import FontConfiguration
+
+        font_config = FontConfiguration()
+        stylesheets = [
+            CSS(
+                string=render_to_string("reports/report.css"),
+                font_config=font_config,
+            ),
+        ]
+        resources = _local.resources = (font_config, stylesheets)
+    return resources
+
+
+def clear():
+    _local.resources = None
+
+
+def report_context(report, snapshot):
+    findings = select_findings(snapshot)
+    # Case-insensitive, like the report counters and severity_rank
+    severities = Counter((f.final_severity or "").upper() for f in findings)
+
+    return {
+        "report": report,
+        "summary": {
+            "severity": {
+                "critical": severities["CRITICAL"],
+                "high": severities["HIGH"],
+                "medium": severities["MEDIUM"],
+                "low": severities["LOW"],
+            }
+        },
+        "findings": findings,
+        "action_plan": {"severity_count": dict(severities)},
+        "is_pdf": True,
+        "external_stylesheets": True,
+    }
+
+
+def build_report_html(path, report, snapshot=None, timings=None):
+    from weasyprint import HTML
+
+    if timings is None:
+        timings = RenderTimings()
+
+    with activate(timings), timings.section("total"):
+
+        if snapshot is None:
+            with timings.section("snapshot"):
+                snapshot = ReportSnapshot.load(report.id)
+
+        font_config, stylesheets = _resources()
+
+        with timings.section("template"):
+            html = render_to_string(
+                "reports/cover.html", report_context(report, snapshot)
+            )
+
+        with timings.section("render"):
+            document = HTML(
+                string=html,
+                base_url=BASE_URL,
+                url_fetcher=media_url_fetcher,
+            ).render(stylesheets=stylesheets, font_config=font_config)
+
+        with timings.section("save"):
+            document.write_pdf(path)
+
+    return timings
@@ -0,0 +1,134 @@
+"""
+URL fetcher for WeasyPrint that reads report media from local disk.
+
+The report templates reference evidence by its ``/media/`` URL.  Left
+to WeasyPrint's default fetcher those would be requested over HTTP from
+the server that is doing the rendering; instead they are mapped onto
+MEDIA_ROOT and read from disk.  The bytes are kept in a process-wide
+cache keyed by path plus mtime and size, bounded by total size, so the
+same screenshot is read once per worker however often it is exported.
+
+Only media and ``data:`` URLs are served.  Anything else would let
+report content make the server fetch arbitrary URLs, so it is refused.
+"""
+
+import mimetypes
+import os
+import threading
+from collections import OrderedDict
+from urllib.parse import unquote, urlsplit
+
+from django.conf import settings
+
+# Never requested: it only gives relative /media/ URLs a scheme and host
+BASE_URL = "http://evidex.invalid/"
+
+DEFAULT_MAX_BYTES = 128 * 1024 * 1024
+
+
+class MediaCache:
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # key -> bytes
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+    def read(self, path):
+        """
+        Return the contents of ``path``.  Raises OSError when the file
+        is missing.
+        """
+        st = os.stat(path)
+        key = (path, st.st_mtime_ns, st.st_size)
+
+        with self._lock:
+            data = self._entries.get(key)
+            if data is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return data
+            self.misses += 1
+
+        with open(path, "rb") as f:
+            data = f.read()
+
+        if len(data) > self.max_bytes:
+            return data
+
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= len(old)
+
+            self._entries[key] = data
+            self._bytes += len(data)
+
+            while self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+
+        return data
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+media_cache = MediaCache()
+
+
+def media_path(url):
+    """
+    Return the file under MEDIA_ROOT that ``url`` points to, or None if
+    it is not a media URL of this renderer.
+    """
+    parts = urlsplit(url)
+    base = urlsplit(BASE_URL)
+
+    if parts.scheme == "file":
+        path = unquote(parts.path)
+    elif (parts.scheme, parts.netloc) == (base.scheme, base.netloc):
+        if not parts.path.startswith(settings.MEDIA_URL):
+            return None
+        relative = unquote(parts.path[len(settings.MEDIA_URL):])
+        path = os.path.join(settings.MEDIA_ROOT, relative)
+    else:
+        return None
+
+    root = os.path.realpath(settings.MEDIA_ROOT)
+    path = os.path.realpath(path)
+    # Stay inside MEDIA_ROOT, whatever ".." the URL contains
+    if os.path.commonpath([root, path]) != root:
+        return None
+    return path
+
+
+def media_url_fetcher(url, timeout=10, ssl_context=None):
+    if url.startswith("data:"):
+        from weasyprint import default_url_fetcher
+        return default_url_fetcher(url, timeout=timeout, ssl_context=ssl_context)
+
+    path = media_path(url)
+    if path is None:
+        raise ValueError(f"Refusing to fetch {url} while rendering a report")
+
+    mime_type, _ = mimetypes.guess_type(path)
+    return {
+        "string": media_cache.read(path),
+        "mime_type": mime_type or "application/octet-stream",
+        "redirected_url": url,
+    }
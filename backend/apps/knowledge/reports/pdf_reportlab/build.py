@@ -1,6 +1,5 @@
 from reportlab.lib.pagesizes import A4
 from reportlab.pdfgen import canvas
-from io import BytesIO
 
 from .cover import draw_cover
 from .legal import draw_legal
@@ -11,108 +10,81 @@ from .methodology import draw_methodology
 from .results import draw_results
 from .detailed_findings import draw_detailed_findings
 from .conclusion import draw_conclusion
+from .pagination import resolve_page_labels
+from .snapshot import ReportSnapshot
+from .timing import RenderTimings, activate
 
 
-def build_report(path, data, report_id):
+def build_report(path, data, report_id, snapshot=None, timings=None):
 
     # =========================
-    # FIRST PASS (calculate pages)
+    # SINGLE PASS
+    # "Page X of Y" and TOC page numbers are drawn as
+    # placeholders and resolved after the last page.
     # =========================
 
-    buffer = BytesIO()
-    c = canvas.Canvas(buffer, pagesize=A4)
+    if timings is None:
+        timings = RenderTimings()
 
-    page_no = 1
-    section_pages = {}
+    with activate(timings), timings.section("total"):
 
-    section_pages["cover"] = page_no
-    draw_cover(c, data, page_no, 0)
-    c.showPage()
-    page_no += 1
+        if snapshot is None:
+            with timings.section("snapshot"):
+                snapshot = ReportSnapshot.load(report_id)
 
-    section_pages["legal"] = page_no
-    draw_legal(c, data, page_no, 0)
-    c.showPage()
-    page_no += 1
+        c = canvas.Canvas(path, pagesize=A4)
+        section_pages = {}
 
-    section_pages["toc"] = page_no
-    c.showPage()
-    page_no += 1
+        section_pages["cover"] = c.getPageNumber()
+        with timings.section("cover"):
+            draw_cover(c, data, c.getPageNumber())
+            c.showPage()
 
-    section_pages["scope"] = page_no
-    draw_scan_manifest(c, data, page_no, 0)
-    c.showPage()
-    page_no += 1
+        section_pages["legal"] = c.getPageNumber()
+        with timings.section("legal"):
+            draw_legal(c, data, c.getPageNumber())
+            c.showPage()
 
-    section_pages["executive_summary"] = page_no
-    draw_executive_summary(c, data, page_no, 0)
-    c.showPage()
-    page_no += 1
+        section_pages["toc"] = c.getPageNumber()
+        with timings.section("toc"):
+            draw_toc(c, data, c.getPageNumber(), None)
+            c.showPage()
 
-    section_pages["methodology"] = page_no
-    draw_methodology(c, data, page_no, 0)
-    c.showPage()
-    page_no += 1
+        section_pages["scope"] = c.getPageNumber()
+        with timings.section("scope"):
+            draw_scan_manifest(c, data, c.getPageNumber(), None)
+            c.showPage()
 
-    section_pages["results"] = page_no
-    draw_results(c, data, report_id, page_no, 0)
-    c.showPage()
-    page_no += 1
+        section_pages["executive_summary"] = c.getPageNumber()
+        with timings.section("executive_summary"):
+            draw_executive_summary(c, data, c.getPageNumber(), None)
+            c.showPage()
 
-    section_pages["detailed_findings"] = page_no
-    page_no = draw_detailed_findings(
-        c, data, report_id, start_page_no=page_no, total_pages=0
-    )
+        section_pages["methodology"] = c.getPageNumber()
+        with timings.section("methodology"):
+            draw_methodology(c, data, c.getPageNumber(), None)
+            c.showPage()
 
-    section_pages["conclusion"] = page_no
-    draw_conclusion(c, data, page_no, 0)
-    c.showPage()
-    page_no += 1
+        section_pages["results"] = c.getPageNumber()
+        with timings.section("results"):
+            draw_results(c, data, snapshot, c.getPageNumber(), None)
+            c.showPage()
 
-    total_pages = page_no - 1
+        section_pages["detailed_findings"] = c.getPageNumber()
+        with timings.section("detailed_findings"):
+            draw_detailed_findings(
+                c, data, snapshot, start_page_no=c.getPageNumber(), total_pages=None
+            )
 
-    c.save()
+        section_pages["conclusion"] = c.getPageNumber()
+        with timings.section("conclusion"):
+            draw_conclusion(c, data, c.getPageNumber(), None)
+            c.showPage()
 
-    # =========================
-    # SECOND PASS (final render)
-    # =========================
-
-    c = canvas.Canvas(path, pagesize=A4)
-    page_no = 1
-
-    draw_cover(c, data, page_no, total_pages)
-    c.showPage()
-    page_no += 1
-
-    draw_legal(c, data, page_no, total_pages)
-    c.showPage()
-    page_no += 1
-
-    draw_toc(c, data, page_no, total_pages, section_pages)
-    c.showPage()
-    page_no += 1
-
-    draw_scan_manifest(c, data, page_no, total_pages)
-    c.showPage()
-    page_no += 1
-
-    draw_executive_summary(c, data, page_no, total_pages)
-    c.showPage()
-    page_no += 1
-
-    draw_methodology(c, data, page_no, total_pages)
-    c.showPage()
-    page_no += 1
-
-    draw_results(c, data, report_id, page_no, total_pages)
-    c.showPage()
-    page_no += 1
-
-    page_no = draw_detailed_findings(
-        c, data, report_id, start_page_no=page_no, total_pages=total_pages
-    )
+        total_pages = c.getPageNumber() - 1
 
-    draw_conclusion(c, data, page_no, total_pages)
-    c.showPage()
+        with timings.section("save"):
+            resolve_page_labels(c, total_pages, section_pages)
+            c.save()
 
-    c.save()
\ No newline at end of file
+    return timings
@@ -0,0 +1,294 @@
+"""
+Incremental build mode.
+
+Every detailed finding starts on a fresh page, so the findings section
+can be cut into one fragment per finding.  A fragment is the rendered
+PDF of that finding's pages plus the deferred placements recorded while
+drawing it (see build_parallel.py), stored on disk under a fingerprint
+of everything that ends up on those pages: ``<key>.pdf`` and a
+``<key>.json`` sidecar with the page count and placements.
+
+On a rebuild only the findings whose fingerprint changed are laid out
+again; the rest are read straight from the fragment store.  The short
+front matter, results table and conclusion are always redrawn, and page
+labels, TOC entries and finding numbers are stamped for the whole
+document at the end.  A fragment does not depend on its position (bar
+the section heading above the first finding), so inserting, removing or
+growing a finding only re-renders that finding.
+
+Needs ``pypdf``, like the parallel build.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+from concurrent.futures.process import BrokenProcessPool
+
+from django.conf import settings
+
+from . import build_parallel, fonts
+from .build import build_report
+from .build_parallel import discard_pool, get_pool, render_part, stitch_parts
+from .detailed_findings import (
+    MARGIN,
+    EVIDENCE_IMAGE_WIDTH,
+    EVIDENCE_IMAGE_HEIGHT,
+    select_findings,
+)
+from .snapshot import ReportSnapshot
+from .timing import RenderTimings, activate
+
+logger = logging.getLogger(__name__)
+
+# Bump whenever the detailed findings layout changes.
+FRAGMENT_VERSION = "4"
+
+GEOMETRY = (MARGIN, EVIDENCE_IMAGE_WIDTH, EVIDENCE_IMAGE_HEIGHT)
+
+
+def _file_stamp(path):
+    if not path:
+        return None
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_size, st.st_mtime_ns)
+
+
+def finding_fingerprint(finding, index, data):
+    """
+    Hash everything drawn on the pages of one finding: its final_*
+    values, status, evidence (including the files on disk), whether it
+    opens the section, the page chrome and the fonts.  Its number is
+    stamped at stitch time and not part of the key.
+    """
+    h = hashlib.sha256()
+    h.update(repr((
+        FRAGMENT_VERSION,
+        GEOMETRY,
+        fonts.SIGNATURE,
+        index == 1,
+        data.get("application_name"),
+        data.get("version"),
+        finding.status,
+        finding.final_title,
+        finding.final_severity,
+        finding.final_description,
+        finding.final_impact,
+        finding.final_remediation,
+    )).encode())
+
+    for ev in finding.evidences:
+        h.update(repr((
+            ev.id, ev.title, ev.description, ev.path, _file_stamp(ev.path),
+        )).encode())
+
+    return h.hexdigest()
+
+
+def fragment_dir():
+    return settings.REPORT_PDF_FRAGMENT_DIR
+
+
+def _fragment_paths(key):
+    base = os.path.join(fragment_dir(), key)
+    return f"{base}.pdf", f"{base}.json"
+
+
+def _color_to_json(color):
+    # Colour objects may not survive a ReportLab upgrade; store plain
+    # values that canvas.setFillColor() accepts as they are.
+    if isinstance(color, (tuple, list)):
+        return list(color)
+    return "#%02x%02x%02x" % tuple(round(v * 255) for v in color.rgb())
+
+
+def _load_fragment(key):
+    """
+    Return (page_count, placements, pdf_path), or None on a miss.
+    Loading touches both files, which keeps them out of the next sweep
+    (see spool.EVICTION_GRACE_SECONDS) while the report is stitched.
+    """
+    pdf_path, meta_path = _fragment_paths(key)
+    try:
+        with open(meta_path) as f:
+            meta = json.load(f)
+        if not os.path.exists(pdf_path):
+            return None
+        placements = [tuple(p) for p in meta["placements"]]
+        page_count = int(meta["page_count"])
+    except FileNotFoundError:
+        return None
+    except (ValueError, KeyError, TypeError):
+        # Truncated or from an older format; render it again
+        logger.warning("Discarding unreadable PDF fragment %s", meta_path)
+        return None
+
+    for path in (pdf_path, meta_path):
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+    return page_count, placements, pdf_path
+
+
+def _replace(path, write):
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        write(tmp_path)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def _store_fragment(key, page_count, placements, pdf_path):
+    os.makedirs(fragment_dir(), exist_ok=True)
+
+    placements = [
+        (page_no, name, x, y, font_name, font_size, _color_to_json(color), align)
+        for page_no, name, x, y, font_name, font_size, color, align in placements
+    ]
+
+    def write_pdf(path):
+        shutil.copyfile(pdf_path, path)
+
+    def write_meta(path):
+        with open(path, "w") as f:
+            json.dump({"page_count": page_count, "placements": placements}, f)
+
+    # The sidecar goes last: a fragment is only complete once it exists
+    fragment_pdf, fragment_meta = _fragment_paths(key)
+    _replace(fragment_pdf, write_pdf)
+    _replace(fragment_meta, write_meta)
+
+    return page_count, placements, fragment_pdf
+
+
+def _render_dirty(dirty, fragments, tmpdir, data, report_id, workers):
+    """
+    Lay out the ``dirty`` findings, on the pool when there are several,
+    and store them as fragments.
+    """
+    if not dirty:
+        return
+
+    jobs = [
+        (key, os.path.join(tmpdir, f"finding-{idx:04d}.pdf"),
+         {"findings": [f], "start_index": idx})
+        for idx, f, key in dirty
+    ]
+
+    rendered = None
+    if workers and workers > 1 and len(jobs) > 1:
+        pool = get_pool(workers)
+        try:
+            futures = [
+                pool.submit(render_part, "findings", out_path, data, **kwargs)
+                for _, out_path, kwargs in jobs
+            ]
+            rendered = [f.result() for f in futures]
+        except BrokenProcessPool:
+            logger.warning(
+                "Render worker died building report %s; restarting the "
+                "pool and rendering its fragments in-process", report_id,
+            )
+            discard_pool(pool)
+    if rendered is None:
+        rendered = [
+            render_part("findings", out_path, data, **kwargs)
+            for _, out_path, kwargs in jobs
+        ]
+
+    for (key, out_path, _), (page_count, placements, _) in zip(jobs, rendered):
+        fragments[key] = _store_fragment(key, page_count, placements, out_path)
+
+
+def build_report_incremental(path, data, report_id, snapshot=None, workers=None,
+                             timings=None):
+    """
+    Build the report reusing cached finding fragments.  Returns
+    ``(fragments, rendered)``: the number of findings in the report and
+    how many of them had to be laid out again.
+    """
+    if timings is None:
+        timings = RenderTimings()
+
+    with activate(timings), timings.section("total"):
+        return _build(path, data, report_id, snapshot, workers, timings)
+
+
+def _build(path, data, report_id, snapshot, workers, timings):
+    if snapshot is None:
+        with timings.section("snapshot"):
+            snapshot = ReportSnapshot.load(report_id)
+
+    if build_parallel.PdfWriter is None:
+        build_parallel.warn_missing_pypdf("REPORT_PDF_INCREMENTAL")
+        build_report(path, data, report_id, snapshot, timings=timings)
+        findings = select_findings(snapshot)
+        return len(findings), len(findings)
+
+    findings = select_findings(snapshot)
+
+    with timings.section("fragments"):
+        keys = [
+            finding_fingerprint(f, idx, data)
+            for idx, f in enumerate(findings, start=1)
+        ]
+
+        fragments = {}
+        for key in keys:
+            if key not in fragments:
+                fragments[key] = _load_fragment(key)
+
+    # Identical findings share a fragment; lay each one out once
+    dirty = []
+    queued = set()
+    for idx, (f, key) in enumerate(zip(findings, keys), start=1):
+        if fragments[key] is None and key not in queued:
+            queued.add(key)
+            dirty.append((idx, f, key))
+
+    with tempfile.TemporaryDirectory(prefix="evidex-fragments-") as tmpdir:
+
+        # Lay out the changed findings
+        with timings.section("detailed_findings"):
+            _render_dirty(dirty, fragments, tmpdir, data, report_id, workers)
+
+        # Everything outside the findings section is cheap; always redraw
+        kinds = ["front", "results"]
+        part_paths = [
+            os.path.join(tmpdir, "front.pdf"),
+            os.path.join(tmpdir, "results.pdf"),
+        ]
+        with timings.section("front_matter"):
+            results = [render_part("front", part_paths[0], data)]
+        with timings.section("results"):
+            results.append(render_part("results", part_paths[1], data, snapshot=snapshot))
+
+        for key in keys:
+            page_count, placements, fragment_path = fragments[key]
+            kinds.append("findings")
+            part_paths.append(fragment_path)
+            results.append((page_count, placements, {}))
+
+        kinds.append("conclusion")
+        part_paths.append(os.path.join(tmpdir, "conclusion.pdf"))
+        with timings.section("conclusion"):
+            results.append(render_part("conclusion", part_paths[-1], data))
+
+        # Fragments are read one at a time and written straight out
+        with timings.section("stitch"):
+            stitch_parts(path, kinds, part_paths, results, streaming=True)
+
+    logger.info(
+        "Report %s: re-rendered %d of %d finding fragments",
+        report_id, len(dirty), len(findings),
+    )
+    return len(findings), len(dirty)
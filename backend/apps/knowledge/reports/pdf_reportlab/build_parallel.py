@@ -0,0 +1,323 @@
+"""
+Parallel build mode.
+
+The report is split into parts (front matter, results, chunks of
+detailed findings, conclusion) that are rendered as separate PDFs in a
+process pool and then concatenated.  Parts draw their page labels and
+TOC entries as empty deferred forms (see pagination.py) and record
+where they were placed; once every part's page count is known, the
+real values are stamped onto the merged pages.  Finding numbers are
+deferred the same way, so a part's pages do not depend on how many
+findings come before it.
+
+Merging needs ``pypdf`` (a locked dependency).  Without it, or for
+small reports, ``build_report_parallel`` falls back to the
+single-process ``build_report``; a missing pypdf is logged once.
+"""
+
+import logging
+import os
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from io import BytesIO
+
+from reportlab.lib.pagesizes import A4
+from reportlab.pdfgen import canvas
+
+try:
+    from pypdf import PdfReader, PdfWriter
+    from .concat import StreamingPdfWriter
+except ImportError:  # broken install; see warn_missing_pypdf
+    PdfReader = PdfWriter = StreamingPdfWriter = None
+
+from .build import build_report
+from .cover import draw_cover
+from .legal import draw_legal
+from .toc import draw_toc
+from .scan_manifest import draw_scan_manifest
+from .executive_summary import draw_executive_summary
+from .methodology import draw_methodology
+from .results import draw_results
+from .detailed_findings import draw_detailed_findings, select_findings
+from .conclusion import draw_conclusion
+from .pagination import (
+    FINDING_NUMBER_PREFIX,
+    deferred_placements,
+    draw_aligned_string,
+    finding_number_form,
+    page_label_values,
+    resolve_deferred,
+)
+from .snapshot import ReportSnapshot
+from .timing import RenderTimings, activate
+
+logger = logging.getLogger(__name__)
+
+FINDINGS_PER_CHUNK = 25
+
+# Below this many findings the process pool costs more than it saves.
+MIN_PARALLEL_FINDINGS = 2 * FINDINGS_PER_CHUNK
+
+_pool = None
+_pool_workers = None
+_pool_lock = threading.Lock()
+
+
+_warned_missing = set()
+
+
+def warn_missing_pypdf(feature):
+    """
+    Log, once per process and feature, that ``feature`` is configured
+    but falls back to the regular build because pypdf is not installed.
+    """
+    if feature not in _warned_missing:
+        _warned_missing.add(feature)
+        logger.warning(
+            "%s is enabled but pypdf is not installed; using the regular "
+            "single-process build instead", feature,
+        )
+
+
+def _init_worker():
+    # Needed when the pool spawns instead of forking.  Workers never
+    # touch the database; everything arrives pickled.
+    import django
+    django.setup()
+
+
+def get_pool(workers):
+    global _pool, _pool_workers
+
+    with _pool_lock:
+        if _pool is None or _pool_workers != workers:
+            if _pool is not None:
+                _pool.shutdown(wait=False)
+            _pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker)
+            _pool_workers = workers
+        return _pool
+
+
+def discard_pool(pool):
+    """
+    Forget ``pool`` after one of its workers died (``BrokenProcessPool``)
+    so the next build starts a fresh one.  A broken executor never
+    recovers on its own.
+    """
+    global _pool, _pool_workers
+
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+            _pool_workers = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+# =========================
+# Worker side
+# =========================
+
+def render_part(kind, out_path, data, snapshot=None, findings=None, start_index=1):
+    """
+    Render one part with local page numbers.  Returns
+    (page_count, placements, local_section_pages).
+    """
+    c = canvas.Canvas(out_path, pagesize=A4)
+    section_pages = {}
+
+    if kind == "front":
+        for section, draw in [
+            ("cover", draw_cover),
+            ("legal", draw_legal),
+            ("toc", None),
+            ("scope", draw_scan_manifest),
+            ("executive_summary", draw_executive_summary),
+            ("methodology", draw_methodology),
+        ]:
+            section_pages[section] = c.getPageNumber()
+            if draw is None:
+                draw_toc(c, data, c.getPageNumber(), None)
+            else:
+                draw(c, data, c.getPageNumber(), None)
+            c.showPage()
+
+    elif kind == "results":
+        draw_results(c, data, snapshot, c.getPageNumber(), None)
+        c.showPage()
+
+    elif kind == "findings":
+        draw_detailed_findings(
+            c, data, None, start_page_no=c.getPageNumber(), total_pages=None,
+            findings=findings, start_index=start_index, defer_numbers=True,
+        )
+
+    elif kind == "conclusion":
+        draw_conclusion(c, data, c.getPageNumber(), None)
+        c.showPage()
+
+    page_count = c.getPageNumber() - 1
+    placements = list(deferred_placements(c))
+
+    # Placeholders stay empty; the parent stamps the real values.
+    resolve_deferred(c, {})
+    c.save()
+
+    return page_count, placements, section_pages
+
+
+# =========================
+# Parent side
+# =========================
+
+def _plan_parts(snapshot, findings):
+    parts = [
+        ("front", {}),
+        ("results", {"snapshot": snapshot}),
+    ]
+
+    for start in range(0, len(findings), FINDINGS_PER_CHUNK):
+        parts.append(("findings", {
+            "findings": findings[start:start + FINDINGS_PER_CHUNK],
+            "start_index": start + 1,
+        }))
+
+    parts.append(("conclusion", {}))
+    return parts
+
+
+def _stamp_pdf(stamps, total_pages):
+    """
+    One overlay page per stamped page.  ``stamps`` maps a global page
+    number to a list of (x, y, font, size, color, align, text).
+    """
+    buffer = BytesIO()
+    c = canvas.Canvas(buffer, pagesize=A4)
+    index = {}
+
+    for page_no in sorted(stamps):
+        index[page_no] = len(index)
+        for x, y, font_name, font_size, color, align, text in stamps[page_no]:
+            c.setFont(font_name, font_size)
+            c.setFillColor(color)
+            draw_aligned_string(c, x, y, text, align)
+        c.showPage()
+
+    c.save()
+    buffer.seek(0)
+    return PdfReader(buffer), index
+
+
+def stitch_parts(path, kinds, part_paths, results, streaming=False):
+    """
+    Concatenate rendered parts into ``path`` and stamp global page
+    labels and TOC entries.  ``kinds`` and ``results`` are in document
+    order; the first part must be the front matter.  With ``streaming``
+    pages are written out as they are copied (see concat.py) instead of
+    being collected in a PdfWriter.
+    """
+    # Global page numbers
+    offsets = []
+    total_pages = 0
+    for page_count, _, _ in results:
+        offsets.append(total_pages)
+        total_pages += page_count
+
+    def first_page_of(kind):
+        return offsets[kinds.index(kind)] + 1
+
+    section_pages = dict(results[0][2])
+    section_pages["results"] = first_page_of("results")
+    section_pages["conclusion"] = first_page_of("conclusion")
+    section_pages["detailed_findings"] = (
+        first_page_of("findings") if "findings" in kinds
+        else section_pages["conclusion"]
+    )
+
+    stamps = {}
+    findings_before = 0
+    for offset, (page_count, placements, _) in zip(offsets, results):
+        values = page_label_values(
+            total_pages, section_pages, page_offset=offset, page_count=page_count
+        )
+        # One number per finding in the part, in drawing order
+        numbered = sum(1 for p in placements if p[1].startswith(FINDING_NUMBER_PREFIX))
+        for position in range(1, numbered + 1):
+            values[finding_number_form(position)] = findings_before + position
+        findings_before += numbered
+
+        for page_no, name, x, y, font_name, font_size, color, align in placements:
+            stamps.setdefault(offset + page_no, []).append(
+                (x, y, font_name, font_size, color, align, str(values.get(name, "")))
+            )
+
+    stamp_reader, stamp_index = _stamp_pdf(stamps, total_pages)
+
+    def stamped_pages():
+        page_no = 0
+        for part_path in part_paths:
+            for page in PdfReader(part_path).pages:
+                page_no += 1
+                if page_no in stamp_index:
+                    page.merge_page(stamp_reader.pages[stamp_index[page_no]])
+                yield page
+
+    with open(path, "wb") as f:
+        if streaming:
+            writer = StreamingPdfWriter(f)
+            for page in stamped_pages():
+                writer.add_page(page)
+            writer.close()
+        else:
+            writer = PdfWriter()
+            for page in stamped_pages():
+                writer.add_page(page)
+            writer.write(f)
+
+
+def build_report_parallel(path, data, report_id, snapshot=None, workers=None, timings=None):
+    if timings is None:
+        timings = RenderTimings()
+
+    with activate(timings), timings.section("total"):
+        if snapshot is None:
+            with timings.section("snapshot"):
+                snapshot = ReportSnapshot.load(report_id)
+
+        workers = workers or os.cpu_count() or 1
+        findings = select_findings(snapshot)
+
+        if PdfWriter is None and workers > 1:
+            warn_missing_pypdf("REPORT_PDF_PARALLEL_WORKERS")
+        if PdfWriter is None or workers < 2 or len(findings) < MIN_PARALLEL_FINDINGS:
+            return build_report(path, data, report_id, snapshot, timings=timings)
+
+        parts = _plan_parts(snapshot, findings)
+        pool = get_pool(workers)
+
+        with tempfile.TemporaryDirectory(prefix="evidex-parts-") as tmpdir:
+            part_paths = [
+                os.path.join(tmpdir, f"part-{i:04d}.pdf") for i in range(len(parts))
+            ]
+            try:
+                with timings.section("parts"):
+                    futures = [
+                        pool.submit(render_part, kind, part_path, data, **kwargs)
+                        for (kind, kwargs), part_path in zip(parts, part_paths)
+                    ]
+                    results = [f.result() for f in futures]
+            except BrokenProcessPool:
+                # A worker died (e.g. OOM-killed); this report is built
+                # serially and the next one gets a new pool
+                logger.warning(
+                    "Render worker died building report %s; restarting the pool "
+                    "and building it in-process", report_id,
+                )
+                discard_pool(pool)
+                return build_report(path, data, report_id, snapshot, timings=timings)
+
+            with timings.section("stitch"):
+                stitch_parts(path, [kind for kind, _ in parts], part_paths, results)
+
+    return timings
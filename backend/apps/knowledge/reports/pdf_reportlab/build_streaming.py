@@ -0,0 +1,82 @@
+"""
+Low-memory build mode.
+
+A ReportLab canvas keeps every page, and every embedded image, in
+memory until ``save()``, and a full ReportSnapshot holds the evidence
+of every finding.  For reports with thousands of screenshots that puts
+a worker past its memory limit.
+
+This mode streams the findings from the database without evidence,
+then renders the detailed findings in chunks: each chunk loads its own
+evidence, is drawn into its own PDF on disk and is released before the
+next one.  The parts are concatenated with StreamingPdfWriter (see
+concat.py) and page labels and TOC entries are stamped as in the
+parallel build, so peak memory depends on the chunk size rather than
+on the size of the report.
+
+Needs ``pypdf`` (a locked dependency); artifacts.py does not pick this
+mode when it is missing.
+"""
+
+import os
+import tempfile
+
+from . import build_parallel
+from .build import build_report
+from .build_parallel import render_part, stitch_parts
+from .detailed_findings import select_findings
+from .snapshot import ReportSnapshot, load_evidences
+from .timing import RenderTimings, activate
+
+FINDINGS_PER_CHUNK = 25
+
+
+def build_report_streaming(path, data, report_id, chunk_size=FINDINGS_PER_CHUNK, timings=None):
+    if timings is None:
+        timings = RenderTimings()
+
+    if build_parallel.PdfWriter is None:
+        return build_report(path, data, report_id, timings=timings)
+
+    with activate(timings), timings.section("total"):
+        with timings.section("snapshot"):
+            snapshot = ReportSnapshot.load(report_id, evidences=False)
+        findings = select_findings(snapshot)
+
+        with tempfile.TemporaryDirectory(prefix="evidex-stream-") as tmpdir:
+            kinds = ["front", "results"]
+            part_paths = [
+                os.path.join(tmpdir, "front.pdf"),
+                os.path.join(tmpdir, "results.pdf"),
+            ]
+            with timings.section("front_matter"):
+                results = [render_part("front", part_paths[0], data)]
+            with timings.section("results"):
+                results.append(render_part("results", part_paths[1], data, snapshot=snapshot))
+
+            for start in range(0, len(findings), chunk_size):
+                chunk = findings[start:start + chunk_size]
+                part_path = os.path.join(tmpdir, f"findings-{start:06d}.pdf")
+
+                with timings.section("evidence"):
+                    load_evidences(chunk)
+                with timings.section("detailed_findings"):
+                    results.append(render_part(
+                        "findings", part_path, data, findings=chunk, start_index=start + 1,
+                    ))
+                # Drop the evidence records again before the next chunk
+                for f in chunk:
+                    f.evidences = []
+
+                kinds.append("findings")
+                part_paths.append(part_path)
+
+            kinds.append("conclusion")
+            part_paths.append(os.path.join(tmpdir, "conclusion.pdf"))
+            with timings.section("conclusion"):
+                results.append(render_part("conclusion", part_paths[-1], data))
+
+            with timings.section("stitch"):
+                stitch_parts(path, kinds, part_paths, results, streaming=True)
+
+    return timings
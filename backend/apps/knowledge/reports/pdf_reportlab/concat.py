@@ -0,0 +1,176 @@
+"""
+Bounded-memory PDF concatenation.
+
+``pypdf.PdfWriter`` copies every page and image it is given into memory
+and only writes the file on ``write()``.  StreamingPdfWriter instead
+writes each page and the objects it references straight to the output
+file as soon as it is added, so memory use depends on the largest part
+being copied, not on the size of the whole document.  Only object
+offsets, page object numbers and a hash per written object are kept
+until ``close()``.
+
+Objects are renumbered as they are copied.  Every object is written
+after the objects it references, and one whose bytes (with references
+already renumbered) match an object written before, from this part or
+an earlier one, reuses that object instead.  The fonts, logo and other
+resources each part embeds on its own are therefore stored once in
+the merged file.
+"""
+
+import copy
+import hashlib
+from io import BytesIO
+
+from pypdf.generic import (
+    ArrayObject,
+    DictionaryObject,
+    IndirectObject,
+    NameObject,
+    NumberObject,
+)
+
+CATALOG = 1
+PAGES = 2
+
+
+class StreamingPdfWriter:
+
+    def __init__(self, f):
+        self.f = f
+        self.offsets = {}
+        self.kids = []
+        self._next = PAGES + 1
+        self._mapping = {}
+        self._visiting = set()
+        self._written = {}
+        self._source = None
+
+        f.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+
+    def _alloc(self):
+        num = self._next
+        self._next += 1
+        return num
+
+    def _ref(self, num):
+        return IndirectObject(num, 0, None)
+
+    def _remap(self, obj):
+        """
+        Rewrite indirect references in ``obj`` to output object numbers,
+        copying referenced objects that have not been written yet.
+        Containers are copied: source objects such as the stamp overlay's
+        fonts are remapped again for the next file.
+        """
+        if isinstance(obj, IndirectObject):
+            return self._ref(self._copy_object(obj))
+
+        if isinstance(obj, DictionaryObject):
+            # Keeps stream data along with the dictionary
+            out = copy.copy(obj)
+            for key in list(obj.keys()):
+                if key == "/Parent":
+                    continue
+                # raw_get: plain indexing would resolve the reference
+                out[key] = self._remap(obj.raw_get(key))
+            return out
+
+        if isinstance(obj, ArrayObject):
+            return ArrayObject(self._remap(item) for item in obj)
+
+        return obj
+
+    def _copy_object(self, ref):
+        """
+        Write the object behind ``ref`` and return its output number,
+        reusing an identical object that is already in the output.
+        """
+        key = (id(ref.pdf), ref.idnum, ref.generation)
+        num = self._mapping.get(key)
+        if num is not None:
+            return num
+
+        if key in self._visiting:
+            # Reference cycle: number it now, it is written (without
+            # deduplication) once its first visit completes
+            num = self._mapping[key] = self._alloc()
+            return num
+
+        self._visiting.add(key)
+        try:
+            obj = self._remap(ref.get_object())
+        finally:
+            self._visiting.discard(key)
+
+        buffer = BytesIO()
+        obj.write_to_stream(buffer)
+        data = buffer.getvalue()
+
+        num = self._mapping.get(key)
+        if num is None:
+            digest = hashlib.sha256(data).digest()
+            num = self._written.get(digest)
+            if num is None:
+                num = self._written[digest] = self._alloc()
+                self._write_bytes(num, data)
+            self._mapping[key] = num
+        else:
+            self._write_bytes(num, data)
+        return num
+
+    def _write_bytes(self, num, data):
+        self.offsets[num] = self.f.tell()
+        self.f.write(f"{num} 0 obj\n".encode())
+        self.f.write(data)
+        self.f.write(b"\nendobj\n")
+
+    def _write_object(self, num, obj):
+        buffer = BytesIO()
+        obj.write_to_stream(buffer)
+        self._write_bytes(num, buffer.getvalue())
+
+    def add_page(self, page):
+        """
+        Write ``page`` (from a PdfReader) and everything it references.
+        """
+        source = page.indirect_reference.pdf if page.indirect_reference else None
+        if source is not self._source:
+            # Objects of the previous file are all written by now
+            self._source = source
+            self._mapping = {}
+
+        num = self._alloc()
+        if page.indirect_reference is not None:
+            ref = page.indirect_reference
+            self._mapping[(id(ref.pdf), ref.idnum, ref.generation)] = num
+        self.kids.append(num)
+
+        page = self._remap(page)
+        page[NameObject("/Parent")] = self._ref(PAGES)
+        self._write_object(num, page)
+
+    def close(self):
+        pages = DictionaryObject({
+            NameObject("/Type"): NameObject("/Pages"),
+            NameObject("/Kids"): ArrayObject(self._ref(n) for n in self.kids),
+            NameObject("/Count"): NumberObject(len(self.kids)),
+        })
+        self._write_object(PAGES, pages)
+
+        catalog = DictionaryObject({
+            NameObject("/Type"): NameObject("/Catalog"),
+            NameObject("/Pages"): self._ref(PAGES),
+        })
+        self._write_object(CATALOG, catalog)
+
+        xref_offset = self.f.tell()
+        size = self._next
+        self.f.write(f"xref\n0 {size}\n".encode())
+        self.f.write(b"0000000000 65535 f \n")
+        for num in range(1, size):
+            self.f.write(f"{self.offsets[num]:010d} 00000 n \n".encode())
+
+        self.f.write(
+            f"trailer\n<< /Size {size} /Root {CATALOG} 0 R >>\n"
+            f"startxref\n{xref_offset}\n%%EOF\n".encode()
+        )
@@ -2,6 +2,9 @@ from reportlab.lib.pagesizes import A4
 from reportlab.lib.styles import ParagraphStyle
 from reportlab.platypus import Paragraph
 from reportlab.lib.colors import black
+from .fonts import REGULAR, BOLD
+from .forms import draw_frame
+from .pagination import draw_page_label
 
 
 def draw_conclusion(c, data,page_no, total_pages):
@@ -9,27 +12,22 @@ def draw_conclusion(c, data,page_no, total_pages):
     margin = 55
 
     # =========================
-    # Outer Border
+    # Outer Border + static header
     # =========================
-    c.rect(margin, margin, W - 2 * margin, H - 2 * margin)
+    draw_frame(c, margin, H - margin - 25)
 
     # =========================
     # Header (inside layout)
     # =========================
-    c.setFont("Helvetica-Bold", 10)
+    c.setFont(BOLD, 10)
     c.drawString(margin + 10, H - margin - 25, data["application_name"])
-    c.drawRightString(
-        W - margin - 10,
-        H - margin - 25,
-        "Penetration Testing Report"
-    )
 
     # =========================
     # Section Title
     # =========================
     y = H - margin - 70
 
-    c.setFont("Helvetica-Bold", 14)
+    c.setFont(BOLD, 14)
     c.drawString(margin + 10, y, "5. Conclusion")
 
     y -= 25
@@ -50,7 +48,7 @@ def draw_conclusion(c, data,page_no, total_pages):
 
     style = ParagraphStyle(
         "conclusion",
-        fontName="Helvetica",
+        fontName=REGULAR,
         fontSize=10,
         leading=14,
     )
@@ -67,7 +65,7 @@ def draw_conclusion(c, data,page_no, total_pages):
     # =========================
     end_text = "----END OF THE DOCUMENT----"
 
-    c.setFont("Helvetica-Bold", 10)
+    c.setFont(BOLD, 10)
     c.drawCentredString(
         W / 2,
         y - text_height - 40,
@@ -77,11 +75,7 @@ def draw_conclusion(c, data,page_no, total_pages):
     # =========================
     # Footer
     # =========================
-    c.setFont("Helvetica", 9)
+    c.setFont(REGULAR, 9)
     c.drawString(margin + 10, margin + 15, "Confidential")
     c.drawCentredString(W / 2, margin + 15, f"V {data['version']}")
-    c.drawRightString(
-        W - margin - 10,
-        margin + 15,
-        f"Page {page_no} of {total_pages}"
-    )
+    draw_page_label(c, W - margin - 10, margin + 15, page_no, total_pages)
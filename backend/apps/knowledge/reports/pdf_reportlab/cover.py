@@ -1,6 +1,9 @@
 from reportlab.lib.pagesizes import A4
+from .fonts import REGULAR, BOLD
+from .forms import draw_frame
+from .pagination import draw_page_label
 
-def draw_cover(c, d, page_no, total_pages=8):
+def draw_cover(c, d, page_no, total_pages=None):
     W, H = A4
     margin = 40
 
@@ -8,17 +11,16 @@ def draw_cover(c, d, page_no, total_pages=8):
     def s(x):
         return "" if x is None else str(x)
 
-    # Outer border
-    c.rect(margin, margin, W - 2*margin, H - 2*margin)
+    # Outer border + static header
+    draw_frame(c, margin, H - 50)
 
     # Header
-    c.setFont("Helvetica-Bold", 10)
+    c.setFont(BOLD, 10)
     c.drawString(margin + 10, H - 50, s(d["enterprise"]))
-    c.drawRightString(W - margin - 10, H - 50, "Penetration Testing Report")
 
     # Title
     y = H - 200
-    c.setFont("Helvetica-Bold", 14)
+    c.setFont(BOLD, 14)
     c.drawCentredString(W / 2, y, "PENETRATION TESTING REPORT")
 
     y -= 25
@@ -28,7 +30,7 @@ def draw_cover(c, d, page_no, total_pages=8):
     c.drawCentredString(W / 2, y, s(d["enterprise"]))
 
     y -= 25
-    c.setFont("Helvetica", 11)
+    c.setFont(REGULAR, 11)
     c.drawCentredString(W / 2, y, f"PT Conducted on {s(d['pt_date'])}")
 
     y -= 20
@@ -66,14 +68,14 @@ def draw_cover(c, d, page_no, total_pages=8):
         c.rect(table_left + col1 + col2 + col3, y0, col4, row_h)
 
         # Text
-        c.setFont("Helvetica", 9)
+        c.setFont(REGULAR, 9)
         c.drawString(table_left + 5, y0 + 7, r[0])
         c.drawString(table_left + col1 + 5, y0 + 7, r[1])
         c.drawString(table_left + col1 + col2 + 5, y0 + 7, r[2])
         c.drawString(table_left + col1 + col2 + col3 + 5, y0 + 7, r[3])
 
     # Footer
-    c.setFont("Helvetica", 9)
+    c.setFont(REGULAR, 9)
     c.drawString(margin + 10, margin + 15, "Confidential")
     c.drawCentredString(W / 2, margin + 15, f"V {s(d['version'])}")
-    c.drawRightString(W - margin - 10, margin + 15,f"Page {page_no} of {total_pages}")
+    draw_page_label(c, W - margin - 10, margin + 15, page_no, total_pages)
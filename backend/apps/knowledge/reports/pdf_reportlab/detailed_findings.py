@@ -1,21 +1,16 @@
 from reportlab.lib.pagesizes import A4
 from reportlab.lib.colors import HexColor, white
-from reportlab.platypus import Paragraph
 from reportlab.lib.styles import ParagraphStyle
-from apps.knowledge.models import ReportFinding
+from .forms import draw_frame
+from .pagination import defer_string, draw_page_label, finding_number_form
+from .fonts import REGULAR, BOLD
+from .images import get_image
+from .layout import wrapped_paragraph
 
 # =============================
-# Severity Order & Colors
+# Severity Colors
 # =============================
 
-SEV_ORDER = {
-    "CRITICAL": 0,
-    "HIGH": 1,
-    "MEDIUM": 2,
-    "LOW": 3,
-    "INFO": 4,
-}
-
 SEV_COLORS = {
     "CRITICAL": HexColor("#C00000"),
     "HIGH": HexColor("#FF0000"),
@@ -26,6 +21,20 @@ SEV_COLORS = {
 
 LEFT_BLUE = HexColor("#1F4E8C")
 
+# Page margin and the box every evidence image is fitted into (points).
+# Print renditions (reports/renditions.py) are sized from this.
+MARGIN = 55
+EVIDENCE_IMAGE_WIDTH = A4[0] - 2 * MARGIN - 20
+EVIDENCE_IMAGE_HEIGHT = 200
+
+# Module level so wrapped paragraphs can be reused (see layout.py)
+BODY_STYLE = ParagraphStyle(
+    "body",
+    fontName=REGULAR,
+    fontSize=9,
+    leading=12
+)
+
 
 # =============================
 # Header & Footer (inside border)
@@ -34,47 +43,33 @@ LEFT_BLUE = HexColor("#1F4E8C")
 def draw_layout_header_footer(c, data, page_no, total_pages, margin):
     W, H = A4
 
-    # Outer Border
-    c.rect(margin, margin, W - 2 * margin, H - 2 * margin)
+    # Outer Border + static header, one form for every page
+    draw_frame(c, margin, H - margin - 25)
 
     # Header
-    c.setFont("Helvetica-Bold", 10)
+    c.setFont(BOLD, 10)
     c.drawString(margin + 10, H - margin - 25, data["application_name"])
-    c.drawRightString(
-        W - margin - 10,
-        H - margin - 25,
-        "Penetration Testing Report"
-    )
 
     # Footer
-    c.setFont("Helvetica", 9)
+    c.setFont(REGULAR, 9)
     c.drawString(margin + 10, margin + 15, "Confidential")
     c.drawCentredString(W / 2, margin + 15, f"V {data['version']}")
-    c.drawRightString(
-        W - margin - 10,
-        margin + 15,
-        f"Page {page_no} of {total_pages}"
-    )
+    draw_page_label(c, W - margin - 10, margin + 15, page_no, total_pages)
 
 
 # =============================
 # Main Renderer
 # =============================
 
-def draw_detailed_findings(c, data, report_id, start_page_no, total_pages):
-
-    W, H = A4
-    margin = 55
-    page_no = start_page_no
-
-    findings = list(
-        ReportFinding.objects.filter(report_id=report_id)
-    )
-
+def select_findings(snapshot):
+    """
+    Findings shown in this section, in display order (the snapshot's,
+    most severe first).
+    """
     # Remove empty / incomplete findings
     filtered_findings = []
 
-    for f in findings:
+    for f in snapshot.findings:
         severity = (f.final_severity or "").strip()
         title = (f.final_title or "").strip()
         description = (f.final_description or "").strip()
@@ -83,27 +78,35 @@ def draw_detailed_findings(c, data, report_id, start_page_no, total_pages):
         if severity and title and description:
             filtered_findings.append(f)
 
-    findings = filtered_findings
+    return filtered_findings
 
-    findings.sort(
-        key=lambda f: SEV_ORDER.get(
-            (f.final_severity or "INFO").upper(), 4
-        )
-    )
+
+def draw_detailed_findings(c, data, snapshot, start_page_no, total_pages,
+                           findings=None, start_index=1, defer_numbers=False):
+    """
+    Draw one table (plus evidence) per finding.  ``findings`` and
+    ``start_index`` let the parallel build render a slice of
+    ``select_findings(snapshot)`` with its global numbering; with
+    ``defer_numbers`` the numbers are left as deferred forms instead
+    (see pagination.finding_number_form), so the pages do not depend on
+    where the slice ends up.
+    """
+
+    W, H = A4
+    margin = MARGIN
+    page_no = start_page_no
+
+    if findings is None:
+        findings = select_findings(snapshot)
 
     if not findings:
         return page_no
 
-    first_page = True
+    first_page = start_index == 1
 
-    style = ParagraphStyle(
-        "body",
-        fontName="Helvetica",
-        fontSize=9,
-        leading=12
-    )
+    style = BODY_STYLE
 
-    for idx, f in enumerate(findings, start=1):
+    for idx, f in enumerate(findings, start=start_index):
 
         draw_layout_header_footer(c, data, page_no, total_pages, margin)
 
@@ -111,7 +114,7 @@ def draw_detailed_findings(c, data, report_id, start_page_no, total_pages):
 
         # Title only once
         if first_page:
-            c.setFont("Helvetica-Bold", 14)
+            c.setFont(BOLD, 14)
             c.drawString(margin + 10, y_start, "3. Detailed Findings")
             y_start -= 35
             first_page = False
@@ -122,7 +125,8 @@ def draw_detailed_findings(c, data, report_id, start_page_no, total_pages):
         right_col_width = table_width - left_col_width
 
         rows = [
-            ("Vulnerability {}".format(idx), f.final_title),
+            ("Vulnerability" if defer_numbers else "Vulnerability {}".format(idx),
+             f.final_title),
             ("Severity", (f.final_severity or "INFO").upper()),
             ("Description", f.final_description),
             ("Impact", f.final_impact),
@@ -134,15 +138,18 @@ def draw_detailed_findings(c, data, report_id, start_page_no, total_pages):
         # =============================
 
         row_heights = []
+        row_paragraphs = []
 
         for label, value in rows:
 
-            p = Paragraph(str(value or ""), style)
-
-            text_width, text_height = p.wrap(
+            # Wrapped once and reused by the draw step below
+            p, text_height = wrapped_paragraph(
+                str(value or ""),
+                style,
                 right_col_width - 12,
                 H  # allow full natural height
             )
+            row_paragraphs.append((p, text_height))
 
             padding_top = 6
             padding_bottom = 6
@@ -203,13 +210,22 @@ def draw_detailed_findings(c, data, report_id, start_page_no, total_pages):
             )
 
             c.setFillColor(white)
-            c.setFont("Helvetica-Bold", 9)
+            c.setFont(BOLD, 9)
             c.drawString(
                 table_left + 8,
                 y_cursor + row_h - 14,
                 label
             )
 
+            if i == 0 and defer_numbers:
+                defer_string(
+                    c,
+                    finding_number_form(idx - start_index + 1),
+                    table_left + 8 + c.stringWidth(label + " ", BOLD, 9),
+                    y_cursor + row_h - 14,
+                    align="left",
+                )
+
             # Severity row special
             if label == "Severity":
 
@@ -225,7 +241,7 @@ def draw_detailed_findings(c, data, report_id, start_page_no, total_pages):
                 )
 
                 c.setFillColor(white)
-                c.setFont("Helvetica-Bold", 10)
+                c.setFont(BOLD, 10)
                 c.drawCentredString(
                     table_left + left_col_width + right_col_width / 2,
                     y_cursor + row_h / 2 - 4,
@@ -234,12 +250,7 @@ def draw_detailed_findings(c, data, report_id, start_page_no, total_pages):
 
             else:
 
-                p = Paragraph(str(value or ""), style)
-
-                text_width, text_height = p.wrap(
-                    right_col_width - 12,
-                    H
-                )
+                p, text_height = row_paragraphs[i]
 
                 text_x = table_left + left_col_width + 6
                 text_y = y_cursor + row_h - text_height - 6
@@ -250,7 +261,7 @@ def draw_detailed_findings(c, data, report_id, start_page_no, total_pages):
         # Evidence Section (Safe Pagination)
         # =============================
 
-        evidences = list(f.evidences.all())
+        evidences = f.evidences
 
         if evidences:
 
@@ -263,7 +274,7 @@ def draw_detailed_findings(c, data, report_id, start_page_no, total_pages):
                 draw_layout_header_footer(c, data, page_no, total_pages, margin)
                 y_cursor = H - margin - 60
 
-            c.setFont("Helvetica-Bold", 11)
+            c.setFont(BOLD, 11)
             c.setFillColor(LEFT_BLUE)
             c.drawString(table_left, y_cursor, "Evidence")
 
@@ -271,8 +282,8 @@ def draw_detailed_findings(c, data, report_id, start_page_no, total_pages):
 
             for idx_ev, ev in enumerate(evidences, start=1):
 
-                image_height = 200
-                image_width = table_width
+                image_height = EVIDENCE_IMAGE_HEIGHT
+                image_width = EVIDENCE_IMAGE_WIDTH
                 required_space = image_height + 40  # title + spacing
 
                 # 🔴 Check if image fits
@@ -283,7 +294,7 @@ def draw_detailed_findings(c, data, report_id, start_page_no, total_pages):
                     y_cursor = H - margin - 60
 
                 # Step label
-                c.setFont("Helvetica-Bold", 9)
+                c.setFont(BOLD, 9)
                 c.setFillColor("black")
                 c.drawString(
                     table_left,
@@ -295,10 +306,10 @@ def draw_detailed_findings(c, data, report_id, start_page_no, total_pages):
 
                 # Draw image safely
                 try:
-                    image_path = ev.file.path
+                    image = get_image(ev.path)
 
                     c.drawImage(
-                        image_path,
+                        image,
                         table_left,
                         y_cursor - image_height,
                         width=image_width,
@@ -3,6 +3,79 @@ from reportlab.lib.colors import HexColor, black, white
 from reportlab.lib.styles import ParagraphStyle
 from reportlab.platypus import Paragraph, Table, TableStyle
 from reportlab.lib.enums import TA_CENTER, TA_LEFT
+from .fonts import REGULAR, BOLD
+from .forms import draw_form, draw_frame
+from .pagination import draw_page_label
+from .layout import wrapped_flowable, wrapped_paragraph
+
+
+# Module level so wrapped paragraphs can be reused (see layout.py)
+BODY_STYLE = ParagraphStyle(
+    "body",
+    fontName=REGULAR,
+    fontSize=10,
+    leading=14,
+    textColor=black,
+)
+
+RISK_TABLE_WIDTH = A4[0] - 2 * (40 + 10)
+
+
+def _build_risk_table():
+    # ===== TABLE STYLES =====
+    desc_style = ParagraphStyle(
+        "desc", fontName=REGULAR, fontSize=9, leading=12, alignment=TA_LEFT
+    )
+    center = ParagraphStyle("center", fontName=BOLD, fontSize=9, alignment=TA_CENTER)
+
+    # ===== TABLE DATA =====
+    table_data = [
+        ["Priority\nLevel", "Severity\nScale", "CVSS\nScore", "Description of Vulnerability"],
+
+        ["P1", Paragraph("Critical", center), "9.0 – 10.0",
+         Paragraph("The exposure may be exploited resulting in bad outcomes such as unauthorized privilege escalation, data access, downtime, or compromise of data.", desc_style)],
+
+        ["P2", Paragraph("High", center), "7.0 – 8.9",
+         Paragraph("These issues identify conditions that could directly result in the compromise or unauthorized access of a network, system, application, or sensitive information.", desc_style)],
+
+        ["P3", Paragraph("Medium", center), "4.0 – 6.9",
+         Paragraph("These issues identify conditions that do not immediately or directly result in the compromise or unauthorized access of a network, system, application, or sensitive information, but do provide a capability or information that could in combination with others’ capabilities or information result in the compromise unauthorized access of a network application or information.", desc_style)],
+
+        ["P4", Paragraph("Low", center), "0.1 – 3.9",
+         Paragraph("These issues identify conditions that do not immediately or directly result in the compromise of a network, system, application, or information but do provide information that could be used in combination with others’ information that could be used in combination with other's information access to a network system,application,or information.", desc_style)],
+
+        ["P5", Paragraph("Informational", center), "0",
+         Paragraph("Issues that leaking very basic information which might lead to information disclosure.", desc_style)],
+    ]
+
+    col_widths = [60, 90, 80, RISK_TABLE_WIDTH - 230]
+
+    tbl = Table(table_data, colWidths=col_widths, repeatRows=1)
+
+    tbl.setStyle(TableStyle([
+        ("BACKGROUND", (0,0), (-1,0), HexColor("#00B0F0")),
+        ("TEXTCOLOR", (0,0), (-1,0), white),
+        ("ALIGN", (0,0), (-1,0), "CENTER"),
+        ("FONTNAME", (0,0), (-1,0), BOLD),
+        ("FONTSIZE", (0,0), (-1,0), 9),
+        ("FONTNAME", (0,1), (-1,-1), REGULAR),
+
+        ("GRID", (0,0), (-1,-1), 1, black),
+        ("VALIGN", (0,0), (-1,-1), "MIDDLE"),
+
+        ("BACKGROUND", (1,1), (1,1), HexColor("#C00000")),
+        ("BACKGROUND", (1,2), (1,2), HexColor("#FF0000")),
+        ("BACKGROUND", (1,3), (1,3), HexColor("#FFC000")),
+        ("BACKGROUND", (1,4), (1,4), HexColor("#0070C0")),
+        ("BACKGROUND", (1,5), (1,5), HexColor("#8EA9DB")),
+
+        ("TEXTCOLOR", (1,1), (1,5), white),
+        ("FONTNAME", (1,1), (1,5), BOLD),
+
+        ("ALIGN", (0,1), (2,-1), "CENTER"),
+    ]))
+
+    return tbl
 
 
 def draw_executive_summary(c, data,page_no, total_pages):
@@ -12,28 +85,20 @@ def draw_executive_summary(c, data,page_no, total_pages):
 
     # ===== PAGE BORDER =====
     c.setStrokeColor(black)
-    c.rect(margin, margin, W - 2 * margin, H - 2 * margin)
+    draw_frame(c, margin, H - 50)
 
     # ===== HEADER =====
-    c.setFont("Helvetica-Bold", 10)
+    c.setFont(BOLD, 10)
     c.drawString(margin + 10, H - 50, data["application_name"])
-    c.drawRightString(W - margin - 10, H - 50, "Penetration Testing Report")
 
     y = H - 95
-    c.setFont("Helvetica-Bold", 14)
+    c.setFont(BOLD, 14)
     c.drawString(margin + 10, y-15, "1. Executive Summary")
 
     # ===== BODY TEXT =====
-    body_style = ParagraphStyle(
-        "body",
-        fontName="Helvetica",
-        fontSize=10,
-        leading=14,
-        textColor=black,
-        
-    )
+    body_style = BODY_STYLE
 
-    overview_text = f"""
+    overview_text = """
 <b>1.1 Overview</b><br/><br/>
 
 A security assessment was conducted to evaluate the effectiveness of existing controls and to identify
@@ -54,13 +119,12 @@ Timely remediation of identified high-risk vulnerabilities is recommended to red
 strengthen the organization's security posture.
 """
 
-    p = Paragraph(overview_text, body_style)
     text_width = W - 2 * margin - 20
-    _, h = p.wrap(text_width, 400)
+    p, h = wrapped_paragraph(overview_text, body_style, text_width, 400)
     p.drawOn(c, margin + 10, y - 40 - h)
 
     y_table = y - 40 - h - 30
-    c.setFont("Helvetica-Bold", 12)
+    c.setFont(BOLD, 12)
     c.drawString(margin + 10, y_table, "1.2 Risk Model")
     
     risk_text = f"""
@@ -77,62 +141,17 @@ strengthen the organization's security posture.
     table_left = margin + 10
     table_width = W - 2 * (margin + 10)
 
-    # ===== TABLE STYLES =====
-    desc_style = ParagraphStyle("desc", fontSize=9, leading=12, alignment=TA_LEFT)
-    center = ParagraphStyle("center", fontSize=9, alignment=TA_CENTER)
-
-    # ===== TABLE DATA =====
-    table_data = [
-        ["Priority\nLevel", "Severity\nScale", "CVSS\nScore", "Description of Vulnerability"],
-
-        ["P1", Paragraph("Critical", center), "9.0 – 10.0",
-         Paragraph("The exposure may be exploited resulting in bad outcomes such as unauthorized privilege escalation, data access, downtime, or compromise of data.", desc_style)],
-
-        ["P2", Paragraph("High", center), "7.0 – 8.9",
-         Paragraph("These issues identify conditions that could directly result in the compromise or unauthorized access of a network, system, application, or sensitive information.", desc_style)],
-
-        ["P3", Paragraph("Medium", center), "4.0 – 6.9",
-         Paragraph("These issues identify conditions that do not immediately or directly result in the compromise or unauthorized access of a network, system, application, or sensitive information, but do provide a capability or information that could in combination with others’ capabilities or information result in the compromise unauthorized access of a network application or information.", desc_style)],
-
-        ["P4", Paragraph("Low", center), "0.1 – 3.9",
-         Paragraph("These issues identify conditions that do not immediately or directly result in the compromise of a network, system, application, or information but do provide information that could be used in combination with others’ information that could be used in combination with other's information access to a network system,application,or information.", desc_style)],
-
-        ["P5", Paragraph("Informational", center), "0",
-         Paragraph("Issues that leaking very basic information which might lead to information disclosure.", desc_style)],
-    ]
-
-    col_widths = [60, 90, 80, table_width - 230]
-
-    tbl = Table(table_data, colWidths=col_widths, repeatRows=1)
-
-    tbl.setStyle(TableStyle([
-        ("BACKGROUND", (0,0), (-1,0), HexColor("#00B0F0")),
-        ("TEXTCOLOR", (0,0), (-1,0), white),
-        ("ALIGN", (0,0), (-1,0), "CENTER"),
-        ("FONTNAME", (0,0), (-1,0), "Helvetica-Bold"),
-        ("FONTSIZE", (0,0), (-1,0), 9),
-
-        ("GRID", (0,0), (-1,-1), 1, black),
-        ("VALIGN", (0,0), (-1,-1), "MIDDLE"),
-
-        ("BACKGROUND", (1,1), (1,1), HexColor("#C00000")),
-        ("BACKGROUND", (1,2), (1,2), HexColor("#FF0000")),
-        ("BACKGROUND", (1,3), (1,3), HexColor("#FFC000")),
-        ("BACKGROUND", (1,4), (1,4), HexColor("#0070C0")),
-        ("BACKGROUND", (1,5), (1,5), HexColor("#8EA9DB")),
-
-        ("TEXTCOLOR", (1,1), (1,5), white),
-        ("FONTNAME", (1,1), (1,5), "Helvetica-Bold"),
-
-        ("ALIGN", (0,1), (2,-1), "CENTER"),
-    ]))
+    # ===== RISK TABLE =====
+    # Built once per worker thread, emitted once per PDF as a form
+    tbl, h = wrapped_flowable("risk_table", _build_risk_table, table_width, 600)
 
-    # Draw table
-    _, h = tbl.wrap(table_width, 600)
-    tbl.drawOn(c, table_left, table_top - h)
+    c.saveState()
+    c.translate(table_left, table_top - h)
+    draw_form(c, "riskTable", lambda c: tbl.drawOn(c, 0, 0))
+    c.restoreState()
 
     # ===== FOOTER =====
-    c.setFont("Helvetica", 9)
+    c.setFont(REGULAR, 9)
     c.drawString(margin + 10, margin + 15, "Confidential")
     c.drawCentredString(W / 2, margin + 15, f"V {data['version']}")
-    c.drawRightString(W - margin - 10, margin + 15, f"Page {page_no} of {total_pages}")
+    draw_page_label(c, W - margin - 10, margin + 15, page_no, total_pages)
@@ -0,0 +1,178 @@
+"""
+Fonts used by the section renderers.
+
+The built-in Helvetica only covers Latin-1, so tester text in other
+scripts comes out as black boxes.  When a TrueType family is available
+it is parsed and registered once per process, on first import, under
+the names in REGULAR and BOLD; otherwise those fall back to Helvetica.
+Renderers must use these names instead of literal font names.
+
+ReportLab embeds a TTF as subsets of up to 256 glyphs and rebuilds each
+subset program from the font file on every ``canvas.save()``.  Subset
+0 always holds ASCII at fixed positions, so most reports need exactly
+the same subsets; those are built once per process and reused.
+
+The family is taken from REPORT_PDF_FONT_REGULAR / REPORT_PDF_FONT_BOLD,
+or else the first of FONT_CANDIDATES installed on the machine.
+"""
+
+import logging
+import os
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+from reportlab.lib.fonts import addMapping
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont, TTFError
+
+logger = logging.getLogger(__name__)
+
+FONT_CANDIDATES = [
+    (
+        "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
+        "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf",
+    ),
+    (
+        "/usr/share/fonts/truetype/noto/NotoSans-Regular.ttf",
+        "/usr/share/fonts/truetype/noto/NotoSans-Bold.ttf",
+    ),
+    (
+        "/usr/share/fonts/dejavu/DejaVuSans.ttf",
+        "/usr/share/fonts/dejavu/DejaVuSans-Bold.ttf",
+    ),
+]
+
+FALLBACK_REGULAR = "Helvetica"
+FALLBACK_BOLD = "Helvetica-Bold"
+
+TTF_REGULAR = "ReportSans"
+TTF_BOLD = "ReportSans-Bold"
+
+MAX_SUBSETS = 256
+
+
+class SubsetCache:
+    """
+    LRU of generated subset programs keyed by (font file, glyph list).
+    """
+
+    def __init__(self, max_entries=MAX_SUBSETS):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def wrap(self, face):
+        make_subset = face.makeSubset
+        # The parser keeps a read position; one subset at a time per face
+        face_lock = threading.Lock()
+
+        def cached_make_subset(subset):
+            key = (face.filename, tuple(subset))
+
+            with self._lock:
+                data = self._entries.get(key)
+                if data is not None:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return data
+                self.misses += 1
+
+            with face_lock:
+                data = make_subset(subset)
+
+            with self._lock:
+                self._entries[key] = data
+                if len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+            return data
+
+        face.makeSubset = cached_make_subset
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+subset_cache = SubsetCache()
+
+
+def _configured_family():
+    regular = getattr(settings, "REPORT_PDF_FONT_REGULAR", None)
+    bold = getattr(settings, "REPORT_PDF_FONT_BOLD", None)
+    if regular:
+        return regular, bold or regular
+
+    for regular, bold in FONT_CANDIDATES:
+        if os.path.exists(regular) and os.path.exists(bold):
+            return regular, bold
+    return None, None
+
+
+def register_fonts():
+    """
+    Register the report font family and return (regular, bold) font
+    names for the renderers.
+    """
+    regular_path, bold_path = _configured_family()
+    if not regular_path:
+        return FALLBACK_REGULAR, FALLBACK_BOLD
+
+    if TTF_REGULAR in pdfmetrics.getRegisteredFontNames():
+        return TTF_REGULAR, TTF_BOLD
+
+    try:
+        regular = TTFont(TTF_REGULAR, regular_path)
+        bold = TTFont(TTF_BOLD, bold_path)
+    except (OSError, TTFError):
+        logger.exception("Could not load report fonts, using Helvetica")
+        return FALLBACK_REGULAR, FALLBACK_BOLD
+
+    for font in (regular, bold):
+        subset_cache.wrap(font.face)
+        pdfmetrics.registerFont(font)
+
+    # <b> in Paragraph markup
+    addMapping(TTF_REGULAR, 0, 0, TTF_REGULAR)
+    addMapping(TTF_REGULAR, 1, 0, TTF_BOLD)
+    addMapping(TTF_REGULAR, 0, 1, TTF_REGULAR)
+    addMapping(TTF_REGULAR, 1, 1, TTF_BOLD)
+
+    return TTF_REGULAR, TTF_BOLD
+
+
+def _file_stamp(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return (path, None)
+    return (path, st.st_size, st.st_mtime_ns)
+
+
+def font_signature(regular, bold):
+    """
+    Identify what report text is drawn with: the font names plus the
+    files behind them, if any.  Goes into the artifact and fragment
+    fingerprints so switching fonts does not serve PDFs drawn with the
+    previous ones.
+    """
+    files = ()
+    if regular == TTF_REGULAR:
+        files = tuple(_file_stamp(path) for path in _configured_family())
+    return (regular, bold, files)
+
+
+REGULAR, BOLD = register_fonts()
+
+# Fonts are parsed once, at import, so this holds for the whole process
+SIGNATURE = font_signature(REGULAR, BOLD)
@@ -0,0 +1,44 @@
+"""
+Form XObjects for content repeated on many pages.
+
+A form is defined in the document the first time it is used and every
+later use is a single ``Do`` operator, so the page border and static
+header of each page, and the static page bodies, are emitted once per
+PDF instead of once per page.  Forms are drawn in the graphics state of
+the page that uses them (line width, colours), like inline drawing.
+
+Forms cannot be shared between documents: font and image resource
+names are assigned per document.  What is reused across renders is the
+layout that goes into them (see layout.py).
+"""
+
+from reportlab.lib.pagesizes import A4
+
+from .fonts import BOLD
+
+
+def draw_form(c, name, draw):
+    """
+    Draw ``draw(c)`` at the current origin through the form ``name``,
+    defining it on first use in this document.
+    """
+    if not c.hasForm(name):
+        c.beginForm(name)
+        draw(c)
+        c.endForm()
+    c.doForm(name)
+
+
+def draw_frame(c, margin, header_y):
+    """
+    Page border and the static part of the header.  Callers draw the
+    report name on the left of the header and the footer themselves.
+    """
+    W, H = A4
+
+    def draw(c):
+        c.rect(margin, margin, W - 2 * margin, H - 2 * margin)
+        c.setFont(BOLD, 10)
+        c.drawRightString(W - margin - 10, header_y, "Penetration Testing Report")
+
+    draw_form(c, f"frame_{margin}_{round(header_y * 100)}", draw)
@@ -0,0 +1,98 @@
+"""
+Process-wide cache of decoded images for the section renderers.
+
+Static assets (the methodology diagram) and evidence screenshots are
+decoded once per worker and shared by every render instead of being
+re-read and re-decoded on each export.  Entries are keyed by path plus
+mtime and size, so a replaced file is picked up automatically, and the
+cache is bounded by the decoded byte size of its entries.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+
+from reportlab.lib.utils import ImageReader
+
+from .timing import track
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+
+class ImageCache:
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # key -> (reader, cost)
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, path):
+        """
+        Return a decoded ``ImageReader`` for ``path``.  Raises OSError
+        when the file is missing, like ``canvas.drawImage`` would.
+        """
+        path = os.path.abspath(path)
+        st = os.stat(path)
+        key = (path, st.st_mtime_ns, st.st_size)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+
+        # Decode outside the lock; a concurrent miss on the same file
+        # just decodes twice and the later insert wins.
+        with track("images"):
+            reader = ImageReader(path)
+            cost = len(reader.getRGBData())
+            if reader._dataA is not None:
+                cost += len(reader._dataA.getRGBData())
+
+        if cost > self.max_bytes:
+            return reader
+
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+
+            self._entries[key] = (reader, cost)
+            self._bytes += cost
+
+            while self._bytes > self.max_bytes:
+                _, (_, evicted_cost) = self._entries.popitem(last=False)
+                self._bytes -= evicted_cost
+                self.evictions += 1
+
+        return reader
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+image_cache = ImageCache()
+
+
+def get_image(path):
+    return image_cache.get(path)
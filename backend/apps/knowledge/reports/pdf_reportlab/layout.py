@@ -0,0 +1,85 @@
+"""
+Memoized paragraph layout.
+
+Parsing and wrapping a Paragraph is the most expensive step for reports
+with many verbose findings.  ``wrapped_paragraph`` returns an already
+wrapped Paragraph for (text, style, width) so the measure step and the
+draw step share one layout, and unchanged findings reuse it on the next
+render.
+
+Styles are part of the key by identity, so callers must pass
+module-level ParagraphStyle objects rather than building one per call.
+A wrapped Paragraph keeps per-draw state on itself, so each thread gets
+its own cache.
+"""
+
+import threading
+from collections import OrderedDict
+
+from reportlab.platypus import Paragraph
+
+from .timing import track
+
+MAX_ENTRIES = 4096
+
+_local = threading.local()
+
+
+def _cache():
+    cache = getattr(_local, "paragraphs", None)
+    if cache is None:
+        cache = _local.paragraphs = OrderedDict()
+    return cache
+
+
+def wrapped_paragraph(text, style, width, height):
+    """
+    Return ``(paragraph, wrapped_height)`` for ``text`` laid out in
+    ``style`` at ``width``.
+    """
+    cache = _cache()
+    key = (text, id(style), width)
+
+    entry = cache.get(key)
+    if entry is not None and entry[0].style is style:
+        cache.move_to_end(key)
+        return entry
+
+    with track("layout"):
+        p = Paragraph(text, style)
+        _, h = p.wrap(width, height)
+
+    cache[key] = (p, h)
+    if len(cache) > MAX_ENTRIES:
+        cache.popitem(last=False)
+
+    return p, h
+
+
+def wrapped_flowable(key, build, width, height):
+    """
+    Return ``(flowable, wrapped_height)`` for a static flowable (e.g. a
+    Table) created by ``build()``, built and wrapped once per thread.
+    ``key`` must identify what ``build`` produces.
+    """
+    cache = _cache()
+    cache_key = ("flowable", key, width)
+
+    entry = cache.get(cache_key)
+    if entry is not None:
+        cache.move_to_end(cache_key)
+        return entry
+
+    with track("layout"):
+        flowable = build()
+        _, h = flowable.wrap(width, height)
+
+    cache[cache_key] = (flowable, h)
+    if len(cache) > MAX_ENTRIES:
+        cache.popitem(last=False)
+
+    return flowable, h
+
+
+def clear():
+    _cache().clear()
@@ -1,4 +1,7 @@
 from reportlab.lib.pagesizes import A4
+from .fonts import REGULAR, BOLD
+from .forms import draw_form, draw_frame
+from .pagination import draw_page_label
 
 LEGAL_TEXT = [
     "No part of this document may be reproduced or transmitted in any form or by any means",
@@ -9,29 +12,30 @@ LEGAL_TEXT = [
     "privacy law."
 ]
 
-def draw_legal(c, data, page_no, total_pages=8):
+def _draw_legal_text(c):
     W, H = A4
-    margin = 40
-
-    c.rect(margin, margin, W-2*margin, H-2*margin)
-
-    c.setFont("Helvetica-Bold", 10)
-    c.drawString(margin+10, H-50, data["enterprise"])
-    c.drawRightString(W-margin-10, H-50, "Penetration Testing Report")
 
     y = H - 200
-    c.setFont("Helvetica-Bold", 10)
+    c.setFont(BOLD, 10)
     for line in LEGAL_TEXT:
         c.drawCentredString(W/2, y, line)
         y -= 16
 
+
+def draw_legal(c, data, page_no, total_pages=None):
+    W, H = A4
+    margin = 40
+
+    draw_frame(c, margin, H - 50)
+
+    c.setFont(BOLD, 10)
+    c.drawString(margin+10, H-50, data["enterprise"])
+
+    draw_form(c, "legalText", _draw_legal_text)
+
     # Footer
-    c.setFont("Helvetica", 10)
+    c.setFont(REGULAR, 10)
     c.drawString(margin+10, margin+15, "Confidential")
     c.drawCentredString(W/2, margin+15, f"V {data['version']}")
-    c.drawRightString(
-    W - margin - 10,
-    margin + 15,
-    f"Page {page_no} of {total_pages}"
-)
+    draw_page_label(c, W - margin - 10, margin + 15, page_no, total_pages)
 
@@ -1,28 +1,43 @@
 from reportlab.lib.pagesizes import A4
 from reportlab.lib.colors import black
 from reportlab.lib.styles import ParagraphStyle
-from reportlab.platypus import Paragraph, Image
-
-def draw_methodology(c, data, page_no, total_pages):
+from .forms import draw_form, draw_frame
+from .pagination import draw_page_label
+from .fonts import REGULAR, BOLD
+from .images import get_image
+from .layout import wrapped_paragraph
+import os
+
+METHODOLOGY_IMAGE = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "assets",
+    "stepss.png",
+)
+
+# Module level so wrapped paragraphs can be reused (see layout.py)
+INTRO_STYLE = ParagraphStyle("body", fontName=BOLD, fontSize=10, leading=14)
+
+DETAIL_STYLE = ParagraphStyle(
+    "detail",
+    fontName=REGULAR,
+    fontSize=10,
+    leading=14,
+    leftIndent=18,
+    spaceBefore=6,
+)
+
+
+def _draw_body(c):
     W, H = A4
     margin = 40
 
-    # ================= PAGE FRAME =================
-    c.setStrokeColor(black)
-    c.rect(margin, margin, W - 2*margin, H - 2*margin)
-
-    # ================= HEADER =================
-    c.setFont("Helvetica-Bold", 10)
-    c.drawString(margin + 10, H - 50, data["application_name"])
-    c.drawRightString(W - margin - 10, H - 50, "Penetration Testing Report")
-
     # ================= TITLE =================
     y = H - 95
-    c.setFont("Helvetica-Bold", 14)
+    c.setFont(BOLD, 14)
     c.drawString(margin + 10, y, "2. Web Application Penetration Testing Methodology")
 
     # ================= BULLETS =================
-    c.setFont("Helvetica-Bold", 10)
+    c.setFont(BOLD, 10)
     bullets = [
         "Information Gathering",
         "Enumeration",
@@ -37,21 +52,19 @@ def draw_methodology(c, data, page_no, total_pages):
         by -= 16
 
     # ================= INTRO =================
-    body = ParagraphStyle("body", fontName="Helvetica-Bold", fontSize=10, leading=14)
-
     intro_text = (
         
         "The following also gives a high-level description and process of Security Analysts "
         "methodology used for performing the Web application testing:"
     )
 
-    intro = Paragraph(intro_text, body)
-    iw, ih = intro.wrap(W - 2*margin - 20, 100)
+    intro, ih = wrapped_paragraph(intro_text, INTRO_STYLE, W - 2*margin - 20, 100)
     intro_y = by - 20
     intro.drawOn(c, margin + 10, intro_y)
 
     # ================= METHODOLOGY IMAGE =================
-    img_path = "apps/knowledge/reports/assets/stepss.png"  
+    # Decoded once per worker (see images.py)
+    img_path = METHODOLOGY_IMAGE
 
     # Make it BIG like the sample
     img_width = W - 2*margin - 80    
@@ -60,8 +73,14 @@ def draw_methodology(c, data, page_no, total_pages):
     # Reduce top gap (pull image closer to intro text)
     img_y = intro_y - ih - 18
 
-    methodology_img = Image(img_path, img_width, img_height)
-    methodology_img.drawOn(c, margin + 40, img_y - img_height)
+    c.drawImage(
+        get_image(img_path),
+        margin + 40,
+        img_y - img_height,
+        width=img_width,
+        height=img_height,
+        mask="auto",
+    )
 
     # ================= DETAILS =================
     details_top = (img_y - img_height) - 6
@@ -70,15 +89,6 @@ def draw_methodology(c, data, page_no, total_pages):
     right_col = W - margin - 10
     text_width = right_col - left_col
 
-    detail_style = ParagraphStyle(
-        "detail",
-        fontName="Helvetica",
-        fontSize=10,
-        leading=14,
-        leftIndent=18,   
-        spaceBefore=6,
-    )
-
     text = """
     <b><br/>1. Planning and Reconnaissance</b><br/>
     In this initial phase, the scope and objectives of the penetration test are defined. The tester gathers relevant information about the target system through documentation review and publicly available sources to understand the environment.<br/><br/>
@@ -96,12 +106,27 @@ def draw_methodology(c, data, page_no, total_pages):
     After completing the assessment, a detailed report is prepared outlining the vulnerabilities identified, their risk level, and potential business impact. The report also provides clear and prioritized remediation recommendations.
     """
 
-    p = Paragraph(text, detail_style)
-    pw, ph = p.wrap(text_width, H - margin - details_top)
+    p, ph = wrapped_paragraph(text, DETAIL_STYLE, text_width, H - margin - details_top)
     p.drawOn(c, left_col, details_top - ph)
 
+
+def draw_methodology(c, data, page_no, total_pages):
+    W, H = A4
+    margin = 40
+
+    # ================= PAGE FRAME =================
+    c.setStrokeColor(black)
+    draw_frame(c, margin, H - 50)
+
+    # ================= HEADER =================
+    c.setFont(BOLD, 10)
+    c.drawString(margin + 10, H - 50, data["application_name"])
+
+    # Static body, see forms.py
+    draw_form(c, "methodologyBody", _draw_body)
+
      # ================= FOOTER =================
-    c.setFont("Helvetica", 9)
+    c.setFont(REGULAR, 9)
     c.drawString(margin + 10, margin + 15, "Confidential")
     c.drawCentredString(W/2, margin + 15, f"V {data['version']}")
-    c.drawRightString(W - margin - 10, margin + 15, f"Page {page_no} of {total_pages}")
+    draw_page_label(c, W - margin - 10, margin + 15, page_no, total_pages)
@@ -0,0 +1,129 @@
+"""
+Late-bound page numbers for the single-pass renderer.
+
+Values that are only known once the last page has been drawn (the
+"Page X of Y" total and the TOC page numbers, and for parts rendered on
+their own the finding numbers) are emitted as form XObjects.  Each page references the form by name while it is drawn and
+the form bodies are filled in by ``resolve_deferred`` right before
+``c.save()``.
+"""
+
+from reportlab.lib.pagesizes import A4
+
+
+FINDING_NUMBER_PREFIX = "findingNumber"
+
+
+def _deferred(c):
+    # name -> (font_name, font_size, align)
+    return c.__dict__.setdefault("_deferred_text", {})
+
+
+def deferred_placements(c):
+    """
+    Every placement of a deferred form so far, as
+    (page, name, x, y, font_name, font_size, fill_color, align).  The
+    parallel build uses these to stamp the final values onto merged
+    pages.
+    """
+    return c.__dict__.setdefault("_deferred_placements", [])
+
+
+def defer_string(c, name, x, y, align="right"):
+    """
+    Reserve a string at (x, y) using the current font, aligned
+    ``"right"`` or ``"left"`` of that point.  The text is supplied later
+    through ``resolve_deferred``; the same form may be placed any number
+    of times.
+    """
+    _deferred(c)[name] = (c._fontname, c._fontsize, align)
+    deferred_placements(c).append(
+        (c.getPageNumber(), name, x, y, c._fontname, c._fontsize, c._fillColorObj, align)
+    )
+
+    c.saveState()
+    c.translate(x, y)
+    c.doForm(name)
+    c.restoreState()
+
+
+def page_label_form(page_no):
+    return f"pageLabel{page_no}"
+
+
+def toc_entry_form(section):
+    return f"tocEntry_{section}"
+
+
+def finding_number_form(position):
+    """
+    The number of the ``position``-th finding (1-based) within a part.
+    """
+    return f"{FINDING_NUMBER_PREFIX}{position}"
+
+
+def draw_aligned_string(c, x, y, text, align):
+    if align == "left":
+        c.drawString(x, y, text)
+    else:
+        c.drawRightString(x, y, text)
+
+
+def draw_page_label(c, x, y, page_no, total_pages=None):
+    """
+    Draw the "Page X of Y" footer label right-aligned at (x, y).
+
+    When ``total_pages`` is not known yet the label is deferred and
+    filled in by ``resolve_page_labels``.
+    """
+    if total_pages:
+        c.drawRightString(x, y, f"Page {page_no} of {total_pages}")
+        return
+
+    defer_string(c, page_label_form(page_no), x, y)
+
+
+def resolve_deferred(c, values):
+    """
+    Define the body of every deferred form.  ``values`` maps form names
+    to the text they should display.  Must run after the last
+    ``showPage`` and before ``save``.
+    """
+    W, H = A4
+
+    for name, (font_name, font_size, align) in _deferred(c).items():
+        # Forms are drawn relative to the placement point, so the
+        # bounding box has to extend left of the origin.
+        c.beginForm(name, lowerx=-W, lowery=-H, upperx=W, uppery=H)
+        c.setFont(font_name, font_size)
+        draw_aligned_string(c, 0, 0, str(values.get(name, "")), align)
+        c.endForm()
+
+    _deferred(c).clear()
+
+
+def page_label_values(total_pages, section_pages=None, page_offset=0, page_count=None):
+    """
+    Text for every page label and TOC entry.  Labels are named by the
+    local page number; ``page_offset`` shifts them to global numbers
+    for a part rendered on its own.
+    """
+    if page_count is None:
+        page_count = total_pages
+
+    values = {
+        page_label_form(page_no): f"Page {page_offset + page_no} of {total_pages}"
+        for page_no in range(1, page_count + 1)
+    }
+
+    for section, page in (section_pages or {}).items():
+        values[toc_entry_form(section)] = page
+
+    return values
+
+
+def resolve_page_labels(c, total_pages, section_pages=None):
+    """
+    Fill in all "Page X of Y" labels and TOC entries drawn so far.
+    """
+    resolve_deferred(c, page_label_values(total_pages, section_pages))
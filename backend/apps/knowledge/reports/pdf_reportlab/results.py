@@ -1,25 +1,28 @@
 from reportlab.lib.pagesizes import A4
 from reportlab.lib.colors import HexColor, black, white
-from apps.knowledge.models import ReportFinding
 from reportlab.platypus import Paragraph
 from reportlab.lib.styles import ParagraphStyle
+from .fonts import REGULAR, BOLD
+from .forms import draw_frame
+from .pagination import draw_page_label
+from .layout import wrapped_paragraph
 
+# Module level so wrapped titles can be reused (see layout.py)
+TABLE_STYLE = ParagraphStyle(
+    "table_style",
+    fontName=REGULAR,
+    fontSize=9,
+    leading=11,
+)
 
-def draw_results(c, data, report_id, page_no, total_pages):
+
+def draw_results(c, data, snapshot, page_no, total_pages):
     W, H = A4
     margin = 40
 
     # =========================
     # Sorting Setup
     # =========================
-    SEVERITY_ORDER = {
-        "CRITICAL": 0,
-        "HIGH": 1,
-        "MEDIUM": 2,
-        "LOW": 3,
-        "INFO": 4,
-    }
-
     STATUS_ORDER = {
         "Pending": 0,
         "Patched": 1,
@@ -38,16 +41,12 @@ def draw_results(c, data, report_id, page_no, total_pages):
     "Pending": HexColor("#C00000"),   # Red
 }
     findings = [
-        f for f in ReportFinding.objects.filter(report_id=report_id)
+        f for f in snapshot.findings
         if (f.final_title and f.final_severity)
     ]
 
-    findings.sort(
-        key=lambda f: (
-            STATUS_ORDER.get(f.status or "Pending", 1),
-            SEVERITY_ORDER.get((f.final_severity or "").upper(), 5)
-        )
-    )
+    # The snapshot is already ordered by severity; the sort is stable
+    findings.sort(key=lambda f: STATUS_ORDER.get(f.status or "Pending", 1))
 
     # =========================
     # Count Summary
@@ -62,18 +61,17 @@ def draw_results(c, data, report_id, page_no, total_pages):
     # Frame & Header
     # =========================
     c.setLineWidth(0.8)
-    c.rect(margin, margin, W - 2 * margin, H - 2 * margin)
+    draw_frame(c, margin, H - 50)
 
-    c.setFont("Helvetica-Bold", 10)
+    c.setFont(BOLD, 10)
     c.drawString(margin + 10, H - 50, data["application_name"])
-    c.drawRightString(W - margin - 10, H - 50, "Penetration Testing Report")
 
     # =========================
     # 3. Project Scope
     # =========================
     scope_y = H - 100
 
-    c.setFont("Helvetica-Bold", 14)
+    c.setFont(BOLD, 14)
     c.drawString(margin + 10, scope_y, "3. Project Scope")
 
     scope_text = (
@@ -82,7 +80,7 @@ def draw_results(c, data, report_id, page_no, total_pages):
         "A RED team resource was deployed to perform this activity."
     )
 
-    style = ParagraphStyle("scope", fontName="Helvetica", fontSize=10, leading=14)
+    style = ParagraphStyle("scope", fontName=REGULAR, fontSize=10, leading=14)
     p = Paragraph(scope_text, style)
 
     text_width = W - (2 * margin) - 20
@@ -94,7 +92,7 @@ def draw_results(c, data, report_id, page_no, total_pages):
     # =========================
     results_title_y = scope_y - 40 - text_height - 30
 
-    c.setFont("Helvetica-Bold", 14)
+    c.setFont(BOLD, 14)
     c.drawString(margin + 10, results_title_y, "4. Penetration Testing Results")
 
     # =========================
@@ -120,14 +118,14 @@ def draw_results(c, data, report_id, page_no, total_pages):
         c.setFillColor(col_colors[i])
         c.rect(x, table_top, cols[i], row_h, fill=1)
         c.setFillColor(white)
-        c.setFont("Helvetica-Bold", 9)
+        c.setFont(BOLD, 9)
         c.drawCentredString(x + cols[i] / 2, table_top + 9, header)
         x += cols[i]
 
     y_row = table_top - row_h
     x = table_left
     c.setFillColor(black)
-    c.setFont("Helvetica-Bold", 9)
+    c.setFont(BOLD, 9)
 
     for w in cols:
         c.rect(x, y_row, w, row_h, fill=0)
@@ -175,7 +173,7 @@ def draw_results(c, data, report_id, page_no, total_pages):
         c.setStrokeColor(GRID)
         c.line(chart_left, y_axis, chart_left + chart_w, y_axis)
         c.setFillColor(white)
-        c.setFont("Helvetica", 7)
+        c.setFont(REGULAR, 7)
         c.drawRightString(chart_left - 6, y_axis - 3, str(i))
 
     bar_w = 35
@@ -188,7 +186,7 @@ def draw_results(c, data, report_id, page_no, total_pages):
         c.rect(x, chart_bottom, bar_w, bar_height, fill=1)
 
         c.setFillColor(white)
-        c.setFont("Helvetica", 8)
+        c.setFont(REGULAR, 8)
         c.drawCentredString(x + bar_w/2, chart_bottom + bar_height + 4, str(val))
         c.drawCentredString(x + bar_w/2, chart_bottom - 12, label)
 
@@ -207,12 +205,7 @@ def draw_results(c, data, report_id, page_no, total_pages):
         base_row_h = 22
         total_width = col1 + col2 + col3 + col4
 
-        table_style = ParagraphStyle(
-            "table_style",
-            fontName="Helvetica",
-            fontSize=9,
-            leading=11,
-        )
+        table_style = TABLE_STYLE
 
         def draw_table_header(y_top):
             c.setLineWidth(0.5)
@@ -220,7 +213,7 @@ def draw_results(c, data, report_id, page_no, total_pages):
             c.rect(table_left, y_top - base_row_h, total_width, base_row_h, fill=1)
 
             c.setFillColor(white)
-            c.setFont("Helvetica-Bold", 9)
+            c.setFont(BOLD, 9)
 
             text_y = y_top - 15
             c.drawString(table_left + 5, text_y, "S.No")
@@ -232,7 +225,7 @@ def draw_results(c, data, report_id, page_no, total_pages):
 
         table_y = draw_table_header(table_y)
 
-        c.setFont("Helvetica", 9)
+        c.setFont(REGULAR, 9)
         c.setLineWidth(0.5)
 
         for idx, f in enumerate(findings, start=1):
@@ -240,9 +233,10 @@ def draw_results(c, data, report_id, page_no, total_pages):
             severity = (f.final_severity or "").upper()
             status = f.status or "Pending"
 
-            title_para = Paragraph(f.final_title, table_style)
             available_width = col2 - 10
-            _, text_height = title_para.wrap(available_width, 100)
+            title_para, text_height = wrapped_paragraph(
+                f.final_title, table_style, available_width, 100
+            )
 
             row_h = max(base_row_h, text_height + 8)
 
@@ -252,16 +246,15 @@ def draw_results(c, data, report_id, page_no, total_pages):
                 page_no += 1
 
                 c.setLineWidth(0.8)
-                c.rect(margin, margin, W - 2 * margin, H - 2 * margin)
+                draw_frame(c, margin, H - 50)
 
-                c.setFont("Helvetica-Bold", 10)
+                c.setFont(BOLD, 10)
                 c.drawString(margin + 10, H - 50, data["application_name"])
-                c.drawRightString(W - margin - 10, H - 50, "Penetration Testing Report")
 
                 table_y = H - 100
                 table_y = draw_table_header(table_y)
 
-                c.setFont("Helvetica", 9)
+                c.setFont(REGULAR, 9)
                 c.setLineWidth(0.5)
 
             # Row border
@@ -305,8 +298,8 @@ def draw_results(c, data, report_id, page_no, total_pages):
     # =========================
     # Footer
     # =========================
-    c.setFont("Helvetica", 9)
+    c.setFont(REGULAR, 9)
     c.setFillColor(black)
     c.drawString(margin + 10, margin + 15, "Confidential")
     c.drawCentredString(W / 2, margin + 15, f"V {data['version']}")
-    c.drawRightString(W - margin - 10, margin + 15, f"Page {page_no} of {total_pages}")
\ No newline at end of file
+    draw_page_label(c, W - margin - 10, margin + 15, page_no, total_pages)
\ No newline at end of file
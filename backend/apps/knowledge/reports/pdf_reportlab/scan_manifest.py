@@ -2,19 +2,21 @@ from reportlab.lib.pagesizes import A4
 from reportlab.lib.colors import HexColor, black, white
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.platypus import Paragraph
+from .fonts import REGULAR, BOLD
+from .forms import draw_frame
+from .pagination import draw_page_label
 
 
 def draw_scan_manifest(c, data, page_no, total_pages):
     W, H = A4
     margin = 40
 
-    # Outer border
-    c.rect(margin, margin, W - 2 * margin, H - 2 * margin)
+    # Outer border + static header
+    draw_frame(c, margin, H - 50)
 
     # Header
-    c.setFont("Helvetica-Bold", 10)
+    c.setFont(BOLD, 10)
     c.drawString(margin + 10, H - 50, data["enterprise"])
-    c.drawRightString(W - margin - 10, H - 50, "Penetration Testing Report")
 
     # -------------------------
     # Table geometry
@@ -40,7 +42,7 @@ def draw_scan_manifest(c, data, page_no, total_pages):
     c.rect(table_left, bar_y, table_width, bar_height, fill=1)
 
     c.setFillColor(white)
-    c.setFont("Helvetica-Bold", 12)
+    c.setFont(BOLD, 12)
     c.drawCentredString(table_left + table_width / 2, bar_y + 12, "Scan Manifest")
 
     # Space between header and table
@@ -63,7 +65,7 @@ def draw_scan_manifest(c, data, page_no, total_pages):
 
     label_style = ParagraphStyle(
         "label",
-        fontName="Helvetica-Bold",
+        fontName=BOLD,
         fontSize=10,
         leading=14,
         textColor=black,
@@ -71,7 +73,7 @@ def draw_scan_manifest(c, data, page_no, total_pages):
 
     value_style = ParagraphStyle(
         "value",
-        fontName="Helvetica-Bold",
+        fontName=BOLD,
         fontSize=10,
         leading=14,
         textColor=black,
@@ -92,7 +94,7 @@ def draw_scan_manifest(c, data, page_no, total_pages):
         c.setFillColor(black)
 
         # Column A
-        c.setFont("Helvetica-Bold", 10)
+        c.setFont(BOLD, 10)
         c.drawCentredString(
     table_left + col_a / 2,
     y + row_h / 2 - 4,
@@ -112,12 +114,8 @@ def draw_scan_manifest(c, data, page_no, total_pages):
     # -------------------------
     # Footer
     # -------------------------
-    c.setFont("Helvetica", 9)
+    c.setFont(REGULAR, 9)
     c.drawString(margin + 10, margin + 15, "Confidential")
     c.drawCentredString(W / 2, margin + 15, f"V {data['version']}")
-    c.drawRightString(
-    W - margin - 10,
-    margin + 15,
-    f"Page {page_no} of {total_pages}"
-)
+    draw_page_label(c, W - margin - 10, margin + 15, page_no, total_pages)
 
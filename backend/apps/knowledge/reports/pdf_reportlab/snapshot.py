@@ -0,0 +1,106 @@
+"""
+Read-only view of a report, loaded once per render.
+
+All section renderers work from the same ReportSnapshot instead of
+querying ReportFinding themselves.  Loading takes a fixed number of
+queries (findings in one, evidence in one) regardless of how many
+findings the report has.  The final_* values are computed by the
+database, which also returns the findings in report order: by severity
+rank, then by creation.
+"""
+
+from apps.knowledge.models import ReportFinding, FindingEvidence
+
+
+class EvidenceRecord:
+    __slots__ = ("id", "title", "description", "path", "url")
+
+    def __init__(self, evidence):
+        self.id = evidence.id
+        self.title = evidence.title
+        self.description = evidence.description
+
+        # Prefer the downscaled print rendition once it exists
+        source = evidence.print_file or evidence.file
+
+        try:
+            self.path = source.path
+            self.url = source.url
+        except ValueError:
+            # No file attached
+            self.path = None
+            self.url = None
+
+
+class FindingRecord:
+    __slots__ = (
+        "id",
+        "status",
+        "final_title",
+        "final_severity",
+        "final_description",
+        "final_impact",
+        "final_remediation",
+        "evidences",
+    )
+
+    def __init__(self, finding, evidences=None):
+        self.id = finding.id
+        self.status = finding.status
+        self.final_title = finding.final_title
+        self.final_severity = finding.final_severity
+        self.final_description = finding.final_description
+        self.final_impact = finding.final_impact
+        self.final_remediation = finding.final_remediation
+        if evidences is None:
+            evidences = [EvidenceRecord(ev) for ev in finding.evidences.all()]
+        self.evidences = evidences
+
+
+class ReportSnapshot:
+    __slots__ = ("report_id", "findings")
+
+    def __init__(self, report_id, findings):
+        self.report_id = report_id
+        self.findings = findings
+
+    @classmethod
+    def load(cls, report_id, evidences=True):
+        """
+        With ``evidences=False`` findings are streamed from the database
+        without their evidence; attach it per chunk with
+        ``load_evidences``.
+        """
+        findings = (
+            ReportFinding.objects
+            .filter(report_id=report_id)
+            .with_final_values()
+            .order_by("severity_rank", "id")
+        )
+
+        if not evidences:
+            return cls(report_id, [
+                FindingRecord(f, evidences=[])
+                for f in findings.iterator(chunk_size=500)
+            ])
+
+        findings = findings.prefetch_related("evidences")
+        return cls(report_id, [FindingRecord(f) for f in findings])
+
+
+def load_evidences(findings):
+    """
+    Attach evidence to ``findings`` (FindingRecords) in one query.
+    """
+    by_id = {f.id: f for f in findings}
+    for f in findings:
+        f.evidences = []
+
+    rows = (
+        FindingEvidence.objects
+        .filter(finding_id__in=by_id)
+        .order_by("id")
+        .iterator(chunk_size=500)
+    )
+    for ev in rows:
+        by_id[ev.finding_id].evidences.append(EvidenceRecord(ev))
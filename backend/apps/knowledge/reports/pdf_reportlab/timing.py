@@ -0,0 +1,154 @@
+"""
+Per-section timing of a PDF render.
+
+``build_report`` times each section, the snapshot load and
+``canvas.save()`` into a RenderTimings; the parallel, incremental and
+streaming builds time their own steps (parts, fragments, stitching).  While a render is active, the
+image cache and the paragraph layout cache add the time they spend
+decoding and wrapping under "images" and "layout", so those totals
+overlap the section times rather than adding to them.
+
+Finished timings go out three ways: as a ``Server-Timing`` header (see
+``server_timing_header``), as one structured log line per render, and
+into the process-wide per-section ``histogram``, served by
+``GET /api/reports/pdf/metrics/``.
+"""
+
+import bisect
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+_local = threading.local()
+
+
+class RenderTimings:
+
+    def __init__(self):
+        self.durations = {}  # name -> seconds, in first-seen order
+        self.notes = {}      # name -> description without a duration
+        self._open = set()
+
+    def add(self, name, seconds):
+        self.durations[name] = self.durations.get(name, 0.0) + seconds
+
+    @contextmanager
+    def section(self, name):
+        # A section nested in one of the same name (a build mode falling
+        # back to build_report inside its "total") is only counted once
+        if name in self._open:
+            yield
+            return
+
+        self._open.add(name)
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._open.discard(name)
+            self.add(name, time.perf_counter() - started)
+
+    def note(self, name, description):
+        self.notes[name] = description
+
+    def as_ms(self):
+        return {name: round(s * 1000, 1) for name, s in self.durations.items()}
+
+    def record(self, report_id):
+        """
+        Log the timings and add them to the histogram.
+        """
+        timings_ms = self.as_ms()
+        logger.info(
+            "report_pdf_render report_id=%s %s",
+            report_id,
+            " ".join(f"{name}_ms={ms}" for name, ms in timings_ms.items()),
+            extra={"report_id": report_id, "timings_ms": timings_ms},
+        )
+        for name, seconds in self.durations.items():
+            histogram.observe(name, seconds)
+
+
+@contextmanager
+def activate(timings):
+    """
+    Make ``timings`` the target of ``track`` in this thread.
+    """
+    previous = getattr(_local, "timings", None)
+    _local.timings = timings
+    try:
+        yield timings
+    finally:
+        _local.timings = previous
+
+
+@contextmanager
+def track(name):
+    """
+    Add the duration of the block to the active render, if any.
+    """
+    timings = getattr(_local, "timings", None)
+    if timings is None:
+        yield
+        return
+
+    with timings.section(name):
+        yield
+
+
+def server_timing_header(timings):
+    parts = [f"{name};dur={ms}" for name, ms in timings.as_ms().items()]
+    parts += [f'{name};desc="{desc}"' for name, desc in timings.notes.items()]
+    return ", ".join(parts)
+
+
+# =========================
+# Histogram
+# =========================
+
+# Upper bounds in seconds
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+
+class SectionHistogram:
+    """
+    Cumulative-friendly histogram of section durations per process.
+    Each web or worker process keeps its own.
+    """
+
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = tuple(buckets)
+        self._sections = {}  # name -> [counts..., overflow], sum
+        self._lock = threading.Lock()
+
+    def observe(self, name, seconds):
+        i = bisect.bisect_left(self.buckets, seconds)
+        with self._lock:
+            counts, total = self._sections.get(name, ([0] * (len(self.buckets) + 1), 0.0))
+            counts[i] += 1
+            self._sections[name] = (counts, total + seconds)
+
+    def snapshot(self):
+        """
+        ``{section: {"count", "sum", "buckets": {le: cumulative count}}}``
+        """
+        with self._lock:
+            result = {}
+            for name, (counts, total) in self._sections.items():
+                cumulative = 0
+                buckets = {}
+                for le, count in zip(self.buckets + ("+Inf",), counts):
+                    cumulative += count
+                    buckets[str(le)] = cumulative
+                result[name] = {"count": cumulative, "sum": total, "buckets": buckets}
+            return result
+
+    def clear(self):
+        with self._lock:
+            self._sections.clear()
+
+
+histogram = SectionHistogram()
@@ -1,45 +1,47 @@
 from reportlab.lib.pagesizes import A4
 from reportlab.lib.colors import HexColor
+from .fonts import REGULAR, BOLD
+from .forms import draw_frame
+from .pagination import draw_page_label, defer_string, toc_entry_form
 
 BLUE = HexColor("#1f4fd8")
 
-def draw_toc(c, data, page_no, total_pages, section_pages):
+def draw_toc(c, data, page_no, total_pages, section_pages=None):
 
     W, H = A4
     margin = 40
 
-    c.rect(margin, margin, W - 2 * margin, H - 2 * margin)
+    draw_frame(c, margin, H - 50)
 
     # Header
-    c.setFont("Helvetica-Bold", 10)
+    c.setFont(BOLD, 10)
     c.drawString(margin + 10, H - 50, data["enterprise"])
-    c.drawRightString(W - margin - 10, H - 50, "Penetration Testing Report")
 
     # Title
-    c.setFont("Helvetica-Bold", 14)
+    c.setFont(BOLD, 14)
     c.setFillColor(BLUE)
     c.drawCentredString(W / 2, H - 140, "Table of Contents")
     c.setFillColorRGB(0, 0, 0)
 
     entries = [
-        ("1. Executive Summary", section_pages["executive_summary"]),
-        ("1.1 Overview", section_pages["executive_summary"]),
-        ("1.2 Risk Model", section_pages["executive_summary"]),
-        ("2. Web Application Penetration Testing Methodology", section_pages["methodology"]),
-        ("3. Project Scope", section_pages["scope"]),
-        ("4. Penetration Testing Results", section_pages["results"]),
-        ("5. Conclusion", section_pages["conclusion"]),
+        ("1. Executive Summary", "executive_summary"),
+        ("1.1 Overview", "executive_summary"),
+        ("1.2 Risk Model", "executive_summary"),
+        ("2. Web Application Penetration Testing Methodology", "methodology"),
+        ("3. Project Scope", "scope"),
+        ("4. Penetration Testing Results", "results"),
+        ("5. Conclusion", "conclusion"),
     ]
 
     y = H - 200
     line_width = 400
 
-    c.setFont("Helvetica-Bold", 10)
+    c.setFont(BOLD, 10)
 
-    for title, page in entries:
+    for title, section in entries:
         c.drawString(margin + 60, y, title)
 
-        text_width = c.stringWidth(title, "Helvetica-Bold", 10)
+        text_width = c.stringWidth(title, BOLD, 10)
         dots_x = margin + 60 + text_width + 5
         dots_end = margin + 60 + line_width
 
@@ -47,16 +49,18 @@ def draw_toc(c, data, page_no, total_pages, section_pages):
         c.line(dots_x, y - 2, dots_end, y - 2)
         c.setDash()
 
-        c.drawRightString(margin + 60 + line_width + 30, y, str(page))
+        # Sections after the TOC are not laid out yet in a single pass,
+        # so their page numbers are filled in once the build finishes.
+        page_x = margin + 60 + line_width + 30
+        if section_pages and section in section_pages:
+            c.drawRightString(page_x, y, str(section_pages[section]))
+        else:
+            defer_string(c, toc_entry_form(section), page_x, y)
 
         y -= 22
 
     # Footer (dynamic)
-    c.setFont("Helvetica", 9)
+    c.setFont(REGULAR, 9)
     c.drawString(margin + 10, margin + 15, "Confidential")
     c.drawCentredString(W / 2, margin + 15, f"V {data['version']}")
-    c.drawRightString(
-        W - margin - 10,
-        margin + 15,
-        f"Page {page_no} of {total_pages}"
-    )
+    draw_page_label(c, W - margin - 10, margin + 15, page_no, total_pages)
@@ -0,0 +1,123 @@
+"""
+Print renditions of evidence screenshots.
+
+Uploaded evidence is often a full-resolution screenshot of several MB,
+while the PDF shows it in a 465 x 200 pt box.  After upload a
+background thread writes a downscaled, recompressed JPEG sized for that
+box at PRINT_DPI into ``FindingEvidence.print_file``; the renderer
+embeds that instead of the original.
+"""
+
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from django.db import close_old_connections, transaction
+from PIL import Image
+
+from apps.knowledge.models import FindingEvidence
+from .pdf_reportlab.detailed_findings import (
+    EVIDENCE_IMAGE_WIDTH,
+    EVIDENCE_IMAGE_HEIGHT,
+)
+
+logger = logging.getLogger(__name__)
+
+PRINT_DPI = 150
+JPEG_QUALITY = 85
+MAX_WORKERS = 2
+
+# Largest pixel size that can still be visible in the evidence box
+PRINT_MAX_SIZE = (
+    round(EVIDENCE_IMAGE_WIDTH / 72 * PRINT_DPI),
+    round(EVIDENCE_IMAGE_HEIGHT / 72 * PRINT_DPI),
+)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    global _executor
+
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=MAX_WORKERS,
+                thread_name_prefix="evidence-rendition",
+            )
+        return _executor
+
+
+def make_rendition(source):
+    """
+    Return JPEG bytes of ``source`` (a path or file object) fitted into
+    PRINT_MAX_SIZE.  Transparent areas are flattened onto white.
+    """
+    with Image.open(source) as img:
+        img.draft("RGB", PRINT_MAX_SIZE)
+        img.thumbnail(PRINT_MAX_SIZE, Image.LANCZOS)
+
+        if img.mode in ("RGBA", "LA", "P"):
+            img = img.convert("RGBA")
+            flat = Image.new("RGB", img.size, "white")
+            flat.paste(img, mask=img.getchannel("A"))
+            img = flat
+        elif img.mode != "RGB":
+            img = img.convert("RGB")
+
+        out = BytesIO()
+        img.save(out, "JPEG", quality=JPEG_QUALITY, optimize=True)
+        return out.getvalue()
+
+
+def generate_rendition(evidence_id):
+    """
+    Create the print rendition for one evidence row.  Safe to call
+    again; failures are logged and the renderer keeps using the
+    original file.
+    """
+    try:
+        evidence = FindingEvidence.objects.get(id=evidence_id)
+    except FindingEvidence.DoesNotExist:
+        return None
+
+    if not evidence.file:
+        return None
+
+    try:
+        with evidence.file.open("rb") as f:
+            data = make_rendition(f)
+    except Exception:
+        logger.exception("Could not create print rendition for evidence %s", evidence_id)
+        return None
+
+    base = os.path.splitext(os.path.basename(evidence.file.name))[0]
+    evidence.print_file.save(f"{base}.jpg", ContentFile(data), save=False)
+
+    # Only touch the one column, the row may have been edited meanwhile
+    FindingEvidence.objects.filter(id=evidence_id).update(
+        print_file=evidence.print_file.name
+    )
+    return evidence.print_file.name
+
+
+def _run_in_background(evidence_id):
+    close_old_connections()
+    try:
+        generate_rendition(evidence_id)
+    finally:
+        close_old_connections()
+
+
+def schedule_rendition(evidence):
+    """
+    Generate the print rendition in the background once the upload has
+    been committed.
+    """
+    transaction.on_commit(
+        lambda: _get_executor().submit(_run_in_background, evidence.id)
+    )
@@ -1,13 +1,30 @@
-from django.http import HttpResponse, Http404
-from apps.knowledge.models import Report
-from .pdf_reportlab.build import build_report
-import tempfile
+import os
 
+from django.conf import settings
+from django.http import Http404, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django.utils.cache import get_conditional_response
+from apps.knowledge.models import Report, ReportRenderJob
+from apps.knowledge.serializers import ReportRenderJobSerializer, ReportExportSerializer
+from .artifacts import (
+    DEFAULT_ENGINE,
+    ENGINES,
+    artifact_path,
+    report_fingerprint,
+    render_report_artifact,
+)
+from .export import stream_reports_zip
+from .pdf_reportlab.timing import RenderTimings, histogram, server_timing_header
+from .jobs import enqueue_render
+from .spool import spool_response
+
+from rest_framework import status
 from rest_framework.views import APIView
-from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
+from rest_framework.permissions import AllowAny, IsAuthenticated
 # from rest_framework.permissions import IsAuthenticated    <------- Enable JWT auth later
 from rest_framework_simplejwt.authentication import JWTAuthentication
-from drf_spectacular.utils import extend_schema
+from drf_spectacular.utils import extend_schema, OpenApiParameter
 from drf_spectacular.types import OpenApiTypes
 
 
@@ -23,41 +40,201 @@ class ReportPDFView(APIView):
         summary="Export Report as PDF",
         description="Generates and exports a complete security assessment report as a PDF file.",
         tags=["Reports"],
+        parameters=[
+            OpenApiParameter(
+                "engine",
+                str,
+                enum=list(ENGINES),
+                description="Renderer: `reportlab` (default) or `html` (WeasyPrint templates)",
+            ),
+        ],
         responses={
             200: OpenApiTypes.BINARY,
+            400: {"description": "Unknown engine"},
             401: {"description": "Unauthorized - No valid JWT token"},
             404: {"description": "Report not found"},
         },
     )
     def get(self, request, report_id):
+        engine = request.query_params.get("engine", DEFAULT_ENGINE)
+        if engine not in ENGINES:
+            return Response(
+                {"error": f"engine must be one of: {', '.join(ENGINES)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
         try:
-            report = Report.objects.get(id=report_id)
+            report = Report.objects.select_related("created_by").get(id=report_id)
         except Report.DoesNotExist:
             raise Http404("Report not found")
 
-        data = {
-            "enterprise": report.application_name,
-            "pt_date": report.created_at.strftime("%b %Y") if report.created_at else "N/A",
-            "conducted_by": report.created_by if hasattr(report, "created_by") else "Cyber Team",
-            "version": report.version if hasattr(report, "version") else "1.0",
-            "assessee": report.client_name,
-            "assessor": report.created_by if hasattr(report, "created_by") else "John",
-            "reviewer": "Jane",
-            "approved": "CTO",
-            "total_pages": 8,
-            "start_date": report.start_date.strftime("%d-%b-%Y") if report.start_date else "",
-            "end_date": report.end_date.strftime("%d-%b-%Y") if report.end_date else "",
-            "application_name": report.application_name,
-            "created_by": report.created_by,
-        }
-
-        tmp = tempfile.NamedTemporaryFile(delete=False, suffix=".pdf")
-        build_report(tmp.name, data, report.id)
-
-        with open(tmp.name, "rb") as f:
-            response = HttpResponse(f.read(), content_type="application/pdf")
-            response["Content-Disposition"] = f'inline; filename="VAPT_{report.client_name}.pdf"'
-            response["Cache-Control"] = "no-store, no-cache, must-revalidate, max-age=0"
-            response["Pragma"] = "no-cache"
-            response["Expires"] = "0"
-            return response
+        timings = RenderTimings()
+
+        # The fingerprint is the ETag: an unchanged report answers a
+        # conditional GET with 304 and never reaches the renderer.
+        with timings.section("fingerprint"):
+            fingerprint = report_fingerprint(report, engine)
+        etag = f'"{fingerprint}"'
+
+        not_modified = get_conditional_response(request, etag=etag)
+        if not_modified is not None:
+            not_modified["ETag"] = etag
+            not_modified["Cache-Control"] = "private, no-cache"
+            not_modified["Server-Timing"] = server_timing_header(timings)
+            return not_modified
+
+        path = render_report_artifact(report, fingerprint, timings=timings, engine=engine)
+
+        response = spool_response(path, f"VAPT_{report.client_name}.pdf")
+        # Always revalidate; the ETag makes that a cheap 304.
+        response["ETag"] = etag
+        response["Cache-Control"] = "private, no-cache"
+        response["Server-Timing"] = server_timing_header(timings)
+        return response
+
+
+class ReportPDFMetricsView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    @extend_schema(
+        operation_id="report_pdf_metrics",
+        summary="PDF render timings per section",
+        description="Histogram of render durations per section (`total`, `snapshot`, `detailed_findings`, ...) for the renders served by this process: count, sum in seconds and cumulative bucket counts keyed by upper bound. Each server process and render worker keeps its own.",
+        tags=["Reports"],
+        responses={200: OpenApiTypes.OBJECT},
+    )
+    def get(self, request):
+        return Response(histogram.snapshot())
+
+
+# -------------------------
+# BACKGROUND RENDER JOBS
+# -------------------------
+class ReportPDFJobCreateView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    @extend_schema(
+        operation_id="queue_report_pdf",
+        summary="Queue a background PDF export",
+        description="Queues the report for rendering by `manage.py render_worker`. Poll the returned job until it is Done, then fetch `download_url`.",
+        tags=["Reports"],
+        request=None,
+        responses={202: ReportRenderJobSerializer, 404: {"description": "Report not found"}},
+    )
+    def post(self, request, report_id):
+        report = get_object_or_404(Report.objects.select_related("created_by"), id=report_id)
+
+        job = enqueue_render(report, user=request.user)
+
+        serializer = ReportRenderJobSerializer(job)
+        response = Response(serializer.data, status=status.HTTP_202_ACCEPTED)
+        response["Location"] = f"/api/reports/{report.id}/pdf/jobs/{job.id}/"
+        return response
+
+
+class ReportPDFJobDetailView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    @extend_schema(
+        operation_id="report_pdf_job_status",
+        summary="Background PDF export status",
+        tags=["Reports"],
+        responses={200: ReportRenderJobSerializer, 404: {"description": "Job not found"}},
+    )
+    def get(self, request, report_id, pk):
+        job = get_object_or_404(ReportRenderJob, id=pk, report_id=report_id)
+        serializer = ReportRenderJobSerializer(job)
+        return Response(serializer.data)
+
+
+class ReportPDFJobDownloadView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    @extend_schema(
+        operation_id="report_pdf_job_download",
+        summary="Download a background PDF export",
+        tags=["Reports"],
+        responses={
+            200: OpenApiTypes.BINARY,
+            404: {"description": "Job not found"},
+            409: {"description": "Job has not finished yet"},
+            410: {"description": "Rendered PDF is no longer available"},
+        },
+    )
+    def get(self, request, report_id, pk):
+        job = get_object_or_404(
+            ReportRenderJob.objects.select_related("report"),
+            id=pk,
+            report_id=report_id,
+        )
+
+        if job.status != "Done":
+            return Response(
+                {"error": f"Job is {job.status}"},
+                status=status.HTTP_409_CONFLICT
+            )
+
+        path = artifact_path(job.fingerprint)
+        if not os.path.exists(path):
+            return Response(
+                {"error": "Rendered PDF expired, queue a new export"},
+                status=status.HTTP_410_GONE
+            )
+
+        response = spool_response(
+            path,
+            f"VAPT_{job.report.client_name}.pdf",
+            as_attachment=True,
+        )
+        response["ETag"] = f'"{job.fingerprint}"'
+        return response
+
+
+# -------------------------
+# BATCH EXPORT
+# -------------------------
+class ReportExportView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    @extend_schema(
+        operation_id="export_reports_zip",
+        summary="Export several reports as a ZIP of PDFs",
+        description="Renders the given reports (by `report_ids`, or every report of `client_name`) concurrently and streams a ZIP back as each PDF finishes. Reports that fail to render are listed in `ERRORS.txt` inside the archive.",
+        tags=["Reports"],
+        request=ReportExportSerializer,
+        responses={
+            200: OpenApiTypes.BINARY,
+            400: {"description": "Invalid selection or too many reports"},
+            404: {"description": "No matching reports"},
+        },
+    )
+    def post(self, request):
+        serializer = ReportExportSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        selection = serializer.validated_data
+
+        reports = Report.objects.select_related("created_by").order_by("id")
+        if "report_ids" in selection:
+            reports = reports.filter(id__in=selection["report_ids"])
+        else:
+            reports = reports.filter(client_name=selection["client_name"])
+
+        reports = list(reports[:settings.REPORT_EXPORT_MAX_REPORTS + 1])
+
+        if not reports:
+            return Response(
+                {"error": "No matching reports"},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        if len(reports) > settings.REPORT_EXPORT_MAX_REPORTS:
+            return Response(
+                {"error": f"At most {settings.REPORT_EXPORT_MAX_REPORTS} reports per export"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        response = StreamingHttpResponse(
+            stream_reports_zip(reports, settings.REPORT_EXPORT_WORKERS),
+            content_type="application/zip",
+        )
+        response["Content-Disposition"] = 'attachment; filename="reports.zip"'
+        return response
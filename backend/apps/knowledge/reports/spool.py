@@ -0,0 +1,156 @@
+"""
+Disk spool for rendered PDFs.
+
+Rendered artifacts live in REPORT_PDF_CACHE_DIR and are streamed to the
+client straight from disk.  The directory is kept within a byte budget
+by evicting the least recently used files (a cache hit bumps the file's
+mtime) and anything older than REPORT_PDF_CACHE_MAX_AGE.  A sweep runs
+after a spooled response has been sent, at most once per
+REPORT_PDF_CACHE_SWEEP_INTERVAL seconds per process.  Incremental
+build fragments are swept the same way, within
+REPORT_PDF_FRAGMENT_MAX_BYTES.
+"""
+
+import os
+import threading
+import time
+
+from django.conf import settings
+from django.http import FileResponse
+
+# Files this young are never evicted, so a path handed to a request
+# is still there when the response opens it.
+EVICTION_GRACE_SECONDS = 60
+
+# Leftover partial renders from crashed workers, and build lock files
+# (see artifacts.get_or_build_artifact).  Removing a lock file at worst
+# lets a second process render the same PDF.
+STALE_TMP_SECONDS = 60 * 60
+
+_last_sweep = 0.0
+_sweep_lock = threading.Lock()
+
+
+def touch(path):
+    """
+    Mark a spooled file as recently used.
+    """
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+
+
+def _entries(directory):
+    try:
+        with os.scandir(directory) as it:
+            for entry in it:
+                if not entry.is_file(follow_symlinks=False):
+                    continue
+                try:
+                    st = entry.stat(follow_symlinks=False)
+                except OSError:
+                    continue
+                yield entry.path, st.st_size, st.st_mtime
+    except FileNotFoundError:
+        return
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+        return True
+    except OSError:
+        return False
+
+
+def sweep(directory=None, max_bytes=None, max_age=None, now=None):
+    """
+    Evict expired and least recently used files until the spool fits
+    its budget.  Returns the number of files removed.
+    """
+    directory = directory or settings.REPORT_PDF_CACHE_DIR
+    max_bytes = settings.REPORT_PDF_CACHE_MAX_BYTES if max_bytes is None else max_bytes
+    max_age = settings.REPORT_PDF_CACHE_MAX_AGE if max_age is None else max_age
+    now = time.time() if now is None else now
+
+    removed = 0
+    live = []
+
+    for path, size, mtime in _entries(directory):
+        age = now - mtime
+
+        if path.endswith((".tmp", ".lock")):
+            if age > STALE_TMP_SECONDS and _remove(path):
+                removed += 1
+            continue
+
+        if age > max_age and age > EVICTION_GRACE_SECONDS:
+            if _remove(path):
+                removed += 1
+            continue
+
+        live.append((mtime, size, path))
+
+    total = sum(size for _, size, _ in live)
+
+    # Oldest first
+    live.sort()
+    for mtime, size, path in live:
+        if total <= max_bytes:
+            break
+        if now - mtime < EVICTION_GRACE_SECONDS:
+            continue
+        if _remove(path):
+            total -= size
+            removed += 1
+
+    return removed
+
+
+def maybe_sweep():
+    """
+    Run ``sweep`` unless this process swept recently.
+    """
+    global _last_sweep
+
+    interval = settings.REPORT_PDF_CACHE_SWEEP_INTERVAL
+    now = time.monotonic()
+
+    if now - _last_sweep < interval:
+        return
+    if not _sweep_lock.acquire(blocking=False):
+        return
+
+    try:
+        _last_sweep = now
+        sweep()
+        if settings.REPORT_PDF_INCREMENTAL:
+            sweep(
+                settings.REPORT_PDF_FRAGMENT_DIR,
+                max_bytes=settings.REPORT_PDF_FRAGMENT_MAX_BYTES,
+            )
+    finally:
+        _sweep_lock.release()
+
+
+class SpoolFileResponse(FileResponse):
+    """
+    FileResponse that sweeps the spool once the body has been sent.
+    Streaming goes through ``wsgi.file_wrapper`` (sendfile) when the
+    server provides it.
+    """
+
+    def close(self):
+        super().close()
+        maybe_sweep()
+
+
+def spool_response(path, filename, as_attachment=False, content_type="application/pdf"):
+    touch(path)
+    return SpoolFileResponse(
+        open(path, "rb"),
+        as_attachment=as_attachment,
+        filename=filename,
+        content_type=content_type,
+    )
@@ -1,44 +1,30 @@
-from django.http import HttpResponse
+from django.shortcuts import get_object_or_404
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
-from .pdf_reportlab.build import build_report
-import tempfile
+from apps.knowledge.models import Report
+from .artifacts import render_report_artifact
+from .spool import spool_response
 
 
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
 def report_preview(request, report_id):
-    data = get_report_data(report_id)
+    report = get_report(report_id)
+    path = render_report_artifact(report)
 
-    tmp = tempfile.NamedTemporaryFile(delete=False, suffix=".pdf")
-    build_report(tmp.name, data)
-
-    with open(tmp.name, "rb") as f:
-        return HttpResponse(f.read(), content_type="application/pdf")
+    return spool_response(path, f"VAPT_Report_{report_id}.pdf")
 
 
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
 def report_pdf(request, report_id):
-    data = get_report_data(report_id)
-
-    tmp = tempfile.NamedTemporaryFile(delete=False, suffix=".pdf")
-    build_report(tmp.name, data)
+    report = get_report(report_id)
+    path = render_report_artifact(report)
 
-    response = HttpResponse(open(tmp.name, "rb").read(), content_type="application/pdf")
-    response["Content-Disposition"] = f'attachment; filename="VAPT_Report_{report_id}.pdf"'
-    return response
+    return spool_response(path, f"VAPT_Report_{report_id}.pdf", as_attachment=True)
 
-def get_report_data(report_id):
-    # Later we pull from DB.
-    return {
-        "enterprise": "ABC.COM",
-        "pt_date": "Jan 2026",
-        "conducted_by": "Cyber Team",
-        "version": "1.0",
-        "assessee": "ABC Corp",
-        "assessor": "John",
-        "reviewer": "Jane",
-        "approved": "CTO",
-        "total_pages": 8,
-    }
+def get_report(report_id):
+    return get_object_or_404(
+        Report.objects.select_related("created_by"),
+        id=report_id,
+    )
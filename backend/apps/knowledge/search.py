@@ -0,0 +1,145 @@
+"""
+Ranked full-text search over the vulnerability catalog.
+
+The index lives outside the model, in structures created by migration
+0024 and kept current by the database itself:
+
+* PostgreSQL: a stored, generated ``search_vector`` column (title
+  weighted A, description B, impact and remediation C) with a GIN index,
+  plus a trigram index on ``title``.  Queries go through
+  ``websearch_to_tsquery``, so any user input is valid; when nothing
+  matches, the title is searched by trigram similarity instead, which
+  finds "sql injcetion" or "deserialisation".  That fallback needs the
+  pg_trgm extension, which migration 0024 only creates when the app's
+  database role is allowed to; otherwise it is skipped.
+* SQLite (the test database): an external-content FTS5 table over the
+  same four columns, maintained by triggers and ranked with bm25 using
+  the same weighting.  There is no typo fallback here.
+
+Each backend returns ``(id, rank)`` pairs, best first; the definitions
+are then loaded with one query.  Higher ranks are better on every
+backend, but the values are not comparable between them.
+"""
+
+import re
+
+from django.db import connection
+
+from .models import VulnerabilityDefinition
+
+
+TABLE = VulnerabilityDefinition._meta.db_table
+FTS_TABLE = f"{TABLE}_fts"
+
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 100
+
+# bm25() weights for title, description, impact, remediation
+FTS_WEIGHTS = (10.0, 5.0, 1.0, 1.0)
+
+
+_pg_trgm = None
+
+
+def _has_pg_trgm(cursor):
+    # Migration 0024 skips the extension when the app role may not create it
+    global _pg_trgm
+    if _pg_trgm is None:
+        cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+        _pg_trgm = cursor.fetchone() is not None
+    return _pg_trgm
+
+
+def _postgres(q, limit):
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            SELECT id, ts_rank_cd(search_vector, query) AS rank
+            FROM {TABLE}, websearch_to_tsquery('english', %s) AS query
+            WHERE search_vector @@ query
+            ORDER BY rank DESC, id
+            LIMIT %s
+            """,
+            [q, limit],
+        )
+        rows = cursor.fetchall()
+        if rows or not _has_pg_trgm(cursor):
+            return rows
+
+        # No word matched: look for a misspelt title (uses the trigram index)
+        cursor.execute(
+            f"""
+            SELECT id, word_similarity(%s, title) AS rank
+            FROM {TABLE}
+            WHERE %s <%% title
+            ORDER BY rank DESC, id
+            LIMIT %s
+            """,
+            [q, q, limit],
+        )
+        return cursor.fetchall()
+
+
+def _fts5_query(q):
+    # Every word must match, as a prefix so results show up while typing.
+    # Words are quoted so FTS5 operators in the input are taken literally.
+    words = re.findall(r"\w+", q)
+    return " ".join('"%s"*' % w for w in words)
+
+
+def _sqlite(q, limit):
+    match = _fts5_query(q)
+    if not match:
+        return []
+
+    weights = ", ".join(str(w) for w in FTS_WEIGHTS)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            SELECT rowid, -bm25({FTS_TABLE}, {weights}) AS rank
+            FROM {FTS_TABLE}
+            WHERE {FTS_TABLE} MATCH %s
+            ORDER BY rank DESC, rowid
+            LIMIT %s
+            """,
+            [match, limit],
+        )
+        return cursor.fetchall()
+
+
+def _unindexed(q, limit):
+    ids = (
+        VulnerabilityDefinition.objects
+        .filter(title__icontains=q)
+        .order_by("title", "id")
+        .values_list("id", flat=True)[:limit]
+    )
+    return [(pk, 0.0) for pk in ids]
+
+
+BACKENDS = {
+    "postgresql": _postgres,
+    "sqlite": _sqlite,
+}
+
+
+def search_definitions(q, limit=DEFAULT_LIMIT):
+    """
+    Definitions matching ``q``, best first, each with a ``rank``
+    attribute.
+    """
+    q = (q or "").strip()
+    if not q:
+        return []
+
+    search = BACKENDS.get(connection.vendor, _unindexed)
+    ranked = search(q, limit)
+
+    definitions = VulnerabilityDefinition.objects.in_bulk([pk for pk, _ in ranked])
+    results = []
+    for pk, rank in ranked:
+        definition = definitions.get(pk)
+        if definition is not None:
+            definition.rank = rank
+            results.append(definition)
+    return results
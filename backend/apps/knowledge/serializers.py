@@ -7,6 +7,9 @@ from .models import (
     Report,
     ReportFinding,
     FindingEvidence,
+    ReportRenderJob,
+    FINDING_STATUSES,
+    SEVERITY_LEVELS,
 )
 from drf_spectacular.utils import extend_schema_field
 from drf_spectacular.types import OpenApiTypes
@@ -66,6 +69,11 @@ class VulnerabilityDefinitionSerializer(serializers.ModelSerializer):
         return value
 
 
+class VulnerabilitySearchResultSerializer(VulnerabilityDefinitionSerializer):
+    # Relevance from the search backend, higher is better
+    rank = serializers.FloatField(read_only=True)
+
+
 class OWASPCategorySerializer(serializers.ModelSerializer):
     vulnerabilities = VulnerabilityDefinitionSerializer(source="vulnerabilitydefinition_set", many=True, read_only=True)
 
@@ -90,8 +98,8 @@ class VulnerabilityVariantSerializer(serializers.ModelSerializer):
 # -------------------------
 
 class ReportSerializer(serializers.ModelSerializer):
-    findings_count = serializers.SerializerMethodField()
     severity_counts = serializers.SerializerMethodField()
+    status_counts = serializers.SerializerMethodField()
 
     class Meta:
         model = Report
@@ -110,11 +118,13 @@ class ReportSerializer(serializers.ModelSerializer):
             "approved_by",
             "findings_count",
             "severity_counts",
+            "status_counts",
+            "findings_changed_at",
             "status", # Added status field
             "created_at",
             "created_by"
         ]
-        read_only_fields = ["id", "created_by", "created_at"]
+        read_only_fields = ["id", "created_by", "created_at", "findings_count", "findings_changed_at"]
 
     def validate(self, data):
         start = data.get("start_date")
@@ -126,23 +136,19 @@ class ReportSerializer(serializers.ModelSerializer):
             )
         return data
 
-    @extend_schema_field(OpenApiTypes.INT)
-    def get_findings_count(self, obj):
-        return obj.findings.count()
-
     @extend_schema_field(OpenApiTypes.OBJECT)
     def get_severity_counts(self, obj):
-        counts = {"Critical": 0, "High": 0, "Medium": 0, "Low": 0}
-        # Efficiently iterate without N+1 (prefetched in view)
-        for finding in obj.findings.all():
-            sev = finding.final_severity
-            if sev in counts:
-                counts[sev] += 1
-            elif sev: # Handle case-sensitivity or other values if needed
-                capitalized = sev.capitalize()
-                if capitalized in counts:
-                    counts[capitalized] += 1
-        return counts
+        return {
+            level: getattr(obj, f"{level.lower()}_count")
+            for level in SEVERITY_LEVELS
+        }
+
+    @extend_schema_field(OpenApiTypes.OBJECT)
+    def get_status_counts(self, obj):
+        return {
+            status: getattr(obj, f"{status.lower()}_count")
+            for status in FINDING_STATUSES
+        }
 
 
 # -------------------------
@@ -229,3 +235,85 @@ class ReportFindingSerializer(serializers.ModelSerializer):
                 "tester_severity must be CRITICAL, HIGH, MEDIUM, or LOW"
             )
         return value
+
+
+class PreloadedDefinitionField(serializers.PrimaryKeyRelatedField):
+    """
+    Resolves the definition from ``context["definitions"]`` (an
+    in_bulk() dict) instead of running one query per item.
+    """
+
+    def to_internal_value(self, data):
+        # int() would accept True and truncate 2.7 to 2
+        if isinstance(data, bool) or (isinstance(data, float) and not data.is_integer()):
+            self.fail("incorrect_type", data_type=type(data).__name__)
+        try:
+            pk = int(data)
+        except (TypeError, ValueError):
+            self.fail("incorrect_type", data_type=type(data).__name__)
+
+        definition = self.context["definitions"].get(pk)
+        if definition is None:
+            self.fail("does_not_exist", pk_value=data)
+        return definition
+
+
+class BulkReportFindingSerializer(ReportFindingSerializer):
+    """
+    One item of a bulk import (see BulkReportFindingsView).  The report
+    comes from the URL, so it is not looked up per item either.
+    """
+    vulnerability = PreloadedDefinitionField(
+        queryset=VulnerabilityDefinition.objects.all(),
+        allow_null=True,
+        required=False,
+    )
+
+    class Meta(ReportFindingSerializer.Meta):
+        read_only_fields = ReportFindingSerializer.Meta.read_only_fields + ["report"]
+
+
+# -------------------------
+# BACKGROUND PDF RENDERING
+# -------------------------
+
+class ReportRenderJobSerializer(serializers.ModelSerializer):
+    download_url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ReportRenderJob
+        fields = [
+            "id",
+            "report",
+            "status",
+            "fingerprint",
+            "attempts",
+            "error",
+            "created_at",
+            "started_at",
+            "finished_at",
+            "download_url",
+        ]
+        read_only_fields = fields
+
+    @extend_schema_field(OpenApiTypes.STR)
+    def get_download_url(self, obj):
+        if obj.status != "Done":
+            return None
+        return f"/api/reports/{obj.report_id}/pdf/jobs/{obj.id}/download/"
+
+
+class ReportExportSerializer(serializers.Serializer):
+    report_ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        required=False,
+        allow_empty=False,
+    )
+    client_name = serializers.CharField(required=False, allow_blank=False)
+
+    def validate(self, data):
+        if ("report_ids" in data) == ("client_name" in data):
+            raise serializers.ValidationError(
+                "Provide either report_ids or client_name"
+            )
+        return data
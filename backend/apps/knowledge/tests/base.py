@@ -0,0 +1,29 @@
+from ..models import Report, VulnerabilityDefinition
+
+
+class ReportFixtures:
+    """
+    Builders for the report and vulnerability definition most tests
+    start from.  Keyword arguments override the defaults.
+    """
+
+    def create_report(self, **fields):
+        return Report.objects.create(**{
+            "client_name": "ACME",
+            "application_name": "Portal",
+            "report_type": "Web",
+            "target": "https://portal.example",
+            "prepared_by": "tester",
+            **fields,
+        })
+
+    def create_definition(self, **fields):
+        return VulnerabilityDefinition.objects.create(**{
+            "title": "SQL Injection",
+            "source_type": "CUSTOM",
+            "severity": "HIGH",
+            "description": "Unsanitised input",
+            "impact": "Data exposure",
+            "remediation": "Use parameterised queries",
+            **fields,
+        })
@@ -1,11 +1,12 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
 from django.test import TestCase
 from django.test.utils import CaptureQueriesContext
-from django.db import connection
-from django.contrib.auth.models import User
 
 from rest_framework.test import APIClient
 
-from .models import OWASPCategory
+from ..models import OWASPCategory
 
 
 class SelectiveCacheMiddlewareTests(TestCase):
@@ -36,7 +37,6 @@ class SelectiveCacheMiddlewareTests(TestCase):
                         "cached response should not add queries")
 
         # verify cache entry was created
-        from django.core.cache import cache
         self.assertIsNotNone(cache.get(self.owasp_url),
                              "cache key should be stored after initial GET")
 
@@ -66,7 +66,6 @@ class SelectiveCacheMiddlewareTests(TestCase):
         r1 = self.client.get(detail_url)
         self.assertEqual(r1.status_code, 200)
 
-        from django.core.cache import cache
         self.assertIsNotNone(cache.get(detail_url), "detail should be cached")
 
         # PATCH should clear the cache
@@ -79,3 +78,13 @@ class SelectiveCacheMiddlewareTests(TestCase):
         self.assertIsNone(cache.get(detail_url),
                           "PATCH should clear cache for that path")
 
+    def test_keyset_pages_are_not_cached(self):
+        """A write to the list shows up on its cursor-paginated pages."""
+        page_url = f"{self.owasp_url}?page_size=10"
+        r1 = self.client.get(page_url)
+        self.assertEqual(len(r1.data["results"]), 1)
+        self.assertIsNone(cache.get(page_url))
+
+        self.client.post(self.owasp_url, {"name": "bar"}, content_type="application/json")
+        r2 = self.client.get(page_url)
+        self.assertEqual(len(r2.data["results"]), 2)
@@ -0,0 +1,204 @@
+import gzip
+import json
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from rest_framework.test import APIClient
+
+from .. import catalog
+from ..catalog import build_tree
+from ..models import (
+    OWASPCategory,
+    VulnerabilityDefinition,
+    OWASPVulnerability,
+    VulnerabilityVariant,
+    CatalogVersion,
+)
+
+
+class VulnerabilitySearchTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="searcher", password="pwd")
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+        def define(title, description, impact="", remediation=""):
+            return VulnerabilityDefinition.objects.create(
+                title=title,
+                source_type="CUSTOM",
+                severity="HIGH",
+                description=description,
+                impact=impact,
+                remediation=remediation,
+            )
+
+        self.sqli = define("SQL Injection", "Unsanitised input reaches a query")
+        self.xss = define(
+            "Cross-Site Scripting",
+            "Input is reflected without encoding",
+            remediation="Encode output; avoid building SQL or HTML by hand",
+        )
+        self.idor = define("Insecure Direct Object Reference", "Missing authorisation checks")
+
+    def search(self, q, **params):
+        response = self.client.get("/api/vulnerabilities/search/", {"q": q, **params})
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_title_matches_rank_above_body_matches(self):
+        results = self.search("sql")
+
+        self.assertEqual([r["id"] for r in results], [self.sqli.id, self.xss.id])
+        self.assertGreater(results[0]["rank"], results[1]["rank"])
+        self.assertEqual(results[0]["name"], "SQL Injection")
+
+    def test_prefixes_stems_and_operator_characters(self):
+        self.assertEqual([r["id"] for r in self.search("authorisation check")], [self.idor.id])
+        self.assertEqual([r["id"] for r in self.search("inject")], [self.sqli.id])
+        # FTS syntax in the input is matched literally, not parsed
+        self.assertEqual([r["id"] for r in self.search('"cross" OR -site*')], [self.xss.id])
+        self.assertEqual(self.search("   "), [])
+        self.assertEqual(len(self.search("input", limit=1)), 1)
+
+    def test_results_are_not_cached_across_writes(self):
+        self.assertEqual([r["id"] for r in self.search("idor")], [])
+
+        response = self.client.post("/api/vulnerabilities/", {
+            "title": "IDOR on invoices",
+            "source_type": "CUSTOM",
+            "severity": "HIGH",
+            "description": "d",
+            "impact": "i",
+            "remediation": "r",
+        })
+        self.assertEqual(response.status_code, 201)
+
+        self.assertEqual([r["id"] for r in self.search("idor")], [response.data["id"]])
+
+    def test_index_follows_updates_and_deletes(self):
+        self.idor.title = "Broken Access Control"
+        self.idor.save()
+        self.sqli.delete()
+
+        self.assertEqual([r["id"] for r in self.search("access control")], [self.idor.id])
+        self.assertEqual(self.search("insecure direct"), [])
+        self.assertEqual([r["id"] for r in self.search("sql")], [self.xss.id])
+
+
+class CatalogTreeTests(TestCase):
+    def setUp(self):
+        catalog.clear()
+        self.user = User.objects.create_user(username="catalog", password="pwd")
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+        # Run the catalog bumps now, not at the end of the test
+        with self.captureOnCommitCallbacks(execute=True):
+            self.category = OWASPCategory.objects.create(name="A05 Injection")
+            self.vuln = OWASPVulnerability.objects.create(
+                category=self.category,
+                name="Injection",
+                description="Untrusted data sent to an interpreter",
+                default_severity="HIGH",
+                default_impact="Data loss",
+                default_remediation="Parameterise",
+            )
+            self.variant = VulnerabilityVariant.objects.create(owasp_vulnerability=self.vuln, name="SQL Injection")
+
+            def define(title, **links):
+                return VulnerabilityDefinition.objects.create(
+                    title=title, source_type="CUSTOM", severity="HIGH",
+                    description="d", impact="i", remediation="r", **links,
+                )
+
+            self.in_variant = define("Login SQLi", owasp_category=self.category,
+                                     owasp_vulnerability=self.vuln, variant=self.variant)
+            self.in_vuln = define("Generic injection", owasp_category=self.category, owasp_vulnerability=self.vuln)
+            self.in_category = define("Other injection", owasp_category=self.category)
+            self.unlinked = define("Custom issue")
+
+    def test_definitions_sit_under_their_most_specific_link(self):
+        response = self.client.get("/api/catalog/")
+        self.assertEqual(response.status_code, 200)
+
+        data = json.loads(response.content)
+        category, = data["categories"]
+        vuln, = category["vulnerabilities"]
+        variant, = vuln["variants"]
+
+        self.assertEqual([d["id"] for d in variant["definitions"]], [self.in_variant.id])
+        self.assertEqual([d["id"] for d in vuln["definitions"]], [self.in_vuln.id])
+        self.assertEqual([d["id"] for d in category["definitions"]], [self.in_category.id])
+        self.assertEqual([d["id"] for d in data["definitions"]], [self.unlinked.id])
+        self.assertEqual(variant["definitions"][0]["name"], "Login SQLi")
+
+    def test_build_runs_a_fixed_number_of_queries(self):
+        for i in range(5):
+            vuln = OWASPVulnerability.objects.create(
+                category=OWASPCategory.objects.create(name=f"Category {i}"),
+                name=f"Vuln {i}", description="", default_severity="LOW",
+                default_impact="", default_remediation="",
+            )
+            VulnerabilityVariant.objects.create(owasp_vulnerability=vuln, name=f"Variant {i}")
+
+        with self.assertNumQueries(4):
+            tree = build_tree()
+        self.assertEqual(len(tree["categories"]), 6)
+
+    def test_payload_is_reused_until_the_catalog_changes(self):
+        first = self.client.get("/api/catalog/", HTTP_ACCEPT_ENCODING="gzip, br")
+        self.assertEqual(first["Content-Encoding"], "gzip")
+        self.assertTrue(first["ETag"].endswith('-gzip"'))
+        body = json.loads(gzip.decompress(first.content))
+
+        # Served from the built blob: only the version is read
+        with CaptureQueriesContext(connection) as ctx:
+            plain = self.client.get("/api/catalog/")
+        self.assertEqual(len(ctx.captured_queries), 1)
+        self.assertEqual(json.loads(plain.content), body)
+        self.assertNotIn("Content-Encoding", plain)
+
+        unchanged = self.client.get("/api/catalog/", HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(unchanged.status_code, 304)
+
+        self.variant.name = "Blind SQL Injection"
+        with self.captureOnCommitCallbacks(execute=True):
+            self.variant.save()
+
+        changed = self.client.get("/api/catalog/", HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(changed.status_code, 200)
+        self.assertNotEqual(changed["ETag"], plain["ETag"])
+        variant = json.loads(changed.content)["categories"][0]["vulnerabilities"][0]["variants"][0]
+        self.assertEqual(variant["name"], "Blind SQL Injection")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.in_category.delete()
+        after_delete = json.loads(self.client.get("/api/catalog/").content)
+        self.assertEqual(after_delete["categories"][0]["definitions"], [])
+
+    def test_version_is_bumped_once_per_transaction(self):
+        before = CatalogVersion.current()
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            with transaction.atomic():
+                for i in range(20):
+                    VulnerabilityVariant.objects.create(
+                        owasp_vulnerability=self.vuln, name=f"Variant {i}",
+                    )
+                # Not visible until the import commits
+                self.assertEqual(CatalogVersion.current(), before)
+
+        self.assertEqual(len(callbacks), 1)
+        self.assertEqual(CatalogVersion.current(), before + 1)
+
+        # A rolled back transaction leaves the version alone
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            with self.assertRaises(RuntimeError), transaction.atomic():
+                self.variant.delete()
+                raise RuntimeError
+        self.assertEqual(callbacks, [])
+        self.assertEqual(CatalogVersion.current(), before + 1)
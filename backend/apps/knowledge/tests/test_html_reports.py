@@ -0,0 +1,185 @@
+import os
+import tempfile
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import connection
+from django.template.loader import render_to_string
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from rest_framework.test import APIClient
+
+from ..models import ReportFinding, FindingEvidence
+from ..report_preview_views import finding_fragment_key
+from ..reports.pdf_html.build import report_context
+from ..reports.pdf_html.fetcher import BASE_URL, media_cache, media_url_fetcher
+from ..reports.pdf_reportlab.snapshot import ReportSnapshot
+from .base import ReportFixtures
+
+
+class HTMLEngineTests(ReportFixtures, TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        settings_override = override_settings(
+            MEDIA_ROOT=self.tmpdir.name,
+            REPORT_PDF_CACHE_DIR=self.tmpdir.name,
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def test_fetcher_serves_media_from_disk_and_refuses_other_urls(self):
+        os.makedirs(os.path.join(self.tmpdir.name, "evidence"))
+        with open(os.path.join(self.tmpdir.name, "evidence", "a.png"), "wb") as f:
+            f.write(b"\x89PNG-fake")
+
+        media_cache.clear()
+        url = f"{BASE_URL}media/evidence/a.png"
+        first = media_url_fetcher(url)
+        before = media_cache.stats()
+        second = media_url_fetcher(url)
+
+        self.assertEqual(first["string"], b"\x89PNG-fake")
+        self.assertEqual(first["mime_type"], "image/png")
+        self.assertEqual(second["string"], first["string"])
+        self.assertEqual(media_cache.stats()["hits"], before["hits"] + 1)
+
+        for bad in (
+            "https://example.com/media/evidence/a.png",
+            f"{BASE_URL}media/../../etc/passwd",
+            f"{BASE_URL}static/app.css",
+        ):
+            with self.assertRaises(ValueError):
+                media_url_fetcher(bad)
+
+    def test_template_uses_external_stylesheet_and_media_urls(self):
+        report = self.create_report()
+        finding = ReportFinding.objects.create(
+            report=report,
+            tester_title="XSS",
+            tester_severity="HIGH",
+            tester_description="Reflected in search",
+        )
+        FindingEvidence.objects.create(finding=finding, title="Popup", file="evidence/a.png")
+
+        snapshot = ReportSnapshot.load(report.id)
+        html = render_to_string("reports/cover.html", report_context(report, snapshot))
+
+        self.assertNotIn("<style>", html)
+        self.assertIn('src="/media/evidence/a.png"', html)
+        self.assertIn("Popup", html)
+
+        # The browser preview still gets the inline stylesheet
+        self.assertIn("<style>", render_to_string("reports/cover.html", {"findings": []}))
+
+    def test_severity_summary_ignores_case(self):
+        report = self.create_report()
+        for severity in ["HIGH", "high", "Low"]:
+            ReportFinding.objects.create(
+                report=report,
+                tester_title="XSS",
+                tester_severity=severity,
+                tester_description="Reflected in search",
+            )
+
+        context = report_context(report, ReportSnapshot.load(report.id))
+
+        self.assertEqual(context["summary"]["severity"]["high"], 2)
+        self.assertEqual(context["summary"]["severity"]["low"], 1)
+        self.assertEqual(context["action_plan"]["severity_count"]["HIGH"], 2)
+
+        report.refresh_from_db()
+        self.assertEqual(report.high_count, 2)
+
+    def test_engine_is_selected_per_request_and_cached_separately(self):
+        report = self.create_report()
+        url = f"/api/reports/{report.id}/pdf/"
+        client = APIClient()
+
+        def fake_html_build(path, report, snapshot=None, timings=None):
+            with open(path, "wb") as f:
+                f.write(b"%PDF-html")
+
+        with mock.patch(
+            "apps.knowledge.reports.artifacts.build_report_html",
+            side_effect=fake_html_build,
+        ) as html_build, mock.patch(
+            "apps.knowledge.reports.artifacts.build_report",
+        ) as reportlab_build:
+            r1 = client.get(url, {"engine": "html"})
+            r2 = client.get(url, {"engine": "html"})
+            bad = client.get(url, {"engine": "latex"})
+
+        self.assertEqual(html_build.call_count, 1)
+        self.assertFalse(reportlab_build.called)
+        self.assertEqual(r1.getvalue(), b"%PDF-html")
+        self.assertEqual(r1["ETag"], r2["ETag"])
+        self.assertEqual(bad.status_code, 400)
+
+
+class ReportPreviewTests(ReportFixtures, TestCase):
+    def setUp(self):
+        cache.clear()
+        self.report = self.create_report()
+        self.url = f"/api/reports/{self.report.id}/preview/"
+        self.client = APIClient()
+
+    def _get(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return response.getvalue().decode()
+
+    def _add_findings(self, n):
+        return [
+            ReportFinding.objects.create(
+                report=self.report,
+                tester_title=f"Finding {i}",
+                tester_severity="HIGH",
+                tester_description="Details",
+            )
+            for i in range(n)
+        ]
+
+    def test_renders_html_without_building_a_pdf(self):
+        self._add_findings(2)
+        with mock.patch("apps.knowledge.reports.artifacts.build_report") as build, \
+                CaptureQueriesContext(connection) as small:
+            html = self._get()
+
+        self.assertFalse(build.called)
+        self.assertNotIn("<iframe", html)
+        self.assertIn("Finding 1", html)
+        self.assertIn("<td>2</td>", html)
+
+        self._add_findings(20)
+        with CaptureQueriesContext(connection) as large:
+            self._get()
+        self.assertEqual(len(small), len(large))
+
+    def test_severity_summary_ignores_case(self):
+        for severity in ("critical", "Critical", "low"):
+            ReportFinding.objects.create(
+                report=self.report,
+                tester_title="Finding",
+                tester_severity=severity,
+                tester_description="Details",
+            )
+
+        # Critical, high, medium, low
+        self.assertRegex(
+            self._get(), r"<td>2</td>\s*<td>0</td>\s*<td>0</td>\s*<td>1</td>"
+        )
+
+    def test_finding_rows_are_cached_by_fingerprint(self):
+        finding, = self._add_findings(1)
+        self._get()
+        self.assertIsNotNone(cache.get(finding_fragment_key(finding, 1)))
+
+        finding.tester_title = "Renamed"
+        finding.save()
+        html = self._get()
+
+        self.assertIn("Renamed", html)
+        self.assertNotIn("Finding 0", html)
@@ -0,0 +1,142 @@
+import os
+import tempfile
+from io import BytesIO
+from unittest import mock
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+
+from PIL import Image
+from reportlab.pdfgen import canvas
+
+from ..models import ReportFinding, FindingEvidence
+from ..reports.artifacts import report_fingerprint, report_pdf_data
+from ..reports.pdf_reportlab import fonts
+from ..reports.pdf_reportlab.build_incremental import finding_fingerprint
+from ..reports.pdf_reportlab.detailed_findings import BODY_STYLE
+from ..reports.pdf_reportlab.executive_summary import _build_risk_table
+from ..reports.pdf_reportlab.images import ImageCache
+from ..reports.pdf_reportlab.layout import wrapped_paragraph
+from ..reports.pdf_reportlab.snapshot import ReportSnapshot
+from ..reports.renditions import PRINT_MAX_SIZE, generate_rendition
+from .base import ReportFixtures
+
+
+class EvidenceRenditionTests(ReportFixtures, TestCase):
+    def test_rendition_is_downscaled_and_used_by_snapshot(self):
+        with tempfile.TemporaryDirectory() as media_root, override_settings(MEDIA_ROOT=media_root):
+            buf = BytesIO()
+            Image.new("RGBA", (3840, 2160), (200, 30, 30, 255)).save(buf, "PNG")
+
+            report = self.create_report()
+            finding = ReportFinding.objects.create(report=report, tester_title="XSS")
+            evidence = FindingEvidence.objects.create(
+                finding=finding,
+                file=SimpleUploadedFile("shot.png", buf.getvalue()),
+            )
+
+            name = generate_rendition(evidence.id)
+
+            evidence.refresh_from_db()
+            self.assertEqual(evidence.print_file.name, name)
+            with Image.open(evidence.print_file.path) as img:
+                self.assertEqual(img.format, "JPEG")
+                self.assertLessEqual(img.width, PRINT_MAX_SIZE[0])
+                self.assertLessEqual(img.height, PRINT_MAX_SIZE[1])
+
+            record = ReportSnapshot.load(report.id).findings[0].evidences[0]
+            self.assertEqual(record.path, evidence.print_file.path)
+
+
+class ImageCacheTests(TestCase):
+    def test_hits_budget_and_invalidation(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            paths = []
+            for i in range(3):
+                path = os.path.join(tmpdir, f"{i}.png")
+                Image.new("RGB", (10, 10), (i, 0, 0)).save(path)
+                paths.append(path)
+
+            # Room for two decoded 10x10 RGB images
+            cache = ImageCache(max_bytes=600)
+
+            first = cache.get(paths[0])
+            self.assertIs(cache.get(paths[0]), first)
+            cache.get(paths[1])
+            third = cache.get(paths[2])
+
+            stats = cache.stats()
+            self.assertEqual((stats["hits"], stats["misses"]), (1, 3))
+            self.assertEqual(stats["entries"], 2)
+            self.assertEqual(stats["evictions"], 1)
+
+            # Replacing the file on disk is a miss, not a stale hit
+            Image.new("RGB", (10, 10), (9, 9, 9)).save(paths[2])
+            os.utime(paths[2], ns=(0, 0))
+            self.assertIsNot(cache.get(paths[2]), third)
+            self.assertEqual(cache.stats()["misses"], 4)
+
+
+class ParagraphLayoutCacheTests(TestCase):
+    def test_wrapped_paragraph_is_reused_per_text_style_and_width(self):
+        text = "Reflected XSS in the search box " * 20
+        p1, h1 = wrapped_paragraph(text, BODY_STYLE, 300, 800)
+        p2, h2 = wrapped_paragraph(text, BODY_STYLE, 300, 800)
+        p3, h3 = wrapped_paragraph(text, BODY_STYLE, 150, 800)
+
+        self.assertIs(p1, p2)
+        self.assertEqual(h1, h2)
+        self.assertIsNot(p1, p3)
+        self.assertGreater(h3, h1)
+
+
+class ReportFontTests(ReportFixtures, TestCase):
+    def test_ttf_family_renders_non_latin_text_and_reuses_subsets(self):
+        if fonts.REGULAR == fonts.FALLBACK_REGULAR:
+            self.skipTest("no TrueType font installed")
+
+        def render(text):
+            out = BytesIO()
+            c = canvas.Canvas(out)
+            c.setFont(fonts.REGULAR, 10)
+            c.drawString(50, 50, text)
+            c.setFont(fonts.BOLD, 10)
+            c.drawString(50, 70, text)
+            c.save()
+            return out.getvalue()
+
+        render("Übersicht Ошибка")
+        before = fonts.subset_cache.stats()
+        render("Übersicht Ошибка")
+        after = fonts.subset_cache.stats()
+
+        self.assertEqual(after["misses"], before["misses"])
+        self.assertGreater(after["hits"], before["hits"])
+
+    def test_risk_table_uses_report_fonts(self):
+        table = _build_risk_table()
+        used = set()
+        for values, styles in zip(table._cellvalues, table._cellStyles):
+            for value, style in zip(values, styles):
+                used.add(value.style.fontName if hasattr(value, "style") else style.fontname)
+
+        self.assertEqual(used, {fonts.REGULAR, fonts.BOLD})
+
+    def test_font_change_changes_fingerprints(self):
+        report = self.create_report()
+        ReportFinding.objects.create(report=report, tester_title="Finding")
+        finding = ReportSnapshot.load(report.id).findings[0]
+        data = report_pdf_data(report)
+
+        def fingerprints():
+            return report_fingerprint(report), finding_fingerprint(finding, 1, data)
+
+        before = fingerprints()
+        other = fonts.font_signature(fonts.FALLBACK_REGULAR, fonts.FALLBACK_BOLD)
+        if other == fonts.SIGNATURE:
+            other = fonts.font_signature(fonts.TTF_REGULAR, fonts.TTF_BOLD)
+        with mock.patch.object(fonts, "SIGNATURE", other):
+            after = fingerprints()
+
+        self.assertNotEqual(before[0], after[0])
+        self.assertNotEqual(before[1], after[1])
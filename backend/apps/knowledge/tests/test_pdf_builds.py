@@ -0,0 +1,364 @@
+import os
+import tempfile
+from concurrent.futures.process import BrokenProcessPool
+from io import BytesIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from PIL import Image
+from reportlab.lib.colors import Color
+from reportlab.pdfgen import canvas
+
+from ..models import Report, ReportFinding, FindingEvidence
+from ..reports.artifacts import report_pdf_data, needs_low_memory
+from ..reports.benchmark import SECTIONS, compare, run_case
+from ..reports.pdf_reportlab import build_parallel
+from ..reports.pdf_reportlab.build import build_report
+from ..reports.pdf_reportlab.build_incremental import (
+    build_report_incremental,
+    _load_fragment,
+    _store_fragment,
+)
+from ..reports.pdf_reportlab.build_streaming import build_report_streaming
+from ..reports.pdf_reportlab.pagination import (
+    defer_string,
+    draw_page_label,
+    resolve_page_labels,
+    toc_entry_form,
+)
+from ..reports.pdf_reportlab.snapshot import ReportSnapshot
+from .base import ReportFixtures
+
+
+class DeferredPageLabelTests(TestCase):
+    def test_labels_resolved_after_last_page(self):
+        """Footer totals and TOC entries are filled in before save."""
+        buffer = BytesIO()
+        c = canvas.Canvas(buffer, pageCompression=0)
+        defer_string(c, toc_entry_form("conclusion"), 500, 700)
+        for _ in range(3):
+            draw_page_label(c, 500, 50, c.getPageNumber())
+            c.showPage()
+
+        resolve_page_labels(c, c.getPageNumber() - 1, {"conclusion": 3})
+        c.save()
+
+        pdf = buffer.getvalue()
+        self.assertEqual(pdf.count(b"/Type /Page\n"), 3)
+        self.assertIn(b"(Page 1 of 3)", pdf)
+        self.assertIn(b"(Page 3 of 3)", pdf)
+        self.assertIn(b"(3) Tj", pdf)
+
+
+class ReportSnapshotTests(ReportFixtures, TestCase):
+    def test_query_count_does_not_grow_with_findings(self):
+        report = self.create_report()
+        definition = self.create_definition()
+
+        def add_findings(n):
+            for _ in range(n):
+                finding = ReportFinding.objects.create(
+                    report=report,
+                    vulnerability=definition,
+                    tester_description="Search endpoint",
+                )
+                FindingEvidence.objects.create(finding=finding, file="evidence/a.png")
+
+        add_findings(2)
+        with CaptureQueriesContext(connection) as small:
+            ReportSnapshot.load(report.id)
+
+        add_findings(20)
+        with CaptureQueriesContext(connection) as large:
+            snapshot = ReportSnapshot.load(report.id)
+
+        self.assertEqual(len(small), len(large))
+        self.assertEqual(len(snapshot.findings), 22)
+
+        record = snapshot.findings[0]
+        self.assertEqual(record.final_title, "SQL Injection")
+        self.assertEqual(record.final_description, "Unsanitised input\n\nSearch endpoint")
+        self.assertEqual(len(record.evidences), 1)
+
+
+class ParallelBuildTests(ReportFixtures, TestCase):
+    def test_parallel_build_matches_page_count_and_labels(self):
+        if build_parallel.PdfReader is None:
+            self.skipTest("pypdf not installed")
+
+        report = self.create_report()
+        definition = self.create_definition()
+        for i in range(build_parallel.MIN_PARALLEL_FINDINGS):
+            ReportFinding.objects.create(
+                report=report, vulnerability=definition, tester_title=f"Finding {i}"
+            )
+
+        data = report_pdf_data(report)
+        snapshot = ReportSnapshot.load(report.id)
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            serial_path = os.path.join(tmpdir, "serial.pdf")
+            parallel_path = os.path.join(tmpdir, "parallel.pdf")
+            build_report(serial_path, data, report.id, snapshot)
+            timings = build_parallel.build_report_parallel(
+                parallel_path, data, report.id, snapshot, workers=2
+            )
+            self.assertLessEqual({"total", "parts", "stitch"}, set(timings.durations))
+
+            serial = build_parallel.PdfReader(serial_path)
+            parallel = build_parallel.PdfReader(parallel_path)
+
+            total = len(serial.pages)
+            self.assertEqual(len(parallel.pages), total)
+            for page_no in (1, total // 2, total):
+                self.assertIn(
+                    f"Page {page_no} of {total}",
+                    parallel.pages[page_no - 1].extract_text(),
+                )
+            # Stamped TOC matches (stamps come last in the text order)
+            self.assertEqual(
+                sorted(parallel.pages[2].extract_text().split("\n")),
+                sorted(serial.pages[2].extract_text().split("\n")),
+            )
+
+    def test_dead_worker_falls_back_to_serial_and_replaces_pool(self):
+        if build_parallel.PdfReader is None:
+            self.skipTest("pypdf not installed")
+
+        report = self.create_report()
+        definition = self.create_definition()
+        for i in range(build_parallel.MIN_PARALLEL_FINDINGS):
+            ReportFinding.objects.create(
+                report=report, vulnerability=definition, tester_title=f"Finding {i}"
+            )
+
+        # Kill a worker, as the OOM killer would
+        pool = build_parallel.get_pool(2)
+        with self.assertRaises(BrokenProcessPool):
+            pool.submit(os._exit, 1).result()
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "report.pdf")
+            with self.assertLogs(build_parallel.logger, "WARNING"):
+                build_parallel.build_report_parallel(
+                    path, report_pdf_data(report), report.id,
+                    ReportSnapshot.load(report.id), workers=2,
+                )
+            self.assertGreater(len(build_parallel.PdfReader(path).pages), 0)
+
+        fresh = build_parallel.get_pool(2)
+        self.assertIsNot(fresh, pool)
+        self.assertEqual(fresh.submit(abs, -1).result(), 1)
+
+
+class IncrementalBuildTests(ReportFixtures, TestCase):
+    def test_only_changed_findings_are_rerendered(self):
+        if build_parallel.PdfReader is None:
+            self.skipTest("pypdf not installed")
+
+        report = self.create_report()
+        definition = self.create_definition()
+        findings = [
+            ReportFinding.objects.create(
+                report=report, vulnerability=definition, tester_title=f"Finding {i}"
+            )
+            for i in range(4)
+        ]
+        data = report_pdf_data(report)
+
+        with tempfile.TemporaryDirectory() as tmpdir, \
+                override_settings(REPORT_PDF_FRAGMENT_DIR=os.path.join(tmpdir, "fragments")):
+            first_path = os.path.join(tmpdir, "first.pdf")
+            self.assertEqual(
+                build_report_incremental(first_path, data, report.id), (4, 4)
+            )
+
+            # A long description pushes the finding onto an extra page
+            findings[1].tester_description = "Changed. " * 400
+            findings[1].save()
+
+            second_path = os.path.join(tmpdir, "second.pdf")
+            self.assertEqual(
+                build_report_incremental(second_path, data, report.id), (4, 1)
+            )
+
+            serial_path = os.path.join(tmpdir, "serial.pdf")
+            build_report(serial_path, data, report.id, ReportSnapshot.load(report.id))
+
+            serial = build_parallel.PdfReader(serial_path)
+            incremental = build_parallel.PdfReader(second_path)
+
+            total = len(serial.pages)
+            self.assertEqual(len(incremental.pages), total)
+            self.assertIn(
+                f"Page {total} of {total}", incremental.pages[-1].extract_text()
+            )
+            self.assertEqual(
+                sorted(incremental.pages[2].extract_text().split("\n")),
+                sorted(serial.pages[2].extract_text().split("\n")),
+            )
+
+    def test_inserting_a_finding_renders_only_that_finding(self):
+        if build_parallel.PdfReader is None:
+            self.skipTest("pypdf not installed")
+
+        report = self.create_report()
+
+        def add(title, severity):
+            # Findings are ordered by severity, then id
+            return ReportFinding.objects.create(
+                report=report, tester_title=title, tester_description="Details",
+                tester_severity=severity,
+            )
+
+        for i in range(4):
+            add(f"Finding {i}", "LOW")
+        data = report_pdf_data(report)
+
+        with tempfile.TemporaryDirectory() as tmpdir, \
+                override_settings(REPORT_PDF_FRAGMENT_DIR=os.path.join(tmpdir, "fragments")):
+            build_report_incremental(os.path.join(tmpdir, "first.pdf"), data, report.id)
+
+            # Sorts first: every other finding moves down one place
+            add("Inserted", "HIGH")
+
+            path = os.path.join(tmpdir, "second.pdf")
+            fragments, rendered = build_report_incremental(path, data, report.id)
+            pages = [page.extract_text() for page in build_parallel.PdfReader(path).pages]
+
+        # The new finding, and the old first one that lost the heading
+        self.assertEqual((fragments, rendered), (5, 2))
+        # Stamped numbers come last in each page's text
+        for number, title in enumerate(
+            ["Inserted", "Finding 0", "Finding 1", "Finding 2", "Finding 3"], start=1
+        ):
+            page = next(p for p in pages if f"Vulnerability\n{title}\n" in p)
+            self.assertEqual(page.split()[-1], str(number))
+
+    def test_fragments_are_stored_as_pdf_and_json(self):
+        with tempfile.TemporaryDirectory() as tmpdir, \
+                override_settings(REPORT_PDF_FRAGMENT_DIR=os.path.join(tmpdir, "fragments")):
+            part = os.path.join(tmpdir, "part.pdf")
+            with open(part, "wb") as f:
+                f.write(b"%PDF-1.4 fragment")
+
+            placements = [
+                (1, "pageLabel1", 500.0, 20.0, "Helvetica", 8, Color(1, 0, 0), "right")
+            ]
+            _store_fragment("abc", 2, placements, part)
+
+            self.assertEqual(
+                sorted(os.listdir(os.path.join(tmpdir, "fragments"))), ["abc.json", "abc.pdf"]
+            )
+            page_count, loaded, pdf_path = _load_fragment("abc")
+            self.assertEqual(page_count, 2)
+            self.assertEqual(
+                loaded, [(1, "pageLabel1", 500.0, 20.0, "Helvetica", 8, "#ff0000", "right")]
+            )
+            self.assertEqual(pdf_path, os.path.join(tmpdir, "fragments", "abc.pdf"))
+            with open(pdf_path, "rb") as f:
+                self.assertEqual(f.read(), b"%PDF-1.4 fragment")
+
+            # A missing or corrupt half is a miss, not an error
+            os.remove(os.path.join(tmpdir, "fragments", "abc.pdf"))
+            self.assertIsNone(_load_fragment("abc"))
+            with open(os.path.join(tmpdir, "fragments", "bad.json"), "w") as f:
+                f.write("{not json")
+            self.assertIsNone(_load_fragment("bad"))
+
+
+class StreamingBuildTests(ReportFixtures, TestCase):
+    def test_low_memory_mode_is_not_claimed_without_pypdf(self):
+        report = self.create_report()
+        with override_settings(REPORT_PDF_LOW_MEMORY_EVIDENCE=1), \
+                mock.patch.object(build_parallel, "PdfWriter", None), \
+                mock.patch.object(build_parallel, "_warned_missing", set()), \
+                self.assertLogs(build_parallel.logger, "WARNING") as logs:
+            self.assertFalse(needs_low_memory(report))
+            self.assertFalse(needs_low_memory(report))
+
+        # Logged once, not on every render
+        self.assertEqual(len(logs.output), 1)
+        self.assertIn("REPORT_PDF_LOW_MEMORY_EVIDENCE", logs.output[0])
+
+    def test_chunked_build_matches_serial_output(self):
+        if build_parallel.PdfReader is None:
+            self.skipTest("pypdf not installed")
+
+        report = self.create_report()
+        definition = self.create_definition()
+
+        with tempfile.TemporaryDirectory() as tmpdir, override_settings(MEDIA_ROOT=tmpdir):
+            os.makedirs(os.path.join(tmpdir, "evidence"))
+            for i in range(7):
+                finding = ReportFinding.objects.create(
+                    report=report, vulnerability=definition, tester_title=f"Finding {i}"
+                )
+                name = f"evidence/shot-{i}.png"
+                out = BytesIO()
+                Image.new("RGB", (40, 20), (i * 30, 0, 0)).save(out, "PNG")
+                with open(os.path.join(tmpdir, name), "wb") as f:
+                    f.write(out.getvalue())
+                FindingEvidence.objects.create(finding=finding, title=f"Shot {i}", file=name)
+
+            data = report_pdf_data(report)
+            serial_path = os.path.join(tmpdir, "serial.pdf")
+            streamed_path = os.path.join(tmpdir, "streamed.pdf")
+            build_report(serial_path, data, report.id)
+            timings = build_report_streaming(streamed_path, data, report.id, chunk_size=3)
+            self.assertLessEqual(
+                {"total", "snapshot", "evidence", "detailed_findings", "stitch"},
+                set(timings.durations),
+            )
+
+            serial = build_parallel.PdfReader(serial_path)
+            streamed = build_parallel.PdfReader(streamed_path)
+
+            total = len(serial.pages)
+            self.assertEqual(len(streamed.pages), total)
+            # Compared word by word: stamped finding numbers are separate
+            # text runs
+            for page_no in range(1, total + 1):
+                self.assertEqual(
+                    sorted(streamed.pages[page_no - 1].extract_text().split()),
+                    sorted(serial.pages[page_no - 1].extract_text().split()),
+                )
+
+            images = sum(len(page.images) for page in streamed.pages)
+            self.assertEqual(images, sum(len(page.images) for page in serial.pages))
+
+            # Fonts and images the chunks share are stored once
+            self.assertLess(os.path.getsize(streamed_path), 1.2 * os.path.getsize(serial_path))
+
+
+class PDFBenchmarkTests(TestCase):
+    def test_case_records_metrics_and_rolls_back(self):
+        case = run_case(findings=3, max_images=2)
+
+        self.assertEqual(case["images"], 3)  # 0 + 1 + 2
+        self.assertLessEqual(set(SECTIONS), set(case["sections"]))
+        self.assertIn("snapshot", case["sections"])
+        self.assertGreater(case["queries"], 0)
+        self.assertGreater(case["size_bytes"], 0)
+        self.assertGreater(case["peak_rss_kb"], 0)
+        self.assertFalse(Report.objects.exists())
+
+        baseline = {"cases": {"3x2": dict(case, queries=1)}}
+        regressions = compare(baseline, {"cases": {"3x2": case}})
+        self.assertEqual(len(regressions), 1)
+        self.assertIn("queries", regressions[0])
+
+    def test_command_runs_in_a_scratch_database(self):
+        command = "apps.knowledge.management.commands.benchmark_pdf"
+        with mock.patch(f"{command}.scratch_database") as scratch, \
+                mock.patch(f"{command}.run_benchmark", return_value={"cases": {}}) as run:
+            scratch.return_value.__enter__.side_effect = lambda: run.assert_not_called()
+            call_command("benchmark_pdf", "--sizes", "1", stdout=open(os.devnull, "w"))
+
+        scratch.assert_called_once_with(keepdb=False)
+        run.assert_called_once()
+        scratch.return_value.__exit__.assert_called_once()
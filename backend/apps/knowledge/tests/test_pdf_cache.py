@@ -0,0 +1,164 @@
+import os
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+
+from rest_framework.test import APIClient
+
+from ..models import ReportFinding
+from ..reports import artifacts, spool
+from ..reports.pdf_reportlab.timing import histogram
+from ..reports.spool import sweep
+from .base import ReportFixtures
+
+
+class ReportPDFCacheTests(ReportFixtures, TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        settings_override = override_settings(REPORT_PDF_CACHE_DIR=self.tmpdir.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.report = self.create_report()
+        self.url = f"/api/reports/{self.report.id}/pdf/"
+        self.client = APIClient()
+
+    def _fake_build(self, path, data, report_id, snapshot=None, timings=None):
+        with open(path, "wb") as f:
+            f.write(b"%PDF-fake")
+
+    def test_repeat_requests_reuse_artifact_and_honour_etag(self):
+        with mock.patch(
+            "apps.knowledge.reports.artifacts.build_report",
+            side_effect=self._fake_build,
+        ) as build:
+            r1 = self.client.get(self.url)
+            r2 = self.client.get(self.url)
+            r3 = self.client.get(self.url, HTTP_IF_NONE_MATCH=r1["ETag"])
+
+        self.assertEqual(build.call_count, 1)
+        self.assertEqual(r1.status_code, 200)
+        self.assertEqual(r1.getvalue(), r2.getvalue())
+        self.assertEqual(r1["ETag"], r2["ETag"])
+        self.assertEqual(r3.status_code, 304)
+
+    def test_finding_change_invalidates_artifact(self):
+        with mock.patch(
+            "apps.knowledge.reports.artifacts.build_report",
+            side_effect=self._fake_build,
+        ) as build:
+            r1 = self.client.get(self.url)
+            ReportFinding.objects.create(report=self.report, tester_title="XSS")
+            r2 = self.client.get(self.url, HTTP_IF_NONE_MATCH=r1["ETag"])
+
+        self.assertEqual(build.call_count, 2)
+        self.assertEqual(r2.status_code, 200)
+        self.assertNotEqual(r1["ETag"], r2["ETag"])
+
+    def test_server_timing_reports_sections_and_cache_state(self):
+        histogram.clear()
+
+        r1 = self.client.get(self.url)
+        r2 = self.client.get(self.url)
+
+        self.assertIn("fingerprint;dur=", r1["Server-Timing"])
+        self.assertIn("detailed_findings;dur=", r1["Server-Timing"])
+        self.assertIn('cache;desc="miss"', r1["Server-Timing"])
+        self.assertNotIn("detailed_findings", r2["Server-Timing"])
+        self.assertIn('cache;desc="hit"', r2["Server-Timing"])
+
+        stats = histogram.snapshot()
+        self.assertEqual(stats["total"]["count"], 1)
+        self.assertEqual(stats["cover"]["buckets"]["+Inf"], 1)
+
+        user = User.objects.create_user(username="metrics", password="pwd")
+        client = APIClient()
+        client.force_authenticate(user=user)
+        metrics = client.get("/api/reports/pdf/metrics/")
+        self.assertEqual(metrics.status_code, 200)
+        self.assertEqual(metrics.data["total"]["count"], 1)
+
+    def test_build_waits_for_another_process_holding_the_lock(self):
+        if artifacts.fcntl is None:
+            raise unittest.SkipTest("needs fcntl")
+
+        path = artifacts.artifact_path("abc")
+        built = []
+
+        # Another process holds the lock while it renders the same PDF
+        fd = os.open(f"{path}.lock", os.O_RDWR | os.O_CREAT)
+        artifacts.fcntl.flock(fd, artifacts.fcntl.LOCK_EX)
+
+        result = []
+        waiter = threading.Thread(
+            target=lambda: result.append(artifacts.get_or_build_artifact("abc", built.append))
+        )
+        waiter.start()
+        waiter.join(0.2)
+        self.assertTrue(waiter.is_alive())
+
+        with open(path, "wb") as f:
+            f.write(b"%PDF-other")
+        os.close(fd)
+        waiter.join(5)
+
+        self.assertEqual(result, [path])
+        self.assertEqual(built, [])
+
+
+class PDFSpoolTests(TestCase):
+    def test_sweep_evicts_expired_then_least_recently_used(self):
+        now = time.time()
+        with tempfile.TemporaryDirectory() as tmpdir:
+            def spool_file(name, size, age):
+                path = os.path.join(tmpdir, name)
+                with open(path, "wb") as f:
+                    f.write(b"x" * size)
+                os.utime(path, (now - age, now - age))
+                return path
+
+            expired = spool_file("expired.pdf", 10, 10_000)
+            oldest = spool_file("oldest.pdf", 100, 3_000)
+            recent = spool_file("recent.pdf", 100, 2_000)
+            fresh = spool_file("fresh.pdf", 100, 5)
+            partial = spool_file("partial.pdf.1.2.tmp", 10, 7_200)
+            lock = spool_file("old.pdf.lock", 0, 7_200)
+
+            removed = sweep(tmpdir, max_bytes=250, max_age=5_000, now=now)
+
+            self.assertEqual(removed, 4)
+            self.assertFalse(os.path.exists(expired))
+            self.assertFalse(os.path.exists(oldest))
+            self.assertFalse(os.path.exists(partial))
+            self.assertFalse(os.path.exists(lock))
+            self.assertTrue(os.path.exists(recent))
+            self.assertTrue(os.path.exists(fresh))
+
+    def test_fragments_are_swept_within_their_own_budget(self):
+        old = time.time() - 3_000
+        with tempfile.TemporaryDirectory() as tmpdir:
+            fragments = os.path.join(tmpdir, "fragments")
+            os.makedirs(fragments)
+            for directory, name in [(tmpdir, "a.pdf"), (fragments, "f1.pdf"), (fragments, "f2.pdf")]:
+                path = os.path.join(directory, name)
+                with open(path, "wb") as f:
+                    f.write(b"x" * 100)
+                os.utime(path, (old, old))
+
+            with override_settings(
+                REPORT_PDF_CACHE_DIR=tmpdir,
+                REPORT_PDF_CACHE_MAX_BYTES=1_000,
+                REPORT_PDF_INCREMENTAL=True,
+                REPORT_PDF_FRAGMENT_DIR=fragments,
+                REPORT_PDF_FRAGMENT_MAX_BYTES=150,
+            ), mock.patch.object(spool, "_last_sweep", 0.0):
+                spool.maybe_sweep()
+
+            self.assertTrue(os.path.exists(os.path.join(tmpdir, "a.pdf")))
+            self.assertEqual(len(os.listdir(fragments)), 1)
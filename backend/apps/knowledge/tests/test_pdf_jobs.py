@@ -0,0 +1,190 @@
+import io
+import os
+import tempfile
+import zipfile
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from rest_framework.test import APIClient
+
+from ..models import FindingEvidence, ReportFinding, ReportRenderJob
+from ..reports.jobs import DEFAULT_LEASE, MAX_ATTEMPTS, claim_next_job, run_job
+from .base import ReportFixtures
+
+
+class ReportExportTests(ReportFixtures, TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        settings_override = override_settings(REPORT_PDF_CACHE_DIR=self.tmpdir.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.reports = [
+            self.create_report(client_name=client)
+            for client in ("ACME", "ACME", "Globex")
+        ]
+
+        self.user = User.objects.create_user(username="tester", password="pwd")
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def _fake_build(self, path, data, report_id, snapshot=None, timings=None):
+        with open(path, "wb") as f:
+            f.write(b"%PDF-fake-" + str(report_id).encode())
+
+    def _export(self, payload):
+        with mock.patch(
+            "apps.knowledge.reports.artifacts.build_report",
+            side_effect=self._fake_build,
+        ):
+            response = self.client.post("/api/reports/export/", payload, format="json")
+            body = b"".join(response.streaming_content)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "application/zip")
+        return zipfile.ZipFile(io.BytesIO(body))
+
+    def test_export_by_client_streams_one_pdf_per_report(self):
+        archive = self._export({"client_name": "ACME"})
+
+        names = sorted(archive.namelist())
+        self.assertEqual(names, sorted(
+            f"VAPT_ACME_{r.id}.pdf" for r in self.reports[:2]
+        ))
+        for r in self.reports[:2]:
+            self.assertEqual(
+                archive.read(f"VAPT_ACME_{r.id}.pdf"),
+                b"%PDF-fake-" + str(r.id).encode(),
+            )
+
+    def test_export_by_ids(self):
+        archive = self._export({"report_ids": [self.reports[2].id]})
+        self.assertEqual(archive.namelist(), [f"VAPT_Globex_{self.reports[2].id}.pdf"])
+
+    def test_export_builds_large_reports_in_chunks_without_a_snapshot(self):
+        large = self.reports[2]
+        finding = ReportFinding.objects.create(report=large, tester_title="XSS")
+        FindingEvidence.objects.create(finding=finding, file="evidence/a.png")
+
+        def fake_streaming(path, data, report_id, timings=None):
+            with open(path, "wb") as f:
+                f.write(b"%PDF-chunked")
+
+        with override_settings(REPORT_PDF_LOW_MEMORY_EVIDENCE=1), \
+                mock.patch(
+                    "apps.knowledge.reports.artifacts.build_report_streaming",
+                    side_effect=fake_streaming,
+                ), \
+                mock.patch("apps.knowledge.reports.export.ReportSnapshot.load") as load:
+            archive = self._export({"report_ids": [large.id]})
+
+        load.assert_not_called()
+        self.assertEqual(archive.read(f"VAPT_Globex_{large.id}.pdf"), b"%PDF-chunked")
+
+    def test_export_requires_a_selection(self):
+        response = self.client.post("/api/reports/export/", {}, format="json")
+        self.assertEqual(response.status_code, 400)
+
+        response = self.client.post(
+            "/api/reports/export/", {"client_name": "Nobody"}, format="json"
+        )
+        self.assertEqual(response.status_code, 404)
+
+
+class ReportRenderJobTests(ReportFixtures, TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        settings_override = override_settings(REPORT_PDF_CACHE_DIR=self.tmpdir.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.user = User.objects.create_user(username="tester", password="pwd")
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.report = self.create_report()
+        self.jobs_url = f"/api/reports/{self.report.id}/pdf/jobs/"
+
+    def _fake_build(self, path, data, report_id, snapshot=None, timings=None):
+        with open(path, "wb") as f:
+            f.write(b"%PDF-fake")
+
+    def test_queue_worker_download_flow(self):
+        r = self.client.post(self.jobs_url)
+        self.assertEqual(r.status_code, 202)
+        job_id = r.data["id"]
+        self.assertEqual(r.data["status"], "Queued")
+
+        # A second request while pending reuses the same job
+        self.assertEqual(self.client.post(self.jobs_url).data["id"], job_id)
+
+        download_url = f"{self.jobs_url}{job_id}/download/"
+        self.assertEqual(self.client.get(download_url).status_code, 409)
+
+        with mock.patch(
+            "apps.knowledge.reports.artifacts.build_report",
+            side_effect=self._fake_build,
+        ):
+            call_command("render_worker", "--once", stdout=open(os.devnull, "w"))
+
+        status_r = self.client.get(f"{self.jobs_url}{job_id}/")
+        self.assertEqual(status_r.data["status"], "Done")
+        self.assertEqual(status_r.data["download_url"], download_url)
+
+        pdf = self.client.get(download_url)
+        self.assertEqual(pdf.status_code, 200)
+        self.assertEqual(pdf.getvalue(), b"%PDF-fake")
+
+        # Unchanged report: a new request completes without a render
+        again = self.client.post(self.jobs_url)
+        self.assertEqual(again.data["status"], "Done")
+
+    def test_expired_job_out_of_attempts_is_failed_not_reclaimed(self):
+        expired = timezone.now() - DEFAULT_LEASE - timedelta(minutes=1)
+        lost = ReportRenderJob.objects.create(
+            report=self.report, status="Running", attempts=MAX_ATTEMPTS, started_at=expired
+        )
+
+        self.assertIsNone(claim_next_job("worker-2"))
+        lost.refresh_from_db()
+        self.assertEqual(lost.status, "Failed")
+        self.assertEqual(lost.error, "Worker lost")
+        self.assertIsNotNone(lost.finished_at)
+
+        # With attempts left, an expired lease is still taken over
+        retry = ReportRenderJob.objects.create(
+            report=self.report, status="Running", attempts=MAX_ATTEMPTS - 1, started_at=expired
+        )
+        claimed = claim_next_job("worker-2")
+        self.assertEqual(claimed.pk, retry.pk)
+        self.assertEqual(claimed.attempts, MAX_ATTEMPTS)
+
+    def test_long_render_with_fresh_heartbeat_keeps_its_lease(self):
+        now = timezone.now()
+        running = ReportRenderJob.objects.create(
+            report=self.report,
+            status="Running",
+            attempts=1,
+            started_at=now - 2 * DEFAULT_LEASE,
+            heartbeat_at=now - timedelta(minutes=1),
+        )
+        self.assertIsNone(claim_next_job("worker-2"))
+
+        running.heartbeat_at = now - DEFAULT_LEASE - timedelta(minutes=1)
+        running.save(update_fields=["heartbeat_at"])
+        self.assertEqual(claim_next_job("worker-2").pk, running.pk)
+
+    def test_job_for_deleted_report_is_failed(self):
+        self.client.post(self.jobs_url)
+        job = claim_next_job("worker-1")
+        self.report.delete()
+
+        job = run_job(job)
+        self.assertEqual(job.status, "Failed")
+        self.assertEqual(job.error, "Report deleted")
@@ -0,0 +1,339 @@
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection, IntegrityError
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from rest_framework.test import APIClient
+
+from ..models import OWASPCategory, Report, ReportFinding, VulnerabilityDefinition
+from ..reports.pdf_reportlab.snapshot import ReportSnapshot
+from .base import ReportFixtures
+
+
+class ReportListCountsTests(ReportFixtures, TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="lister", password="pwd")
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def test_counts_are_aggregated_in_one_query(self):
+        definition = self.create_definition(severity="CRITICAL")
+
+        report = self.create_report()
+        # Definition severity, overridden severity, lower case, none at all
+        ReportFinding.objects.create(report=report, vulnerability=definition)
+        ReportFinding.objects.create(report=report, vulnerability=definition, tester_severity="LOW")
+        ReportFinding.objects.create(report=report, tester_severity="high")
+        ReportFinding.objects.create(report=report)
+        self.create_report(client_name="Empty")
+
+        with CaptureQueriesContext(connection) as small:
+            response = self.client.get("/api/reports/")
+        self.assertEqual(response.status_code, 200)
+
+        by_client = {row["client_name"]: row for row in response.data}
+        self.assertEqual(by_client["ACME"]["findings_count"], 4)
+        self.assertEqual(
+            by_client["ACME"]["severity_counts"],
+            {"Critical": 1, "High": 1, "Medium": 0, "Low": 1},
+        )
+        self.assertEqual(by_client["Empty"]["findings_count"], 0)
+
+        for i in range(5):
+            extra = self.create_report(client_name=f"Extra {i}")
+            ReportFinding.objects.create(report=extra, vulnerability=definition)
+        with CaptureQueriesContext(connection) as large:
+            self.client.get("/api/reports/")
+        self.assertEqual(len(small), len(large))
+
+    def test_created_report_reports_zero_counts(self):
+        response = self.client.post("/api/reports/", {
+            "client_name": "New",
+            "application_name": "Portal",
+            "report_type": "Web",
+            "target": "https://portal.example",
+            "prepared_by": "tester",
+        }, format="json")
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data["findings_count"], 0)
+        self.assertEqual(response.data["severity_counts"]["Critical"], 0)
+
+
+class ReportCounterTests(ReportFixtures, TestCase):
+    def setUp(self):
+        self.report = self.create_report()
+        self.definition = self.create_definition()
+
+    def _counts(self):
+        self.report.refresh_from_db()
+        return (
+            self.report.findings_count,
+            self.report.critical_count,
+            self.report.high_count,
+            self.report.pending_count,
+            self.report.patched_count,
+        )
+
+    def test_finding_writes_update_counters(self):
+        finding = ReportFinding.objects.create(report=self.report, vulnerability=self.definition)
+        self.assertEqual(self._counts(), (1, 0, 1, 1, 0))
+        self.assertIsNotNone(self.report.findings_changed_at)
+
+        finding.tester_severity = "CRITICAL"
+        finding.status = "Patched"
+        finding.save()
+        self.assertEqual(self._counts(), (1, 1, 0, 0, 1))
+
+        finding.delete()
+        self.assertEqual(self._counts(), (0, 0, 0, 0, 0))
+
+    def test_definition_severity_change_moves_inheriting_findings(self):
+        ReportFinding.objects.create(report=self.report, vulnerability=self.definition)
+        ReportFinding.objects.create(
+            report=self.report, vulnerability=self.definition, tester_severity="HIGH",
+        )
+
+        self.definition.severity = "CRITICAL"
+        self.definition.save()
+        self.assertEqual(self._counts(), (2, 1, 1, 2, 0))
+
+        self.definition.delete()
+        self.assertEqual(self._counts(), (2, 0, 1, 2, 0))
+
+    def test_reconcile_command_repairs_drift(self):
+        # bulk_create skips save(), like raw SQL would
+        ReportFinding.objects.bulk_create([
+            ReportFinding(report=self.report, vulnerability=self.definition)
+            for _ in range(3)
+        ])
+        self.assertEqual(self._counts(), (0, 0, 0, 0, 0))
+
+        out = StringIO()
+        call_command("reconcile_report_counters", stdout=out)
+
+        self.assertEqual(self._counts(), (3, 0, 3, 3, 0))
+        self.assertIn("repaired 1", out.getvalue())
+
+
+class FinalValueAnnotationTests(ReportFixtures, TestCase):
+    def setUp(self):
+        self.report = self.create_report()
+        definition = self.create_definition(severity="MEDIUM", impact="")
+        self.findings = [
+            ReportFinding.objects.create(report=self.report, vulnerability=definition),
+            ReportFinding.objects.create(
+                report=self.report, vulnerability=definition,
+                tester_title="Blind SQLi", tester_severity="critical",
+                tester_description="Search endpoint", tester_impact="Full dump",
+            ),
+            ReportFinding.objects.create(
+                report=self.report, tester_title="XSS", tester_severity="HIGH",
+                tester_description="Reflected", status="Patched",
+            ),
+            ReportFinding.objects.create(report=self.report, tester_severity="LOW"),
+        ]
+
+        self.user = User.objects.create_user(username="annotator", password="pwd")
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.url = f"/api/reports/{self.report.id}/findings/"
+
+    def test_annotations_match_python_properties(self):
+        names = ["final_title", "final_severity", "final_description", "final_impact", "final_remediation"]
+        plain = {f.id: f for f in ReportFinding.objects.select_related("vulnerability")}
+
+        with self.assertNumQueries(1):
+            annotated = list(ReportFinding.objects.with_final_values())
+            values = [[getattr(f, name) for name in names] for f in annotated]
+
+        for f, row in zip(annotated, values):
+            self.assertEqual(row, [getattr(plain[f.id], name) for name in names])
+
+        # An edited row forgets its annotated values
+        finding = annotated[0]
+        finding.tester_title = "Renamed"
+        finding.save()
+        self.assertEqual(finding.final_title, "Renamed")
+
+    def test_findings_endpoint_filters_and_orders_in_sql(self):
+        response = self.client.get(self.url, {"ordering": "severity_rank"})
+        self.assertEqual(
+            [f["final_severity"] for f in response.data],
+            ["critical", "HIGH", "MEDIUM", "LOW"],
+        )
+
+        response = self.client.get(self.url, {"severity": "high", "status": "Patched"})
+        self.assertEqual([f["final_title"] for f in response.data], ["XSS"])
+
+        response = self.client.get(self.url, {"ordering": "-tester_title"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_snapshot_rows_come_ordered_by_severity(self):
+        snapshot = ReportSnapshot.load(self.report.id)
+        self.assertEqual(
+            [f.final_severity for f in snapshot.findings],
+            ["critical", "HIGH", "MEDIUM", "LOW"],
+        )
+
+
+class KeysetPaginationTests(ReportFixtures, TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="pager", password="pwd")
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def _reports(self, n):
+        return [
+            self.create_report(client_name=f"Client {i}")
+            for i in range(n)
+        ]
+
+    def _walk(self, url, params):
+        pages = []
+        response = self.client.get(url, params)
+        while True:
+            self.assertEqual(response.status_code, 200)
+            pages.append(response.data)
+            if not response.data["next"]:
+                return pages
+            response = self.client.get(response.data["next"])
+
+    def test_reports_are_walked_newest_first_without_gaps(self):
+        reports = self._reports(7)
+        # Same timestamp for several rows: id breaks the tie
+        Report.objects.filter(id__in=[r.id for r in reports[:4]]).update(created_at=timezone.now())
+
+        pages = self._walk("/api/reports/", {"page_size": 3})
+
+        self.assertEqual([len(p["results"]) for p in pages], [3, 3, 1])
+        self.assertNotIn("count", pages[0])
+        ids = [row["id"] for p in pages for row in p["results"]]
+        expected = list(
+            Report.objects.order_by("-created_at", "-id").values_list("id", flat=True)
+        )
+        self.assertEqual(ids, expected)
+
+        counted = self.client.get("/api/reports/", {"page_size": 3, "count": "true"})
+        self.assertEqual(counted.data["count"], 7)
+
+        # Without pagination parameters the plain list is unchanged
+        self.assertEqual(len(self.client.get("/api/reports/").data), 7)
+
+    def test_page_query_does_not_depend_on_position(self):
+        self._reports(30)
+
+        first = self.client.get("/api/reports/", {"page_size": 5})
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get(first.data["next"])
+
+        sql = " ".join(q["sql"] for q in ctx.captured_queries).upper()
+        self.assertNotIn("OFFSET", sql)
+        self.assertNotIn("COUNT(", sql)
+
+    def test_findings_follow_requested_ordering_and_bad_cursor_is_rejected(self):
+        report, = self._reports(1)
+        for severity in ["LOW", "CRITICAL", "HIGH", "CRITICAL", "MEDIUM"]:
+            ReportFinding.objects.create(report=report, tester_severity=severity)
+
+        url = f"/api/reports/{report.id}/findings/"
+        pages = self._walk(url, {"page_size": 2, "ordering": "severity_rank"})
+        severities = [row["final_severity"] for p in pages for row in p["results"]]
+        self.assertEqual(severities, ["CRITICAL", "CRITICAL", "HIGH", "MEDIUM", "LOW"])
+
+        response = self.client.get(url, {"cursor": "not-a-cursor"})
+        self.assertEqual(response.status_code, 404)
+
+
+class BulkReportFindingsTests(ReportFixtures, TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="importer", password="pwd")
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.report = self.create_report()
+        self.category = OWASPCategory.objects.create(name="A05 Injection")
+        self.definitions = [
+            VulnerabilityDefinition.objects.create(
+                title=f"Definition {severity}",
+                source_type="CUSTOM",
+                severity=severity,
+                description="d",
+                impact="i",
+                remediation="r",
+                owasp_category=self.category,
+            )
+            for severity in ["CRITICAL", "HIGH", "LOW"]
+        ]
+        self.url = f"/api/reports/{self.report.id}/bulk-findings/"
+
+    def payload(self, n):
+        return [
+            {"vulnerability": self.definitions[i % 3].id, "tester_title": f"Finding {i}"}
+            for i in range(n)
+        ]
+
+    def test_query_count_does_not_grow_with_the_batch(self):
+        with CaptureQueriesContext(connection) as small:
+            response = self.client.post(self.url, self.payload(3), format="json")
+        self.assertEqual(response.status_code, 201)
+
+        with CaptureQueriesContext(connection) as large:
+            response = self.client.post(self.url, self.payload(60), format="json")
+        self.assertEqual(response.status_code, 201)
+
+        self.assertEqual(len(large.captured_queries), len(small.captured_queries))
+        created = response.data["created"]
+        self.assertEqual(len(created), 60)
+        self.assertEqual(created[1]["final_title"], "Finding 1")
+        self.assertEqual(created[1]["final_severity"], "HIGH")
+        self.assertEqual(created[1]["category_name"], "A05 Injection")
+        self.assertEqual(created[1]["evidences"], [])
+
+        self.report.refresh_from_db()
+        self.assertEqual(self.report.findings_count, 63)
+        self.assertEqual(self.report.critical_count, 21)
+        self.assertIsNotNone(self.report.findings_changed_at)
+
+    def test_invalid_items_are_reported_alongside_created_ones(self):
+        payload = self.payload(2) + [
+            {"vulnerability": 999999},
+            {"vulnerability": "abc"},
+            {"tester_severity": "SEVERE"},
+        ]
+
+        response = self.client.post(self.url, payload, format="json")
+
+        self.assertEqual(response.status_code, 207)
+        self.assertEqual(len(response.data["created"]), 2)
+        self.assertEqual([e["index"] for e in response.data["errors"]], [2, 3, 4])
+        self.assertIn("vulnerability", response.data["errors"][0]["errors"])
+        self.assertIn("vulnerability", response.data["errors"][1]["errors"])
+        self.assertIn("tester_severity", response.data["errors"][2]["errors"])
+
+        all_bad = self.client.post(self.url, [{"vulnerability": 999999}], format="json")
+        self.assertEqual(all_bad.status_code, 400)
+        self.report.refresh_from_db()
+        self.assertEqual(self.report.findings_count, 2)
+
+    def test_fractional_ids_are_rejected(self):
+        response = self.client.post(
+            self.url, [{"vulnerability": self.definitions[0].id + 0.5}], format="json"
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            response.data["errors"][0]["errors"]["vulnerability"][0].code, "incorrect_type"
+        )
+
+    def test_definition_deleted_during_import_is_a_400(self):
+        with mock.patch.object(
+            ReportFinding.objects, "bulk_create", side_effect=IntegrityError("FOREIGN KEY")
+        ):
+            response = self.client.post(self.url, self.payload(2), format="json")
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(ReportFinding.objects.exists())
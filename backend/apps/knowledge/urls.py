@@ -1,6 +1,13 @@
 from django.urls import path
 from .report_preview_views import ReportPreviewView
-from .reports.report_pdf_views import ReportPDFView
+from .reports.report_pdf_views import (
+    ReportPDFView,
+    ReportPDFMetricsView,
+    ReportPDFJobCreateView,
+    ReportPDFJobDetailView,
+    ReportPDFJobDownloadView,
+    ReportExportView,
+)
 
 
 from .views import (
@@ -13,6 +20,8 @@ from .views import (
     VariantsByVulnerabilityView,
     VulnerabilityDefinitionListCreateView,
     VulnerabilityDefinitionDetailView,
+    VulnerabilitySearchView,
+    CatalogView,
 )
 
 from .report_views import (
@@ -43,6 +52,10 @@ urlpatterns = [
     # Vulnerability Definitions
     # -----------------------
     path("vulnerabilities/", VulnerabilityDefinitionListCreateView.as_view()),
+    path("vulnerabilities/search/", VulnerabilitySearchView.as_view()),
+
+    # Whole catalog as one cached tree
+    path("catalog/", CatalogView.as_view()),
     path("vulnerabilities/<int:pk>/", VulnerabilityDefinitionDetailView.as_view()),
 
     # -----------------------
@@ -64,6 +77,9 @@ urlpatterns = [
         }),
     ),
 
+    path("reports/export/", ReportExportView.as_view(), name="report-export"),
+    path("reports/pdf/metrics/", ReportPDFMetricsView.as_view(), name="report-pdf-metrics"),
+
     # -----------------------
     # REPORT FINDINGS APIs
     # -----------------------
@@ -99,6 +115,11 @@ urlpatterns = [
     # ✅ Report Preview and PDF APIs with JWT Auth
     path("reports/<int:report_id>/preview/", ReportPreviewView.as_view(), name="report-preview"),
     path("reports/<int:report_id>/pdf/", ReportPDFView.as_view(), name="report-pdf"),
+
+    # Background PDF rendering (processed by `manage.py render_worker`)
+    path("reports/<int:report_id>/pdf/jobs/", ReportPDFJobCreateView.as_view(), name="report-pdf-jobs"),
+    path("reports/<int:report_id>/pdf/jobs/<int:pk>/", ReportPDFJobDetailView.as_view(), name="report-pdf-job"),
+    path("reports/<int:report_id>/pdf/jobs/<int:pk>/download/", ReportPDFJobDownloadView.as_view(), name="report-pdf-job-download"),
     
 ]
 
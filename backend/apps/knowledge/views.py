@@ -1,8 +1,16 @@
+import re
+
 from django.shortcuts import render
 
 # Create your views here.
+from django.http import HttpResponse
+from django.utils.http import parse_etags
 from rest_framework import generics
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from drf_spectacular.utils import extend_schema, OpenApiParameter
+from drf_spectacular.types import OpenApiTypes
 
 from .models import (
     OWASPCategory,
@@ -15,17 +23,22 @@ from .serializers import (
     OWASPVulnerabilitySerializer,
     VulnerabilityVariantSerializer,
     VulnerabilityDefinitionSerializer,
+    VulnerabilitySearchResultSerializer,
 )
+from .search import search_definitions, DEFAULT_LIMIT, MAX_LIMIT
+from .catalog import get_catalog
 
 
 class OWASPCategoryListCreateView(generics.ListCreateAPIView):
     queryset = OWASPCategory.objects.all()
     serializer_class = OWASPCategorySerializer
     permission_classes = [IsAuthenticated]
+    pagination_ordering = ("created_at", "id")
 class OWASPVulnerabilityListCreateView(generics.ListCreateAPIView):
     queryset = OWASPVulnerability.objects.all()
     serializer_class = OWASPVulnerabilitySerializer
     permission_classes = [IsAuthenticated]
+    pagination_ordering = ("created_at", "id")
 
 
 class OWASPVulnerabilityDetailView(generics.RetrieveAPIView):
@@ -36,11 +49,13 @@ class VulnerabilityVariantListCreateView(generics.ListCreateAPIView):
     queryset = VulnerabilityVariant.objects.all()
     serializer_class = VulnerabilityVariantSerializer
     permission_classes = [IsAuthenticated]
+    pagination_ordering = ("id",)
 
 
 class VariantsByVulnerabilityView(generics.ListAPIView):
     serializer_class = VulnerabilityVariantSerializer
     permission_classes = [IsAuthenticated]
+    pagination_ordering = ("id",)
 
     def get_queryset(self):
         vuln_id = self.kwargs["vuln_id"]
@@ -63,6 +78,7 @@ class VulnerabilityDefinitionListCreateView(generics.ListCreateAPIView):
     queryset = VulnerabilityDefinition.objects.all()
     serializer_class = VulnerabilityDefinitionSerializer
     permission_classes = [IsAuthenticated]
+    pagination_ordering = ("created_at", "id")
 
     def perform_create(self, serializer):
         serializer.save(created_by=self.request.user)
@@ -72,3 +88,64 @@ class VulnerabilityDefinitionDetailView(generics.RetrieveUpdateDestroyAPIView):
     queryset = VulnerabilityDefinition.objects.all()
     serializer_class = VulnerabilityDefinitionSerializer
     permission_classes = [IsAuthenticated]
+
+
+class VulnerabilitySearchView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter("q", str, description="Words to look for in title, description, impact and remediation"),
+            OpenApiParameter("limit", int, description=f"Maximum results (default {DEFAULT_LIMIT}, max {MAX_LIMIT})"),
+        ],
+        responses=VulnerabilitySearchResultSerializer(many=True),
+        description="Vulnerability definitions matching the query, most relevant first",
+    )
+    def get(self, request):
+        try:
+            limit = int(request.query_params.get("limit", DEFAULT_LIMIT))
+        except ValueError:
+            limit = DEFAULT_LIMIT
+        limit = max(1, min(limit, MAX_LIMIT))
+
+        results = search_definitions(request.query_params.get("q", ""), limit)
+        return Response(VulnerabilitySearchResultSerializer(results, many=True).data)
+
+
+class CatalogView(APIView):
+    """
+    The full catalog tree in one response (see catalog.py), gzipped when
+    the client accepts it.  Clients should send back the ETag in
+    If-None-Match; the answer is 304 until the catalog changes.
+    """
+    permission_classes = [IsAuthenticated]
+
+    ACCEPTS_GZIP = re.compile(r"\bgzip\b")
+
+    @extend_schema(
+        responses={200: OpenApiTypes.OBJECT, 304: None},
+        description="Category -> vulnerability -> variant -> definition tree",
+    )
+    def get(self, request):
+        catalog = get_catalog()
+        gzipped = bool(self.ACCEPTS_GZIP.search(request.headers.get("Accept-Encoding", "")))
+
+        # Each encoding is a different representation, hence its own tag
+        etag = f'"{catalog.etag}-gzip"' if gzipped else f'"{catalog.etag}"'
+        known = parse_etags(request.headers.get("If-None-Match", ""))
+
+        if "*" in known or f'"{catalog.etag}"' in known or f'"{catalog.etag}-gzip"' in known:
+            response = HttpResponse(status=304)
+        else:
+            response = HttpResponse(
+                catalog.gzipped if gzipped else catalog.body,
+                content_type="application/json",
+            )
+            if gzipped:
+                response["Content-Encoding"] = "gzip"
+
+        response["ETag"] = etag
+        response["Vary"] = "Accept-Encoding"
+        # Always revalidate; a 304 costs one query
+        response["Cache-Control"] = "private, no-cache"
+        return response
@@ -1,11 +1,14 @@
 from django.core.cache import cache
 from django.http import HttpResponse
 
+from apps.knowledge.pagination import KeysetPagination
+
 
 class SelectiveCacheMiddleware:
     """Middleware that selectively caches GET responses for specific API paths.
 
-    * Caches GET responses for /api/owasp/* and /api/vulnerabilities/* paths only.
+    * Caches GET responses for /api/owasp/* and /api/vulnerabilities/* paths only,
+      except vulnerability search and paginated (cursor/page_size) lists.
     * Reports, Findings, and Evidence APIs bypass the cache entirely.
     * PUT/PATCH/POST/DELETE requests invalidate the cache for that specific path.
     * Subsequent GETs for cached paths return immediate responses from cache.
@@ -17,6 +20,19 @@ class SelectiveCacheMiddleware:
         '/api/vulnerabilities/',
     ]
 
+    # Under a cacheable prefix, but writes elsewhere change the result
+    # and would not invalidate it.
+    UNCACHEABLE_PATHS = [
+        '/api/vulnerabilities/search/',
+    ]
+
+    # Keyset pages are cached under their full URL, which a write to the
+    # list never deletes; they are cheap index range scans anyway.
+    UNCACHEABLE_PARAMS = [
+        KeysetPagination.cursor_query_param,
+        KeysetPagination.page_size_query_param,
+    ]
+
     # Methods that invalidate cache
     INVALIDATE_METHODS = ['POST', 'PUT', 'PATCH', 'DELETE']
 
@@ -25,12 +41,20 @@ class SelectiveCacheMiddleware:
 
     def _is_cacheable_path(self, path):
         """Check if the request path should be cached."""
+        if any(path.startswith(prefix) for prefix in self.UNCACHEABLE_PATHS):
+            return False
         return any(path.startswith(prefix) for prefix in self.CACHEABLE_PATHS)
 
+    def _is_paginated(self, request):
+        return any(param in request.GET for param in self.UNCACHEABLE_PARAMS)
+
     def __call__(self, request):
         path = request.get_full_path()
         is_cacheable = self._is_cacheable_path(path)
 
+        if is_cacheable and self._is_paginated(request):
+            return self.get_response(request)
+
         # Clear cache for invalidating methods on cacheable paths
         if is_cacheable and request.method in self.INVALIDATE_METHODS:
             cache.delete(path)
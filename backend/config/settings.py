@@ -170,7 +170,12 @@ REST_FRAMEWORK = {
         "rest_framework.permissions.IsAuthenticated",
     ),
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
+    # Keyset pagination, only applied when a list is requested with
+    # ?page_size= or ?cursor= (see apps/knowledge/pagination.py)
+    "DEFAULT_PAGINATION_CLASS": "apps.knowledge.pagination.KeysetPagination",
 }
+API_PAGE_SIZE = int(os.getenv("API_PAGE_SIZE", 50))
+API_MAX_PAGE_SIZE = int(os.getenv("API_MAX_PAGE_SIZE", 500))
 
 # REST_FRAMEWORK = {
 #     "DEFAULT_AUTHENTICATION_CLASSES": [] if DISABLE_AUTH else (
@@ -206,6 +211,37 @@ SIMPLE_JWT = {
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
 
+# Rendered report PDFs, keyed by report fingerprint.  Kept outside
+# MEDIA_ROOT so artifacts are never served without the PDF view.
+REPORT_PDF_CACHE_DIR = os.getenv("REPORT_PDF_CACHE_DIR", BASE_DIR / "pdf_cache")
+# Disk budget for that spool; least recently used PDFs are evicted first.
+REPORT_PDF_CACHE_MAX_BYTES = int(os.getenv("REPORT_PDF_CACHE_MAX_BYTES", 2 * 1024 ** 3))
+REPORT_PDF_CACHE_MAX_AGE = int(os.getenv("REPORT_PDF_CACHE_MAX_AGE", 7 * 24 * 60 * 60))
+REPORT_PDF_CACHE_SWEEP_INTERVAL = 60
+# Processes used to render large reports in parallel;
+# 0 or 1 renders in the calling process.
+REPORT_PDF_PARALLEL_WORKERS = int(os.getenv("REPORT_PDF_PARALLEL_WORKERS", 0))
+# Re-render only the detailed findings that changed since the last build.
+# Per-finding fragments are kept in their own directory with their own
+# byte budget, so the spool can use up to REPORT_PDF_CACHE_MAX_BYTES +
+# REPORT_PDF_FRAGMENT_MAX_BYTES on disk.
+REPORT_PDF_INCREMENTAL = os.getenv("REPORT_PDF_INCREMENTAL", "0") == "1"
+REPORT_PDF_FRAGMENT_DIR = os.getenv(
+    "REPORT_PDF_FRAGMENT_DIR", os.path.join(REPORT_PDF_CACHE_DIR, "fragments")
+)
+REPORT_PDF_FRAGMENT_MAX_BYTES = int(os.getenv("REPORT_PDF_FRAGMENT_MAX_BYTES", 512 * 1024 ** 2))
+# Reports with at least this many evidence files are rendered in chunks
+# to keep worker memory bounded; 0 disables.
+REPORT_PDF_LOW_MEMORY_EVIDENCE = int(os.getenv("REPORT_PDF_LOW_MEMORY_EVIDENCE", 500))
+# TrueType family embedded in report PDFs (paths to .ttf files).  When
+# unset, DejaVu Sans / Noto Sans are used if installed, else Helvetica.
+REPORT_PDF_FONT_REGULAR = os.getenv("REPORT_PDF_FONT_REGULAR")
+REPORT_PDF_FONT_BOLD = os.getenv("REPORT_PDF_FONT_BOLD")
+# Batch ZIP export (POST /api/reports/export/): concurrent renders per
+# request and the most reports one request may ask for.
+REPORT_EXPORT_WORKERS = int(os.getenv("REPORT_EXPORT_WORKERS", 4))
+REPORT_EXPORT_MAX_REPORTS = int(os.getenv("REPORT_EXPORT_MAX_REPORTS", 200))
+
 SPECTACULAR_SETTINGS = {
     'TITLE': 'My API',
     'DESCRIPTION': 'API documentation',